@@ -0,0 +1,5 @@
+from django.contrib import admin
+from .models import TranslationMemory
+
+# Register your models here.
+admin.site.register(TranslationMemory)
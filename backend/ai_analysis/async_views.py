@@ -0,0 +1,129 @@
+"""
+Async variants of the AI analysis views, for the ASGI server (sample_project/asgi.py).
+
+The LLM round-trip is awaited on the event loop (chain.ainvoke) instead of holding a
+worker thread, so one process can keep hundreds of analyses in flight. Request/response
+bodies and status codes match the DRF views in views.py.
+
+DRF's APIView cannot await handlers, so these are plain Django async views that reuse
+DRF's authenticators and parsers (run in a thread: JWT/token auth hits the database).
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .services import aanalyze_sound_script, alookup_dictionary, arefresh_example
+
+
+class AsyncAIView(View):
+    """Authenticated JSON POST endpoint; subclasses implement `async handle(data)`."""
+    http_method_names = ['post', 'options']
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+    def __init_subclass__(cls, **kwargs):
+        # Fail at import time, not with a 500 on every request
+        super().__init_subclass__(**kwargs)
+        if cls.handle is AsyncAIView.handle or not inspect.iscoroutinefunction(cls.handle):
+            raise TypeError(f"{cls.__name__} must define `async def handle(self, data)`")
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated API, like APIView: no CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def _authenticate_and_parse(self, request):
+        drf_request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in self.authentication_classes],
+        )
+        if not (drf_request.user and drf_request.user.is_authenticated):
+            raise exceptions.NotAuthenticated()
+        return drf_request.user, drf_request.data
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            request.user, data = await sync_to_async(self._authenticate_and_parse)(request)
+        except exceptions.APIException as e:
+            # 401 for missing/invalid credentials, 400 for malformed JSON
+            code = status.HTTP_401_UNAUTHORIZED if isinstance(
+                e, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+            ) else e.status_code
+            payload = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+            return JsonResponse(payload, status=code)
+
+        try:
+            return await self.handle(data)
+        except Exception as e:
+            return JsonResponse(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    async def handle(self, data):
+        raise NotImplementedError
+
+
+class AsyncSoundScriptAnalysisView(AsyncAIView):
+    """POST /api/ai/sound-script/ (ASGI). See views.SoundScriptAnalysisView."""
+
+    async def handle(self, data):
+        full_context = data.get('full_context')
+        focus_segment = data.get('focus_segment')
+        speed_profile = data.get('speed_profile', 'native_fast')
+
+        if not full_context:
+            return JsonResponse({'error': 'full_context is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if not focus_segment:
+            return JsonResponse({'error': 'focus_segment is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = await aanalyze_sound_script(
+            full_context=full_context,
+            focus_segment=focus_segment,
+            speed_profile=speed_profile
+        )
+        return JsonResponse(result.model_dump(), json_dumps_params={'ensure_ascii': False})
+
+
+class AsyncDictionaryLookupView(AsyncAIView):
+    """POST /api/ai/dictionary/ (ASGI). See views.DictionaryLookupView."""
+
+    async def handle(self, data):
+        full_context = data.get('full_context')
+        word_or_phrase = data.get('word_or_phrase')
+
+        if not full_context:
+            return JsonResponse({'error': 'full_context is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if not word_or_phrase:
+            return JsonResponse({'error': 'word_or_phrase is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = await alookup_dictionary(
+            full_context=full_context,
+            word_or_phrase=word_or_phrase
+        )
+        return JsonResponse(result.model_dump(), json_dumps_params={'ensure_ascii': False})
+
+
+class AsyncRefreshExampleView(AsyncAIView):
+    """POST /api/ai/refresh-example/ (ASGI). See views.RefreshExampleView."""
+
+    async def handle(self, data):
+        word_or_phrase = data.get('word_or_phrase')
+
+        if not word_or_phrase:
+            return JsonResponse({'error': 'word_or_phrase is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = await arefresh_example(
+            word_or_phrase=word_or_phrase,
+            definition=data.get('definition', ''),
+            original_context=data.get('original_context', ''),
+            current_example=data.get('current_example')
+        )
+        return JsonResponse(result.model_dump(), json_dumps_params={'ensure_ascii': False})
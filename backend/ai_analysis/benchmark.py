@@ -0,0 +1,108 @@
+"""
+Shared harness for the AI benchmarks (manage.py benchmark_ai, benchmark_ai_views).
+
+Runs against a throwaway test database with Huey in immediate (in-memory) mode,
+so nothing touches the real database or task queue. With the fake LLM provider
+(ai_analysis/fake_llm.py) every run also reports how much of its time was our
+own overhead: end-to-end time minus the fake model's simulated provider time.
+"""
+import os
+import shutil
+import contextlib
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    """Create a test database (as manage.py test does) for the duration of the block."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from huey.contrib.djhuey import HUEY
+
+    setup_test_environment()
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    test_name, tmp_dir = test_settings.get('NAME'), None
+    if connection.vendor == 'sqlite':
+        # A file rather than shared-cache memory: concurrent writers wait for the
+        # lock instead of failing with "database table is locked"
+        tmp_dir = tempfile.mkdtemp()
+        test_settings['NAME'] = os.path.join(tmp_dir, 'benchmark.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    immediate = HUEY.immediate
+    HUEY.immediate = True  # tasks enqueued by views run in memory, not in huey.sqlite3
+    try:
+        yield
+    finally:
+        HUEY.immediate = immediate
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = test_name
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        teardown_test_environment()
+
+
+def wsgi_client(user):
+    """httpx client over the Django WSGI app, authenticated as `user` with a JWT."""
+    import httpx
+    from django.core.wsgi import get_wsgi_application
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    return httpx.Client(
+        transport=httpx.WSGITransport(app=get_wsgi_application()),
+        base_url='http://testserver',
+        headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'},
+    )
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_sequential(fn, runs: int) -> dict:
+    """
+    Call fn() `runs` times, one at a time. fn returns True on success.
+
+    Returns p50/p95 end-to-end seconds, LLM calls per run and, with the fake
+    provider, p50 overhead (end-to-end minus simulated provider time).
+    """
+    from .fake_llm import FAKE_LLM_STATS
+
+    durations, overheads, calls, failures = [], [], 0, 0
+    for _ in range(runs):
+        calls_before, _, simulated_before = FAKE_LLM_STATS.snapshot()
+        started = time.perf_counter()
+        ok = fn()
+        elapsed = time.perf_counter() - started
+        calls_after, _, simulated_after = FAKE_LLM_STATS.snapshot()
+
+        durations.append(elapsed)
+        overheads.append(elapsed - (simulated_after - simulated_before))
+        calls += calls_after - calls_before
+        failures += not ok
+
+    return {
+        'runs': runs,
+        'failures': failures,
+        'p50': statistics.median(durations),
+        'p95': percentile(durations, 0.95),
+        'overhead_p50': statistics.median(overheads),
+        'llm_calls': calls / runs,
+    }
+
+
+def run_concurrent(fn, runs: int, concurrency: int) -> dict:
+    """Call fn() `runs` times from `concurrency` threads; returns throughput."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(lambda _: fn(), range(runs)))
+    elapsed = time.perf_counter() - started
+    return {
+        'runs': runs,
+        'failures': sum(not ok for ok in results),
+        'seconds': elapsed,
+        'throughput': runs / elapsed,
+    }
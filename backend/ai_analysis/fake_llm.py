@@ -0,0 +1,279 @@
+"""
+Local fake chat model for settings.LLM_CONFIG entries with provider "fake".
+
+Lets every LLM code path (chains, structured output, tool-calling agents,
+streaming) run offline with a predictable cost, for development, load tests and
+benchmarks (manage.py benchmark_ai):
+
+- with_structured_output(schema): returns a schema-valid instance, generated
+  from the schema's JSON schema (first enum value, minimum lengths, ...).
+- bind_tools(tools): answers in plain text unless a tool call is forced
+  (tool_choice), so agent loops terminate.
+- Plain text prompts that ask for JSON get JSON back (json_reply): a batch of
+  {"id", "text"} items is answered per id, and a system prompt showing a JSON
+  object template gets that object with every key filled in.
+- Any other plain text: config "response", streamed word by word.
+
+Timing: `latency` seconds before the first token, then `token_latency` per token
+(streaming or not). Every call is counted in FAKE_LLM_STATS, so benchmarks can
+subtract simulated provider time from end-to-end time.
+"""
+import re
+import json
+import time
+import asyncio
+import threading
+from typing import Any, Iterator, AsyncIterator, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel
+
+DEFAULT_RESPONSE = "This is a canned reply from the local fake model, used for offline runs."
+TOKEN_RE = re.compile(r"\S+\s*|\s+")
+JSON_TEMPLATE_RE = re.compile(r'\{\s*"\w+"\s*:[^{}]*\}')
+JSON_KEY_RE = re.compile(r'"(\w+)"\s*:')
+
+
+class FakeLLMStats:
+    """Process-wide counters of fake calls and simulated provider time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.tokens = 0
+            self.simulated_seconds = 0.0
+
+    def record(self, tokens: int, seconds: float):
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+            self.simulated_seconds += seconds
+
+    def snapshot(self) -> tuple[int, int, float]:
+        with self._lock:
+            return self.calls, self.tokens, self.simulated_seconds
+
+
+FAKE_LLM_STATS = FakeLLMStats()
+
+
+# ============ Schema-valid values ============
+
+def _resolve(schema: dict, root: dict) -> dict:
+    ref = schema.get("$ref")
+    if not ref:
+        return schema
+    node = root
+    for part in ref.lstrip("#/").split("/"):
+        node = node[part]
+    return _resolve(node, root)
+
+
+def fake_value(schema: dict, root: Optional[dict] = None, name: str = "value"):
+    """A minimal value that validates against a JSON schema."""
+    root = root or schema
+    schema = _resolve(schema, root)
+
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if schema.get(key):
+            options = [o for o in schema[key] if _resolve(o, root).get("type") != "null"]
+            return fake_value((options or schema[key])[0], root, name)
+
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+
+    if kind == "object":
+        return {
+            prop: fake_value(sub, root, prop)
+            for prop, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(1, schema.get("minItems", 1))
+        if "maxItems" in schema:
+            count = min(count, schema["maxItems"])
+        return [fake_value(schema.get("items", {}), root, name) for _ in range(count)]
+    if kind == "integer":
+        return int(schema.get("minimum", 1))
+    if kind == "number":
+        return float(schema.get("minimum", 1.0))
+    if kind == "boolean":
+        return False
+    if kind == "null":
+        return None
+    text = f"fake {name}"
+    if "maxLength" in schema:
+        text = text[:schema["maxLength"]]
+    return text.ljust(schema.get("minLength", 0), "x")
+
+
+# ============ JSON replies for text prompts ============
+
+def _batch_items(text: str) -> Optional[list]:
+    """The [{"id", "text"}, ...] list a batch prompt sends, or None."""
+    try:
+        items = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(items, list) and items and all(
+        isinstance(item, dict) and "id" in item and "text" in item for item in items
+    ):
+        return items
+    return None
+
+
+def json_reply(messages) -> Optional[str]:
+    """
+    A JSON answer for text prompts that expect one (None for free-text prompts):
+
+    - the last message is a JSON list of {"id", "text"} items (batch translation):
+      {"translations": [{"id": ..., "translation": ...}, ...]}, one per id
+    - a system prompt shows a JSON object template ({"polished_text": "...", ...}):
+      that object with every key filled in
+    """
+    texts = [m.content for m in messages if isinstance(m.content, str)]
+    items = _batch_items(texts[-1]) if texts else None
+    if items:
+        return json.dumps({"translations": [
+            {"id": item["id"], "translation": f"fake translation of {item['text']}"} for item in items
+        ]}, ensure_ascii=False)
+
+    for message in messages:
+        if message.type != "system" or not isinstance(message.content, str):
+            continue
+        template = JSON_TEMPLATE_RE.search(message.content)
+        if template:
+            keys = JSON_KEY_RE.findall(template.group(0))
+            return json.dumps({key: f"fake {key}" for key in keys})
+    return None
+
+
+def _tool_schema(tool) -> tuple[str, dict]:
+    """(name, JSON schema of the arguments) for a pydantic model, @tool, function or dict."""
+    if isinstance(tool, type) and issubclass(tool, BaseModel):
+        return tool.__name__, tool.model_json_schema()
+    function = convert_to_openai_tool(tool)["function"]
+    return function["name"], function.get("parameters", {})
+
+
+# ============ Chat model ============
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that sleeps instead of calling a provider. See the module docstring."""
+
+    model: str = "fake"
+    temperature: float = 0
+    latency: float = 0.0
+    token_latency: float = 0.0
+    response: str = DEFAULT_RESPONSE
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model, "latency": self.latency, "token_latency": self.token_latency}
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(fake_tools=list(tools), fake_tool_choice=tool_choice, **kwargs)
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        # Accept (and ignore) provider options such as method="function_calling"
+        kwargs.pop("method", None)
+        kwargs.pop("strict", None)
+        return super().with_structured_output(schema, include_raw=include_raw, **kwargs)
+
+    def _message(self, messages, fake_tools=None, fake_tool_choice=None) -> AIMessage:
+        if fake_tools and fake_tool_choice not in (None, "none", "auto", False):
+            schemas = dict(_tool_schema(tool) for tool in fake_tools)
+            if isinstance(fake_tool_choice, dict):
+                # OpenAI style {"type": "function", "function": {"name": ...}}
+                fake_tool_choice = fake_tool_choice.get("function", {}).get("name")
+            name = fake_tool_choice if fake_tool_choice in schemas else next(iter(schemas))
+            return AIMessage(content="", tool_calls=[{
+                "name": name,
+                "args": fake_value(schemas[name]),
+                "id": f"call_fake_{int(time.time() * 1e6)}",
+                "type": "tool_call",
+            }])
+        return AIMessage(content=json_reply(messages) or self.response)
+
+    def _tokens(self, message: AIMessage) -> list[str]:
+        return TOKEN_RE.findall(message.content) if message.content else [""]
+
+    def _cost(self, tokens: list[str]) -> float:
+        return self.latency + self.token_latency * len(tokens)
+
+    @staticmethod
+    def _pop_options(kwargs: dict) -> dict:
+        kwargs.pop("ls_structured_output_format", None)
+        return {
+            "fake_tools": kwargs.pop("fake_tools", None),
+            "fake_tool_choice": kwargs.pop("fake_tool_choice", None),
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._message(messages, **self._pop_options(kwargs))
+        tokens = self._tokens(message)
+        cost = self._cost(tokens)
+        time.sleep(cost)
+        FAKE_LLM_STATS.record(len(tokens), cost)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._message(messages, **self._pop_options(kwargs))
+        tokens = self._tokens(message)
+        cost = self._cost(tokens)
+        await asyncio.sleep(cost)
+        FAKE_LLM_STATS.record(len(tokens), cost)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        message = self._message(messages, **self._pop_options(kwargs))
+        if message.tool_calls:
+            time.sleep(self.latency)
+            FAKE_LLM_STATS.record(1, self.latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_calls=message.tool_calls))
+            return
+
+        tokens = self._tokens(message)
+        time.sleep(self.latency)
+        for token in tokens:
+            time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        FAKE_LLM_STATS.record(len(tokens), self._cost(tokens))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._message(messages, **self._pop_options(kwargs))
+        if message.tool_calls:
+            await asyncio.sleep(self.latency)
+            FAKE_LLM_STATS.record(1, self.latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_calls=message.tool_calls))
+            return
+
+        tokens = self._tokens(message)
+        await asyncio.sleep(self.latency)
+        for token in tokens:
+            await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        FAKE_LLM_STATS.record(len(tokens), self._cost(tokens))
@@ -0,0 +1,275 @@
+"""
+Management command to benchmark every AI endpoint and Huey task on the local
+fake LLM provider (ai_analysis/fake_llm.py), end to end: authentication,
+prompt building, structured-output parsing, serialization and DB writes.
+
+For each scenario it reports sequential p50/p95 latency, LLM calls per run,
+p50 overhead (latency minus the fake model's simulated provider time: the part
+that is our own code) and, with --concurrency, throughput.
+
+Requires LLM_PROVIDER=fake, so no provider is ever called. Text-only paths that
+expect JSON from the model (tutor feedback, word enrichment, batch translation) get
+JSON from the fake (fake_llm.json_reply) and run their real parsing path. The
+script ingest reads a generated episode page from a temporary SCRIPT_CACHE_DIR,
+so fanfr.com is never fetched either.
+
+Without --cache the translation memory is emptied before each translation run, so
+every run pays for its LLM batches.
+
+Usage:
+    LLM_PROVIDER=fake python manage.py benchmark_ai
+    LLM_PROVIDER=fake FAKE_LLM_LATENCY=0 FAKE_LLM_TOKEN_LATENCY=0 python manage.py benchmark_ai --runs 50
+    LLM_PROVIDER=fake python manage.py benchmark_ai --only dictionary,enrich_word_node --concurrency 16
+    LLM_PROVIDER=fake python manage.py benchmark_ai --json benchmark.json
+"""
+import io
+import json
+import time
+import logging
+import tempfile
+from contextlib import ExitStack, redirect_stdout
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _endpoint(client, url, body):
+    def run():
+        return 200 <= client.post(url, json=body).status_code < 300
+    return run
+
+
+SCRIPT_LINES = 200  # dialogue lines of the generated episode (+ a scene header: 5 translation batches)
+
+
+def _write_script_page(season: int, episode: int):
+    """A fanfr.com-style page for the episode in the script cache, fresh so it is not revalidated."""
+    from scripts.parser import _cache_paths, _write_atomic
+
+    speakers = ('Ross', 'Rachel', 'Monica', 'Chandler', 'Joey', 'Phoebe')
+    body = ''.join(
+        f'<p><b>{speakers[i % len(speakers)]}</b>: Line {i}, you\'ve got to live with it.</p>'
+        for i in range(SCRIPT_LINES)
+    )
+    html_path, meta_path, _ = _cache_paths(season, episode)
+    _write_atomic(html_path, f'<html><body><div class="contenu"><h3>[Scene: Central Perk]</h3>{body}</div></body></html>')
+    _write_atomic(meta_path, json.dumps({'url': '', 'etag': None, 'last_modified': None, 'fetched_at': time.time()}))
+
+
+def build_scenarios(user, client, cold_memory: bool = True) -> dict:
+    """name -> (kind, fn); fixtures are created here, outside the timed runs."""
+    from langchain_core.messages import HumanMessage
+
+    from ai_analysis.models import TranslationMemory
+    from audio_slicer.models import Drama, SourceAudio, AudioChunk, AudioSlice
+    from doc_assistant.graph import app as agent_app
+    from english_corner.models import Scenario, Conversation, PracticeMessage, WordNode
+    from english_corner.tasks import enrich_word_node, process_initial_greeting, process_user_message
+    from reader.models import Article, Paragraph, Annotation
+    from reader.tasks import process_article_meta_task
+    from scripts.models import ScriptTask
+    from scripts.tasks import ingest_and_translate_script
+
+    context = "You've got to live with it."
+    article = Article.objects.create(
+        user=user, url='https://example.com/a', title='Benchmark article',
+        status='ready', meta_context={'domain': 'Linguistics'},  # ai_assist waits for the meta analysis
+    )
+    paragraphs = Paragraph.objects.bulk_create([
+        Paragraph(article=article, index=i, content=f"Paragraph {i}: {context}") for i in range(10)
+    ])
+    annotation = Annotation.objects.create(paragraph=paragraphs[0], selected_text='got to')
+    scenario = Scenario.objects.create(user=user, title='Cafe', system_prompt='You are a barista.')
+    conversation = Conversation.objects.create(user=user, scenario=scenario)
+    word_node = WordNode.objects.create(user=user, label='got to')
+
+    # An episode with one chunk and 50 slices. bulk_create skips the post_save
+    # signals: no audio ingest (no real file) and no slice embedding tasks.
+    drama = Drama.objects.create(user=user, name='Benchmark drama')
+    source_audio = SourceAudio.objects.bulk_create([
+        SourceAudio(user=user, drama=drama, season=1, episode=1, file='benchmark/original.mp3')
+    ])[0]
+    chunk = AudioChunk.objects.bulk_create([
+        AudioChunk(source_audio=source_audio, chunk_index=1, file='benchmark/chunk_001.mp3')
+    ])[0]
+    slices = AudioSlice.objects.bulk_create([
+        AudioSlice(audio_chunk=chunk, start_time=i, end_time=i + 1, original_text=f"Slice {i}: {context}")
+        for i in range(50)
+    ])
+    _write_script_page(source_audio.season, source_audio.episode)
+
+    def forget_translations():
+        if cold_memory:
+            TranslationMemory.objects.all().delete()
+
+    slice_translate = _endpoint(client, '/api/v1/audioslices/batch_translate/', {'ids': [s.id for s in slices]})
+
+    def batch_translate():
+        forget_translations()
+        return slice_translate()
+
+    def ingest_script():
+        forget_translations()
+        script_task = ScriptTask.objects.create(source_audio=source_audio)
+        ingest_and_translate_script.call_local(script_task.id)
+        script_task.refresh_from_db()
+        return script_task.status == 'completed' and script_task.translate_count == script_task.ingest_count
+
+    def user_message():
+        message = PracticeMessage.objects.create(
+            conversation=conversation, role=PracticeMessage.Role.USER, user_content='Can I get a latte?'
+        )
+        process_user_message.call_local(message.id)
+        return PracticeMessage.objects.filter(id=message.id, status=PracticeMessage.Status.SUCCESS).exists()
+
+    def agent_state():
+        return {"messages": [HumanMessage(content="hello")], "next": "", "context": "", "sources": []}
+
+    def agent_stream():
+        tokens = [msg.content for msg, _ in agent_app.stream(agent_state(), stream_mode="messages") if msg.content]
+        return bool(tokens)
+
+    return {
+        # Endpoints (WSGI, JWT auth, full middleware stack)
+        'sound-script': ('endpoint', _endpoint(client, '/api/ai/sound-script/', {
+            'full_context': context, 'focus_segment': "You've got to",
+        })),
+        'dictionary': ('endpoint', _endpoint(client, '/api/ai/dictionary/', {
+            'full_context': context, 'word_or_phrase': 'got to',
+        })),
+        'refresh-example': ('endpoint', _endpoint(client, '/api/ai/refresh-example/', {
+            'word_or_phrase': 'got to', 'definition': 'have to', 'current_example': "I've got to go.",
+        })),
+        'phrase-lookup': ('endpoint', _endpoint(client, '/api/v1/lookup/', {
+            'original_context': context, 'expressions_to_lookup': 'got to',
+        })),
+        'annotation-assist': ('endpoint', _endpoint(client, f'/api/v1/annotations/{annotation.id}/ai_assist/', {
+            'user_note': 'What does this mean?',
+        })),
+        'slice-batch-translate': ('endpoint', batch_translate),
+        # Doc assistant agent graph (general route; DocQA needs the vector store)
+        'doc-assistant': ('graph', lambda: bool(agent_app.invoke(agent_state())["messages"][-1].content)),
+        'doc-assistant-stream': ('graph', agent_stream),
+        # Huey tasks, run in-process
+        'enrich_word_node': ('task', lambda: enrich_word_node.call_local(word_node.id) is None),
+        'process_initial_greeting': ('task', lambda: process_initial_greeting.call_local(conversation.id) is None),
+        'process_user_message': ('task', user_message),
+        'process_article_meta_task': ('task', lambda: process_article_meta_task.call_local(article.id) is None),
+        # Parse + bulk insert + concurrent batch translation + embeddings
+        'ingest_and_translate_script': ('task', ingest_script),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark AI endpoints and Huey tasks end to end on the fake LLM provider'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            type=str,
+            default='',
+            help='Comma-separated scenario names (default: all)',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Runs per scenario',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=0,
+            help='Also measure throughput with this many threads (0: sequential only)',
+        )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='Keep the AI response cache and translation memory (default: off, so every run reaches the LLM)',
+        )
+        parser.add_argument(
+            '--json',
+            type=str,
+            default='',
+            help='Write the results to this JSON file, for comparing runs',
+        )
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+        from django.test.utils import override_settings
+
+        from ai_analysis.benchmark import benchmark_database
+
+        providers = {config.get("provider") for config in settings.LLM_CONFIG.values()}
+        if providers != {"fake"}:
+            raise CommandError("Run with LLM_PROVIDER=fake: this benchmark must not call real providers")
+
+        cache = dict(settings.AI_RESPONSE_CACHE, enabled=options['cache'])
+        # The fake provider has no quota: don't let the translation rate limiter pace the runs
+        rate_limit = dict(settings.TRANSLATION_RATE_LIMIT, rpm=10 ** 6, tpm=10 ** 9)
+        with ExitStack() as stack:
+            script_cache_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            stack.enter_context(benchmark_database())
+            stack.enter_context(override_settings(
+                AI_RESPONSE_CACHE=cache,
+                TRANSLATION_RATE_LIMIT=rate_limit,
+                SCRIPT_CACHE_DIR=script_cache_dir,
+            ))
+            results = self._run(options)
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"\nResults written to {options['json']}")
+
+    def _run(self, options):
+        from django.conf import settings
+        from django.contrib.auth import get_user_model
+
+        from ai_analysis.benchmark import run_sequential, run_concurrent, wsgi_client
+
+        user = get_user_model().objects.create_user(
+            username='benchmark', email='benchmark@example.com', password='benchmark'
+        )
+        client = wsgi_client(user)
+        scenarios = build_scenarios(user, client, cold_memory=not options['cache'])
+
+        selected = [name.strip() for name in options['only'].split(',') if name.strip()] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}. Choose from: {', '.join(scenarios)}")
+
+        default = settings.LLM_CONFIG["default"]
+        self.stdout.write(
+            f"Fake LLM: {default.get('latency', 0)}s latency + {default.get('token_latency', 0)}s/token, "
+            f"{options['runs']} runs per scenario\n"
+        )
+        self.stdout.write(
+            f"  {'scenario':<27} {'kind':<9} {'p50':>8} {'p95':>8} {'overhead':>9} {'llm':>5} {'fail':>5}"
+            + (f" {'req/s':>8}" if options['concurrency'] else "")
+        )
+
+        results = {}
+        for name in selected:
+            kind, fn = scenarios[name]
+            with ExitStack() as quiet:
+                if options['verbosity'] < 2:
+                    # The code under test prints and logs per call; keep the table readable
+                    quiet.enter_context(redirect_stdout(io.StringIO()))
+                    logging.disable(logging.WARNING)
+                    quiet.callback(logging.disable, logging.NOTSET)
+                fn()  # warm-up: imports, chain construction, first queries
+                result = run_sequential(fn, options['runs'])
+                if options['concurrency']:
+                    result['concurrent'] = run_concurrent(fn, options['runs'], options['concurrency'])
+            results[name] = result
+
+            line = (
+                f"  {name:<27} {kind:<9} {result['p50']:>7.3f}s {result['p95']:>7.3f}s "
+                f"{result['overhead_p50']:>8.3f}s {result['llm_calls']:>5.1f} {result['failures']:>5}"
+            )
+            if options['concurrency']:
+                line += f" {result['concurrent']['throughput']:>8.1f}"
+            self.stdout.write(self.style.ERROR(line) if result['failures'] else line)
+
+        client.close()
+        return results
@@ -0,0 +1,174 @@
+"""
+Management command to load-test the AI analysis endpoints: the DRF views on a
+threaded WSGI server vs the async views (async_views.py) on ASGI.
+
+The chains run on the fake LLM provider (ai_analysis/fake_llm.py) with a fixed
+--latency, so the numbers measure how many LLM round-trips each server can keep
+in flight, not the provider. Runs against a throwaway test database with real
+JWT authentication and the full middleware stack.
+
+Usage:
+    python manage.py benchmark_ai_views
+    python manage.py benchmark_ai_views --requests 500 --latency 2 --workers 8
+    python manage.py benchmark_ai_views --endpoint dictionary --concurrency 100
+"""
+import asyncio
+import statistics
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+ENDPOINTS = {
+    'sound-script': {'full_context': "You've got to live with it.", 'focus_segment': "You've got to"},
+    'dictionary': {'full_context': "You've got to live with it.", 'word_or_phrase': 'got to'},
+    'refresh-example': {'word_or_phrase': 'got to', 'definition': 'have to', 'current_example': "I've got to go."},
+}
+CHAINS = ('_sound_script_chain', '_dictionary_chain', '_refresh_example_chain')
+
+
+def summarize(label: str, durations: list[float], statuses: list[int], elapsed: float) -> str:
+    from ai_analysis.benchmark import percentile
+
+    ok = sum(1 for s in statuses if s == 200)
+    p95 = percentile(durations, 0.95)
+    return (
+        f"  {label:<5} {len(statuses):>5} req  {ok:>5} ok  {elapsed:>7.2f}s  "
+        f"{len(statuses) / elapsed:>8.1f} req/s  p50 {statistics.median(durations):.2f}s  p95 {p95:.2f}s"
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the AI endpoints on WSGI (sync views) vs ASGI (async views) with a fake LLM'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint',
+            choices=['all', *ENDPOINTS],
+            default='all',
+            help='Endpoint to benchmark (default: all)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Requests per endpoint and server',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=1.0,
+            help='Fake LLM round-trip in seconds',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='WSGI worker threads',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=200,
+            help='Requests in flight against the ASGI app',
+        )
+
+    def handle(self, *args, **options):
+        from ai_analysis.benchmark import benchmark_database
+
+        with benchmark_database():
+            self._run(options)
+
+    def _run(self, options):
+        from django.contrib.auth import get_user_model
+        from django.core.asgi import get_asgi_application
+        from django.core.wsgi import get_wsgi_application
+        from django.test.utils import override_settings
+        from django.urls import path
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from ai_analysis import async_views, services, views
+
+        user = get_user_model().objects.create_user(
+            username='benchmark', email='benchmark@example.com', password='benchmark'
+        )
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        urlconf = types.ModuleType('ai_benchmark_urls')
+        urlconf.urlpatterns = [
+            path('wsgi/sound-script/', views.SoundScriptAnalysisView.as_view()),
+            path('wsgi/dictionary/', views.DictionaryLookupView.as_view()),
+            path('wsgi/refresh-example/', views.RefreshExampleView.as_view()),
+            path('asgi/sound-script/', async_views.AsyncSoundScriptAnalysisView.as_view()),
+            path('asgi/dictionary/', async_views.AsyncDictionaryLookupView.as_view()),
+            path('asgi/refresh-example/', async_views.AsyncRefreshExampleView.as_view()),
+        ]
+
+        latency = options['latency']
+        fake = {"default": {"provider": "fake", "latency": latency, "token_latency": 0}}
+        saved = {name: getattr(services, name) for name in CHAINS}
+        endpoints = list(ENDPOINTS) if options['endpoint'] == 'all' else [options['endpoint']]
+        n = options['requests']
+
+        self.stdout.write(
+            f"{n} requests per endpoint, fake LLM latency {latency}s, "
+            f"WSGI {options['workers']} threads vs ASGI {options['concurrency']} in flight"
+        )
+        # Every request must reach the (fake) LLM
+        with override_settings(ROOT_URLCONF=urlconf, LLM_CONFIG=fake, AI_RESPONSE_CACHE={'enabled': False}):
+            try:
+                # Rebuild the chains on the fake provider
+                services.clear_llm_registry()
+                for name in CHAINS:
+                    setattr(services, name, None)
+
+                wsgi_app, asgi_app = get_wsgi_application(), get_asgi_application()
+                for endpoint in endpoints:
+                    body = ENDPOINTS[endpoint]
+                    self.stdout.write(f"\n/{endpoint}/")
+                    self.stdout.write(summarize('WSGI', *self._run_wsgi(
+                        wsgi_app, f'/wsgi/{endpoint}/', body, headers, n, options['workers']
+                    )))
+                    self.stdout.write(summarize('ASGI', *asyncio.run(self._run_asgi(
+                        asgi_app, f'/asgi/{endpoint}/', body, headers, n, options['concurrency']
+                    ))))
+            finally:
+                services.clear_llm_registry()
+                for name, chain in saved.items():
+                    setattr(services, name, chain)
+
+    def _run_wsgi(self, app, url, body, headers, n, workers):
+        import httpx
+
+        client = httpx.Client(transport=httpx.WSGITransport(app=app), base_url='http://testserver')
+
+        def one(_):
+            started = time.perf_counter()
+            response = client.post(url, json=body, headers=headers)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(one, range(n)))
+        elapsed = time.perf_counter() - started
+        client.close()
+        return [d for d, _ in results], [s for _, s in results], elapsed
+
+    async def _run_asgi(self, app, url, body, headers, n, concurrency):
+        import httpx
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url='http://testserver', timeout=None
+        ) as client:
+            async def one():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post(url, json=body, headers=headers)
+                    return time.perf_counter() - started, response.status_code
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(one() for _ in range(n)))
+            elapsed = time.perf_counter() - started
+        return [d for d, _ in results], [s for _, s in results], elapsed
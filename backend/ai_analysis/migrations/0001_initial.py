@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_text', models.TextField(help_text='Source text as sent (stripped)')),
+                ('text_hash', models.CharField(help_text='SHA-256 of source_text', max_length=64)),
+                ('normalized_hash', models.CharField(db_index=True, help_text='SHA-256 of the normalized source text', max_length=64)),
+                ('translation', models.TextField()),
+                ('model_name', models.CharField(max_length=100)),
+                ('prompt_version', models.PositiveIntegerField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('text_hash', 'model_name', 'prompt_version'), name='unique_translation_memory')],
+            },
+        ),
+    ]
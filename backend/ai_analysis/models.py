@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class TranslationMemory(models.Model):
+    """
+    Translation memory for batch_translate_texts.
+
+    One row per (source text, model, prompt version). Lookups try the exact text first,
+    then its normalized form (case, spacing, quote style, surrounding punctuation),
+    so "Hey." and "hey" in another episode never reach the LLM twice.
+    """
+    source_text = models.TextField(help_text="Source text as sent (stripped)")
+    text_hash = models.CharField(max_length=64, help_text="SHA-256 of source_text")
+    normalized_hash = models.CharField(max_length=64, db_index=True, help_text="SHA-256 of the normalized source text")
+    translation = models.TextField()
+
+    model_name = models.CharField(max_length=100)
+    prompt_version = models.PositiveIntegerField()
+
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['text_hash', 'model_name', 'prompt_version'], name='unique_translation_memory')
+        ]
+
+    def __str__(self):
+        return f"{self.source_text[:30]} -> {self.translation[:30]}"
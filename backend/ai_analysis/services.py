@@ -3,8 +3,17 @@ LangChain services for AI analysis.
 Contains the LCEL chains for different analysis types.
 """
 import os
+import re
 import json
-from typing import List, Dict
+import time
+import hashlib
+import unicodedata
+import queue
+import asyncio
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Iterator, Tuple, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -26,25 +35,37 @@ from .prompts import (
 
 # ============ LLM Factories ============
 
-def get_llm(feature="default", **kwargs):
-    """Create an LLM instance based on settings.LLM_CONFIG for a specific feature."""
-    config = settings.LLM_CONFIG.get(feature, settings.LLM_CONFIG["default"])
-    
+# One keep-alive pool shared by every OpenAI-compatible client in this process
+LLM_HTTP_LIMITS = {"max_connections": 32, "max_keepalive_connections": 16, "keepalive_expiry": 60.0}
+
+_llm_registry = {}
+_llm_registry_lock = threading.Lock()
+_llm_http_client = None
+
+
+def _get_llm_http_client():
+    global _llm_http_client
+    if _llm_http_client is None:
+        import httpx
+        _llm_http_client = httpx.Client(limits=httpx.Limits(**LLM_HTTP_LIMITS))
+    return _llm_http_client
+
+
+def _build_llm(config, defaults):
     provider = config.get("provider", "deepseek")
-    
-    # Base defaults from settings
-    defaults = {
-        "model": config.get("model_name"),
-        "temperature": config.get("temperature", 0),
-    }
-    
-    # Override with per-call kwargs
-    defaults.update(kwargs)
-    
+    if provider == "fake":
+        from .fake_llm import FakeChatModel
+        return FakeChatModel(
+            latency=config.get("latency", 0.0),
+            token_latency=config.get("token_latency", 0.0),
+            **({"response": config["response"]} if config.get("response") else {}),
+            **{key: value for key, value in defaults.items() if value is not None}
+        )
     if provider == "deepseek":
         return ChatOpenAI(
             api_key=config.get("api_key"),
             base_url=config.get("base_url"),
+            http_client=_get_llm_http_client(),
             **defaults
         )
     else:
@@ -55,6 +76,290 @@ def get_llm(feature="default", **kwargs):
         )
 
 
+def get_llm(feature="default", **kwargs):
+    """
+    Get the LLM client for a feature, based on settings.LLM_CONFIG.
+
+    Clients are built once per (feature config, overrides) and reused, so hot
+    paths skip client construction and TLS handshakes. Chat models are
+    stateless between calls; derive variants with bind()/with_structured_output().
+    """
+    config = settings.LLM_CONFIG.get(feature, settings.LLM_CONFIG["default"])
+    
+    # Base defaults from settings
+    defaults = {
+        "model": config.get("model_name"),
+        "temperature": config.get("temperature", 0),
+    }
+    
+    # Override with per-call kwargs
+    defaults.update(kwargs)
+
+    try:
+        key = (tuple(sorted(config.items())), tuple(sorted(defaults.items())))
+        hash(key)
+    except TypeError:
+        # Unhashable overrides (callbacks, clients, ...): build a one-off client
+        return _build_llm(config, defaults)
+
+    llm = _llm_registry.get(key)
+    if llm is None:
+        with _llm_registry_lock:
+            llm = _llm_registry.get(key)
+            if llm is None:
+                llm = _llm_registry[key] = _build_llm(config, defaults)
+    return llm
+
+
+def is_fake_llm(feature="default") -> bool:
+    """True when the feature's LLM_CONFIG entry uses the local fake provider (ai_analysis.fake_llm)."""
+    config = settings.LLM_CONFIG.get(feature, settings.LLM_CONFIG["default"])
+    return config.get("provider") == "fake"
+
+
+def clear_llm_registry():
+    """Drop cached clients (e.g. after changing settings.LLM_CONFIG in tests or a shell)."""
+    with _llm_registry_lock:
+        _llm_registry.clear()
+
+
+# ============ Response Cache ============
+
+_WORD_RE = re.compile(r"[\w']+")
+
+
+class ResponseCache:
+    """
+    Thread-safe in-process LRU cache of validated structured responses, with a TTL.
+
+    Exact tier: key = (feature, model, prompt hash, normalized inputs).
+    Near-duplicate tier (optional): the same anchor inputs (focus segment, speed
+    profile, ...) in a slightly different context reuse a cached response when the
+    contexts' word-set Jaccard similarity is >= near_duplicate_threshold.
+    """
+    MAX_VARIANTS = 16  # contexts remembered per anchor for the near-duplicate tier
+
+    def __init__(self, max_entries: int, ttl: float, near_duplicate_threshold: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._entries = OrderedDict()  # key -> (expires_at, anchor, payload)
+        self._variants = {}            # anchor -> OrderedDict(key -> context word set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_keys(feature: str, model: str, prompt_hash: str, anchor_inputs: Tuple, context: str) -> Tuple[str, str]:
+        """(exact key, anchor key) for one call."""
+        anchor = _sha256(json.dumps(
+            [feature, model, prompt_hash, [normalize_translation_text(v) for v in anchor_inputs]]
+        ))
+        return _sha256(f"{anchor}:{normalize_translation_text(context)}"), anchor
+
+    def _drop(self, key):
+        _, anchor, _ = self._entries.pop(key)
+        variants = self._variants.get(anchor)
+        if variants is not None:
+            variants.pop(key, None)
+            if not variants:
+                del self._variants[anchor]
+
+    def _live(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def get(self, key: str, anchor: str, context: str) -> Optional[dict]:
+        with self._lock:
+            now = time.monotonic()
+            payload = self._live(key, now)
+            if payload is not None:
+                self.hits += 1
+                return payload
+
+            threshold = self.near_duplicate_threshold
+            if threshold and anchor in self._variants:
+                words = set(_WORD_RE.findall(normalize_translation_text(context)))
+                best_key, best_score = None, threshold
+                for other_key, other_words in list(self._variants[anchor].items()):
+                    union = len(words | other_words)
+                    score = len(words & other_words) / union if union else 1.0
+                    if score >= best_score:
+                        best_key, best_score = other_key, score
+                if best_key is not None:
+                    payload = self._live(best_key, now)
+                    if payload is not None:
+                        self.near_hits += 1
+                        return payload
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, anchor: str, context: str, payload: dict) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, anchor, payload)
+            if self.near_duplicate_threshold:
+                variants = self._variants.setdefault(anchor, OrderedDict())
+                variants[key] = set(_WORD_RE.findall(normalize_translation_text(context)))
+                while len(variants) > self.MAX_VARIANTS:
+                    variants.popitem(last=False)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._variants.clear()
+
+
+_response_cache = None
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        config = settings.AI_RESPONSE_CACHE
+        _response_cache = ResponseCache(
+            max_entries=config["max_entries"],
+            ttl=config["ttl"],
+            near_duplicate_threshold=config.get("near_duplicate_threshold"),
+        )
+    return _response_cache
+
+
+def _feature_model_name(feature: str) -> str:
+    config = settings.LLM_CONFIG.get(feature, settings.LLM_CONFIG["default"])
+    return f'{config.get("provider", "deepseek")}:{config.get("model_name") or ""}'
+
+
+# ============ Single-flight ============
+
+class SingleFlight:
+    """
+    In-process request coalescing: concurrent calls with the same key share one
+    execution of fn. Followers get the leader's result (the same object, treat it
+    as read-only) or its exception. Nothing is kept once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future, for threads
+        self._tasks = {}  # (loop id, key) -> asyncio.Task, for coroutines
+        self.shared = 0   # calls served by another caller's execution
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(self, key: str, fn):
+        """do() for a coroutine function. The shared task survives a cancelled caller."""
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = self._tasks[task_key] = loop.create_task(fn())
+                task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+            else:
+                self.shared += 1
+        return await asyncio.shield(task)
+
+
+_single_flight = SingleFlight()
+
+
+def single_flight_key(*parts) -> str:
+    return _sha256(json.dumps(parts, ensure_ascii=False, default=str))
+
+
+def coalesce(key_parts: Tuple, fn):
+    """
+    Run fn() once for all concurrent callers with the same key_parts, e.g.
+    coalesce(("word_enrichment", label, context), lambda: ...).
+    """
+    return _single_flight.do(single_flight_key(*key_parts), fn)
+
+
+async def acoalesce(key_parts: Tuple, fn):
+    """coalesce() for a coroutine function."""
+    return await _single_flight.ado(single_flight_key(*key_parts), fn)
+
+
+def _cache_lookup(feature: str, schema, prompts: Tuple[str, ...], anchor_inputs: Tuple, context: str):
+    """(cache, key, anchor, cached model or None); cache is None when disabled."""
+    key, anchor = ResponseCache.make_keys(
+        feature, _feature_model_name(feature), _sha256("\x00".join(prompts)), anchor_inputs, context
+    )
+    if not settings.AI_RESPONSE_CACHE.get("enabled", True):
+        return None, key, anchor, None
+    cache = get_response_cache()
+    payload = cache.get(key, anchor, context)
+    return cache, key, anchor, (schema.model_validate(payload) if payload is not None else None)
+
+
+def cached_structured_call(feature: str, schema, prompts: Tuple[str, ...], anchor_inputs: Tuple,
+                           context: str, call):
+    """
+    Return schema.model_validate(cached JSON) on a cache hit, else run call() and
+    cache its validated model_dump(). Disabled when AI_RESPONSE_CACHE["enabled"] is off.
+    Concurrent misses for the same key share one call() (single-flight).
+    """
+    cache, key, anchor, cached = _cache_lookup(feature, schema, prompts, anchor_inputs, context)
+    if cached is not None:
+        return cached
+
+    def run():
+        result = schema.model_validate(call())
+        if cache is not None:
+            cache.set(key, anchor, context, result.model_dump(mode="json"))
+        return result
+
+    return _single_flight.do(key, run)
+
+
+async def acached_structured_call(feature: str, schema, prompts: Tuple[str, ...], anchor_inputs: Tuple,
+                                  context: str, call):
+    """cached_structured_call for a coroutine-returning call()."""
+    cache, key, anchor, cached = _cache_lookup(feature, schema, prompts, anchor_inputs, context)
+    if cached is not None:
+        return cached
+
+    async def run():
+        result = schema.model_validate(await call())
+        if cache is not None:
+            cache.set(key, anchor, context, result.model_dump(mode="json"))
+        return result
+
+    return await _single_flight.ado(key, run)
+
+
 # ============ Sound Script (Gemini) ============
 
 _sound_script_chain = None
@@ -83,12 +388,34 @@ def analyze_sound_script(
     focus_segment: str,
     speed_profile: str = "native_fast"
 ) -> SoundScriptResponse:
-    chain = get_sound_script_chain()
-    return chain.invoke({
-        "full_context": full_context,
-        "focus_segment": focus_segment,
-        "speed_profile": speed_profile
-    })
+    return cached_structured_call(
+        "sound_script", SoundScriptResponse,
+        (SOUND_SCRIPT_SYSTEM_PROMPT, SOUND_SCRIPT_HUMAN_PROMPT),
+        (focus_segment, speed_profile), full_context,
+        lambda: get_sound_script_chain().invoke({
+            "full_context": full_context,
+            "focus_segment": focus_segment,
+            "speed_profile": speed_profile
+        }),
+    )
+
+
+async def aanalyze_sound_script(
+    full_context: str,
+    focus_segment: str,
+    speed_profile: str = "native_fast"
+) -> SoundScriptResponse:
+    """analyze_sound_script for async views: the LLM call runs on the event loop (ainvoke)."""
+    return await acached_structured_call(
+        "sound_script", SoundScriptResponse,
+        (SOUND_SCRIPT_SYSTEM_PROMPT, SOUND_SCRIPT_HUMAN_PROMPT),
+        (focus_segment, speed_profile), full_context,
+        lambda: get_sound_script_chain().ainvoke({
+            "full_context": full_context,
+            "focus_segment": focus_segment,
+            "speed_profile": speed_profile
+        }),
+    )
 
 
 # ============ Dictionary Lookup (DeepSeek) ============
@@ -123,11 +450,31 @@ def lookup_dictionary(
     full_context: str,
     word_or_phrase: str
 ) -> DictionaryResponse:
-    chain = get_dictionary_chain()
-    return chain.invoke({
-        "full_context": full_context,
-        "word_or_phrase": word_or_phrase
-    })
+    return cached_structured_call(
+        "dictionary", DictionaryResponse,
+        (DICTIONARY_SYSTEM_PROMPT, DICTIONARY_HUMAN_PROMPT),
+        (word_or_phrase,), full_context,
+        lambda: get_dictionary_chain().invoke({
+            "full_context": full_context,
+            "word_or_phrase": word_or_phrase
+        }),
+    )
+
+
+async def alookup_dictionary(
+    full_context: str,
+    word_or_phrase: str
+) -> DictionaryResponse:
+    """lookup_dictionary for async views (ainvoke)."""
+    return await acached_structured_call(
+        "dictionary", DictionaryResponse,
+        (DICTIONARY_SYSTEM_PROMPT, DICTIONARY_HUMAN_PROMPT),
+        (word_or_phrase,), full_context,
+        lambda: get_dictionary_chain().ainvoke({
+            "full_context": full_context,
+            "word_or_phrase": word_or_phrase
+        }),
+    )
 
 
 # ============ Refresh Example (Gemini or DeepSeek? User said "Dictionary and this LLM use DeepSeek") ============
@@ -162,17 +509,37 @@ def refresh_example(
     original_context: str,
     current_example: str
 ) -> RefreshExampleResponse:
-    chain = get_refresh_example_chain()
-    return chain.invoke({
+    inputs = {
+        "word_or_phrase": word_or_phrase,
+        "definition": definition,
+        "original_context": original_context,
+        "current_example": current_example
+    }
+    return coalesce(("refresh_example", inputs), lambda: get_refresh_example_chain().invoke(inputs))
+
+
+async def arefresh_example(
+    word_or_phrase: str,
+    definition: str,
+    original_context: str,
+    current_example: str
+) -> RefreshExampleResponse:
+    """refresh_example for async views (ainvoke). Not cached: each call should give a new example."""
+    inputs = {
         "word_or_phrase": word_or_phrase,
         "definition": definition,
         "original_context": original_context,
         "current_example": current_example
-    })
+    }
+    return await acoalesce(("refresh_example", inputs), lambda: get_refresh_example_chain().ainvoke(inputs))
 
 
 # ============ Batch Translation (DeepSeek) ============
 
+# Bump when the translation prompt (or normalize_translation_text) changes, so translation
+# memory entries from the old prompt are not reused
+BATCH_TRANSLATION_PROMPT_VERSION = 2
+
 _batch_translation_chain = None
 
 def get_batch_translation_chain():
@@ -194,12 +561,131 @@ def get_batch_translation_chain():
     
     return _batch_translation_chain
 
-def batch_translate_texts(slices_data: List[Dict]) -> List[Dict]:
+class TranslationStreamParser:
+    """
+    Incremental parser for the batch translation output.
+
+    Feed it the completion as it streams; every {"id": ..., "translation": ...} object is
+    returned as soon as its closing brace arrives. Only innermost objects are parsed, on
+    their own, so code fences, a truncated tail or one malformed item don't cost the
+    other items.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._pos = 0
+        self._stack = []  # [start position, has nested object]
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Dict]:
+        items = []
+        for ch in text:
+            self._buffer.append(ch)
+            pos = self._pos
+            self._pos += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                if self._stack:
+                    self._stack[-1][1] = True
+                self._stack.append([pos, False])
+            elif ch == '}' and self._stack:
+                start, has_nested = self._stack.pop()
+                if not has_nested:
+                    item = self._parse_item(''.join(self._buffer[start:pos + 1]))
+                    if item:
+                        items.append(item)
+        return items
+
+    @staticmethod
+    def _parse_item(raw: str):
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            print(f"Batch translation: skipping malformed item {raw[:200]}")
+            return None
+        if isinstance(item, dict) and 'id' in item and item.get('translation'):
+            return item
+        return None
+
+
+def _stream_batch_translation(slices_data: List[Dict]) -> Iterator[Dict]:
+    """One LLM call: [{'id', 'text'}] -> yields {'id', 'translation'} while the completion streams."""
+    chain = get_batch_translation_chain()
+    
+    # Chunking: DeepSeek context is large, but to be safe let's process reasonable chunks or just one go if small.
+    # Assuming frontend sends reasonable batch sizes (e.g. 50).
+    
+    json_input = json.dumps(slices_data, ensure_ascii=False) # ensure_ascii 不需要将中文转换成\uXXXX格式
+
+    parser = TranslationStreamParser()
+    for chunk in chain.stream({"json_input": json_input}):
+        if isinstance(chunk.content, str):
+            yield from parser.feed(chunk.content)
+
+
+# Items missing from a response (truncated / malformed) are re-sent this many times, alone
+MISSING_RETRY_ROUNDS = 1
+
+
+def _translate_with_llm(slices_data: List[Dict], on_item=None) -> List[Dict]:
+    """
+    LLM only, no database access (safe in worker threads): each distinct text is sent
+    once, the response is parsed while it streams, and items missing from it (truncated
+    or malformed) are sent again, up to MISSING_RETRY_ROUNDS times.
+    """
+    results = []
+
+    def emit(item_id, translation):
+        result = {"id": item_id, "translation": translation}
+        results.append(result)
+        if on_item:
+            on_item(result)
+
+    pending = {}  # normalized text -> items waiting for it
+    for item in slices_data:
+        pending.setdefault(normalize_translation_text(item['text']), []).append(item)
+
+    # One representative per distinct text goes to the LLM. Keyed by str(id): the model
+    # may echo 12 as "12"
+    representatives = {str(items[0]['id']): items[0] for items in pending.values()}
+
+    for _ in range(1 + MISSING_RETRY_ROUNDS):
+        if not representatives:
+            break
+        for t in _stream_batch_translation(list(representatives.values())):
+            source = representatives.pop(str(t['id']), None)
+            if source is None:
+                continue  # Unknown or duplicate id
+            for item in pending[normalize_translation_text(source['text'])]:
+                emit(item['id'], t['translation'])
+
+        if representatives:
+            print(f"Batch translation: {len(representatives)} items missing from the response, re-sending them")
+
+    return results
+
+
+def batch_translate_texts(slices_data: List[Dict], on_item=None) -> List[Dict]:
     """
     Batch translate texts.
+
+    Texts already in the translation memory (same model + prompt version) are answered
+    from it; only the misses are sent to the LLM (see _translate_with_llm), and what it
+    returns is added to the memory.
     
     Args:
         slices_data: List of dicts [{'id': 1, 'text': 'Hello'}, ...]
+        on_item: optional callback({'id', 'translation'}) called as soon as each item is known
         
     Returns:
         List of dicts [{'id': 1, 'translation': '你好'}, ...]
@@ -207,27 +693,280 @@ def batch_translate_texts(slices_data: List[Dict]) -> List[Dict]:
     if not slices_data:
         return []
 
-    chain = get_batch_translation_chain()
-    
-    # Chunking: DeepSeek context is large, but to be safe let's process reasonable chunks or just one go if small.
-    # Assuming frontend sends reasonable batch sizes (e.g. 50).
-    
-    json_input = json.dumps(slices_data, ensure_ascii=False) # ensure_ascii 不需要将中文转换成\uXXXX格式
-    
-    response_msg = chain.invoke({"json_input": json_input})
-    content = response_msg.content.strip()
-    
-    # Clean up markdown if present
-    if content.startswith("```json"):
-        content = content.replace("```json", "", 1) # 1 表示最大替换次数
-    if content.endswith("```"):
-        content = content[:-3]
-    
+    known = lookup_translation_memory([item['text'] for item in slices_data])
+
+    results = []
+
+    def emit(result):
+        results.append(result)
+        if on_item:
+            on_item(result)
+
+    misses = []
+    for item in slices_data:
+        translation = known.get(item['text'])
+        if translation:
+            emit({"id": item['id'], "translation": translation})
+        else:
+            misses.append(item)
+
+    text_by_id = {item['id']: item['text'] for item in misses}
+    learned = {}
+
+    def learn(result):
+        learned[text_by_id[result['id']]] = result['translation']
+        emit(result)
+
     try:
-        result = json.loads(content)
-        # Expecting {"translations": [...]}
-        return result.get("translations", [])
-    except json.JSONDecodeError as e:
-        print(f"Batch translation JSON error: {e}, Content: {content}")
-        return []
+        _translate_with_llm(misses, on_item=learn)
+    finally:
+        # Keep what streamed in even if the call broke off
+        store_translation_memory(learned)
+
+    return results
+
+
+# ============ Translation Memory ============
+
+_QUOTES = str.maketrans({'‘': "'", '’': "'", '“': '"', '”': '"', '–': '-', '—': '-'})
+_EDGE_QUOTES = ' "\''
+
+
+def normalize_translation_text(text: str) -> str:
+    """
+    '  "Oh my God." ' and 'oh my god' normalize to the same key. A sentence-final ? or !
+    is kept: "You're leaving?" and "You're leaving." translate differently.
+    """
+    text = unicodedata.normalize('NFKC', text or '').translate(_QUOTES)
+    text = re.sub(r'\s+', ' ', text).casefold().strip(_EDGE_QUOTES)
+    # Punctuation-only texts ("...", "?!") keep their punctuation as the key
+    return text.rstrip('.').rstrip(_EDGE_QUOTES) or text
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _translation_model_name() -> str:
+    config = settings.LLM_CONFIG.get("translation", settings.LLM_CONFIG["default"])
+    return config.get("model_name") or ""
+
+
+def lookup_translation_memory(texts: List[str]) -> Dict[str, str]:
+    """
+    Map each text that has a translation-memory entry to its translation.
+    Exact matches win over normalized ones. One SELECT + one hit-count UPDATE.
+    """
+    from django.db.models import F
+    from .models import TranslationMemory
+
+    exact = {text: _sha256(text.strip()) for text in texts}
+    normalized = {text: _sha256(normalize_translation_text(text)) for text in texts}
+
+    entries = list(TranslationMemory.objects.filter(
+        model_name=_translation_model_name(),
+        prompt_version=BATCH_TRANSLATION_PROMPT_VERSION,
+        normalized_hash__in=set(normalized.values()),
+    ))
+    by_exact = {e.text_hash: e for e in entries}
+    by_normalized = {}
+    for e in entries:
+        by_normalized.setdefault(e.normalized_hash, e)
+
+    found = {}
+    used = set()
+    for text in texts:
+        entry = by_exact.get(exact[text]) or by_normalized.get(normalized[text])
+        if entry:
+            found[text] = entry.translation
+            used.add(entry.id)
+
+    if used:
+        TranslationMemory.objects.filter(id__in=used).update(hit_count=F('hit_count') + 1)
+    return found
+
+
+def store_translation_memory(translations: Dict[str, str]) -> None:
+    """Save {source_text: translation} for the current model and prompt version."""
+    from .models import TranslationMemory
+
+    if not translations:
+        return
+    model_name = _translation_model_name()
+    TranslationMemory.objects.bulk_create([
+        TranslationMemory(
+            source_text=text.strip(),
+            text_hash=_sha256(text.strip()),
+            normalized_hash=_sha256(normalize_translation_text(text)),
+            translation=translation,
+            model_name=model_name,
+            prompt_version=BATCH_TRANSLATION_PROMPT_VERSION,
+        )
+        for text, translation in translations.items()
+    ], ignore_conflicts=True)
+
+
+# ============ Concurrent Batch Translation ============
+
+class RateLimiter:
+    """
+    Thread-safe sliding-window limiter for requests and tokens per minute.
+    acquire() blocks until the call fits in both budgets of the last 60 seconds.
+    """
+    WINDOW = 60.0
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._calls = deque()  # (timestamp, tokens)
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._calls and now - self._calls[0][0] >= self.WINDOW:
+            _, tokens = self._calls.popleft()
+            self._tokens -= tokens
+
+    def acquire(self, tokens: int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                fits_rpm = len(self._calls) < self.rpm
+                # An oversized call still goes through once the window is empty
+                fits_tpm = self._tokens + tokens <= self.tpm or not self._calls
+                if fits_rpm and fits_tpm:
+                    self._calls.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                wait = self.WINDOW - (now - self._calls[0][0])
+            time.sleep(min(max(wait, 0.05), 1.0))
+
+
+_translation_limiter = None
+
+def get_translation_limiter() -> RateLimiter:
+    """One limiter per process, shared by every concurrent translation run."""
+    global _translation_limiter
+    if _translation_limiter is None:
+        config = settings.TRANSLATION_RATE_LIMIT
+        _translation_limiter = RateLimiter(rpm=config["rpm"], tpm=config["tpm"])
+    return _translation_limiter
+
+
+def estimate_translation_tokens(batch: List[Dict]) -> int:
+    """Rough prompt + completion token estimate for rate limiting (JSON chars / 2, both ways)."""
+    return len(json.dumps(batch, ensure_ascii=False))
+
+
+def _translate_batch_with_retry(batch: List[Dict], limiter: RateLimiter, retries: int, on_item=None) -> List[Dict]:
+    """
+    Worker body: LLM calls only. A call that breaks off is retried with just the items
+    it did not return, and a batch that still fails keeps what streamed in.
+    """
+    done = {}  # id -> {'id', 'translation'}, across attempts
+
+    def collect(result):
+        done[result['id']] = result
+        if on_item:
+            on_item(result)
+
+    for attempt in range(retries + 1):
+        remaining = [item for item in batch if item['id'] not in done]
+        if not remaining:
+            break
+        limiter.acquire(estimate_translation_tokens(remaining))
+        try:
+            _translate_with_llm(remaining, on_item=collect)
+            break
+        except Exception as e:
+            if attempt == retries:
+                if not done:
+                    raise
+                print(f"Batch translation failed ({e}), keeping {len(done)} of {len(batch)} items")
+                break
+            backoff = 2 ** attempt
+            print(f"Batch translation failed ({e}), retrying in {backoff}s...")
+            time.sleep(backoff)
+    return list(done.values())
+
+
+def translate_batches_concurrently(
+    items: List[Dict],
+    batch_size: int = 50,
+    on_item=None,
+) -> Iterator[Tuple[List[Dict], List[Dict]]]:
+    """
+    Translate items in parallel batches, within settings.TRANSLATION_RATE_LIMIT.
+
+    The translation memory is read (one lookup for all items) and written (once per
+    finished batch) in the calling thread; worker threads only make LLM calls.
+
+    Args:
+        items: List of dicts [{'id': 1, 'text': 'Hello'}, ...]
+        batch_size: Items per LLM call
+        on_item: optional callback({'id', 'translation'}) for live progress, called in the
+            calling thread as items stream in (before their batch is yielded)
+
+    Yields:
+        (batch, translations) in the calling thread as each batch finishes (completion
+        order, not input order), so callers can write results back without sharing DB
+        connections across threads. A batch that still fails after retries yields its
+        memory hits and whatever streamed in before the failure.
+    """
+    config = settings.TRANSLATION_RATE_LIMIT
+    limiter = get_translation_limiter()
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    if not batches:
+        return
+
+    known = lookup_translation_memory([item['text'] for item in items])
+
+    # Workers only enqueue streamed items; the calling thread runs on_item
+    streamed = queue.SimpleQueue()
+
+    def drain():
+        while on_item:
+            try:
+                on_item(streamed.get_nowait())
+            except queue.Empty:
+                return
+
+    with ThreadPoolExecutor(max_workers=min(config["max_workers"], len(batches))) as executor:
+        futures, answered = {}, []
+        for batch in batches:
+            hits = [{"id": item['id'], "translation": known[item['text']]} for item in batch if item['text'] in known]
+            misses = [item for item in batch if item['text'] not in known]
+            if not misses:
+                answered.append((batch, hits))  # fully answered from memory, no LLM call
+                continue
+            future = executor.submit(
+                _translate_batch_with_retry, misses, limiter, config["retries"],
+                streamed.put if on_item else None,
+            )
+            futures[future] = (batch, hits, misses)
+
+        if on_item:
+            for batch, hits, _ in futures.values():
+                for hit in hits:
+                    on_item(hit)
+        for batch, hits in answered:
+            if on_item:
+                for hit in hits:
+                    on_item(hit)
+            yield batch, hits
 
+        not_done = set(futures)
+        while not_done:
+            done, not_done = wait(not_done, timeout=0.5, return_when=FIRST_COMPLETED)
+            drain()
+            for future in done:
+                batch, hits, misses = futures[future]
+                try:
+                    translations = future.result()
+                except Exception as e:
+                    print(f"Batch translation gave up on {len(misses)} items: {e}")
+                    translations = []
+                text_by_id = {item['id']: item['text'] for item in misses}
+                store_translation_memory({text_by_id[t['id']]: t['translation'] for t in translations})
+                yield batch, hits + translations
@@ -1,8 +1,20 @@
 """
 URL configuration for ai_analysis app.
+
+Under ASGI (sample_project/asgi.py sets AI_ASYNC_VIEWS) the endpoints are served by
+the async variants in async_views.py; the request/response contract is the same.
 """
+from django.conf import settings
 from django.urls import path
-from .views import SoundScriptAnalysisView, DictionaryLookupView, RefreshExampleView
+
+if settings.AI_ASYNC_VIEWS:
+    from .async_views import (
+        AsyncSoundScriptAnalysisView as SoundScriptAnalysisView,
+        AsyncDictionaryLookupView as DictionaryLookupView,
+        AsyncRefreshExampleView as RefreshExampleView,
+    )
+else:
+    from .views import SoundScriptAnalysisView, DictionaryLookupView, RefreshExampleView
 
 urlpatterns = [
     path('sound-script/', SoundScriptAnalysisView.as_view(), name='sound-script-analysis'),
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SourceAudio, AudioSlice, AudioChunk, AudioTag, Drama, ReviewCard
+from .models import SourceAudio, AudioSlice, AudioChunk, AudioTag, Drama, ReviewCard, IngestTask, LearningProgress
 
 # Register your models here.
 admin.site.register(SourceAudio)
@@ -8,3 +8,5 @@ admin.site.register(AudioChunk)
 admin.site.register(AudioTag)
 admin.site.register(Drama)
 admin.site.register(ReviewCard)
+admin.site.register(IngestTask)
+admin.site.register(LearningProgress)
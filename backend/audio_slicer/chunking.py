@@ -0,0 +1,86 @@
+"""
+Chunking strategies: where a SourceAudio is cut into AudioChunks.
+
+A strategy turns a SourceAudio (and its chunk_seconds / snap_window parameters)
+into the ffmpeg segment muxer options used by services.segment_source_audio.
+Register new strategies in CHUNK_STRATEGIES under a SourceAudio.ChunkStrategy value.
+"""
+from .models import SourceAudio
+from . import vad
+
+SNAP_FRAME_LEN = 10  # ms: energy resolution of the boundary scan
+SNAP_SMOOTH_LEN = 150  # ms: boundaries need a pause this long, not a gap between two syllables
+
+
+def fixed_segment_args(source_audio: SourceAudio) -> list[str]:
+    """Cut every chunk_seconds, wherever that lands."""
+    return ['-segment_time', str(source_audio.chunk_seconds)]
+
+
+def find_silence_boundaries(samples, sample_rate: int, chunk_seconds: float, snap_window: float) -> list[float]:
+    """
+    Split points roughly chunk_seconds apart, each moved to the quietest moment
+    within +/- snap_window of its nominal position.
+
+    Each nominal position is measured from the previous (snapped) boundary, so
+    chunk lengths stay within chunk_seconds +/- snap_window.
+
+    Returns:
+        Increasing split times in seconds (empty if the audio fits in one chunk).
+    """
+    import numpy as np
+
+    frame_db, _ = vad.frame_energy_db(samples, sample_rate, SNAP_FRAME_LEN)
+    if len(frame_db) == 0:
+        return []
+
+    # -inf (digital silence) would dominate the moving average
+    frame_db = np.maximum(frame_db, -100.0)
+    smooth = max(1, SNAP_SMOOTH_LEN // SNAP_FRAME_LEN)
+    energy = np.convolve(frame_db, np.ones(smooth) / smooth, mode='same')
+
+    frames_per_second = 1000 / SNAP_FRAME_LEN
+    step = int(chunk_seconds * frames_per_second)
+    window = int(snap_window * frames_per_second)
+    n_frames = len(energy)
+
+    boundaries = []
+    prev = 0
+    # Stop once the rest fits in a (slightly long) last chunk, never leave a tiny tail
+    while prev + step + window < n_frames:
+        target = prev + step
+        lo = max(prev + 1, target - window)
+        hi = min(n_frames, target + window + 1)
+        # Quietest frame, ties broken towards the nominal position
+        cost = energy[lo:hi] + np.abs(np.arange(lo, hi) - target) * 1e-3
+        prev = lo + int(np.argmin(cost))
+        boundaries.append(round(prev / frames_per_second, 3))
+    return boundaries
+
+
+def silence_segment_args(source_audio: SourceAudio) -> list[str]:
+    """Cut near every chunk_seconds, snapped to the nearest pause in speech."""
+    from .services import decode_chunk_pcm, PEAKS_SAMPLE_RATE
+
+    samples = decode_chunk_pcm(source_audio.file.path, PEAKS_SAMPLE_RATE)
+    boundaries = find_silence_boundaries(
+        samples, PEAKS_SAMPLE_RATE, source_audio.chunk_seconds, source_audio.snap_window,
+    )
+    if not boundaries:
+        return ['-segment_time', str(source_audio.chunk_seconds)]
+    return ['-segment_times', ','.join(f'{t:.3f}' for t in boundaries)]
+
+
+CHUNK_STRATEGIES = {
+    SourceAudio.ChunkStrategy.FIXED: fixed_segment_args,
+    SourceAudio.ChunkStrategy.SILENCE: silence_segment_args,
+}
+
+
+def get_segment_args(source_audio: SourceAudio) -> list[str]:
+    """ffmpeg segment muxer options for the SourceAudio's chunking strategy."""
+    try:
+        strategy = CHUNK_STRATEGIES[source_audio.chunk_strategy]
+    except KeyError:
+        raise Exception(f"Unknown chunk strategy: {source_audio.chunk_strategy}")
+    return strategy(source_audio)
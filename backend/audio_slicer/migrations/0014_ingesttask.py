@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0013_alter_reviewcard_box_level'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('segmenting', 'Segmenting Audio'), ('registering', 'Registering Chunks'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('message', models.TextField(blank=True, default='')),
+                ('total_chunks', models.IntegerField(default=0, help_text='Number of segments produced by ffmpeg')),
+                ('registered_chunks', models.IntegerField(default=0, help_text='Number of AudioChunk rows created so far')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('source_audio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ingest_task', to='audio_slicer.sourceaudio')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0014_ingesttask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiochunk',
+            name='seek_index',
+            field=models.JSONField(blank=True, default=dict, help_text='Time -> byte offset index for slice streaming'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:41
+
+import audio_slicer.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0015_audiochunk_seek_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiochunk',
+            name='peaks',
+            field=models.FileField(blank=True, help_text='Precomputed waveform peaks (binary)', null=True, upload_to=audio_slicer.models.audio_chunk_upload_path),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0016_audiochunk_peaks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioslice',
+            name='is_draft',
+            field=models.BooleanField(db_index=True, default=False, help_text='Proposed by VAD, not yet accepted by the user'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0017_audioslice_is_draft'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourceaudio',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+    ]
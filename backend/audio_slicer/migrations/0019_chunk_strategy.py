@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:18
+
+from django.db import migrations, models
+
+
+def record_legacy_chunking(apps, schema_editor):
+    """Episodes ingested before chunk strategies existed were all cut every 60 seconds."""
+    SourceAudio = apps.get_model('audio_slicer', 'SourceAudio')
+    SourceAudio.objects.filter(chunk_seconds__isnull=True).update(chunk_seconds=60)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0018_sourceaudio_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drama',
+            name='chunk_seconds',
+            field=models.PositiveIntegerField(default=60, help_text='Default chunk length for new episodes of this drama'),
+        ),
+        migrations.AddField(
+            model_name='sourceaudio',
+            name='chunk_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text="Target chunk length, defaults to the drama's", null=True),
+        ),
+        migrations.AddField(
+            model_name='sourceaudio',
+            name='chunk_strategy',
+            field=models.CharField(choices=[('fixed', 'Fixed Length'), ('silence', 'Snap to Silence')], default='fixed', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='sourceaudio',
+            name='snap_window',
+            field=models.FloatField(default=5.0, help_text='Snap to Silence: max seconds a boundary may move'),
+        ),
+        migrations.RunPython(
+            record_legacy_chunking,
+            migrations.RunPython.noop,  # reverse: do nothing
+        ),
+    ]
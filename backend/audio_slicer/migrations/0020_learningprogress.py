@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0019_chunk_strategy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearningProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume_total_chunks', models.PositiveIntegerField(default=0, help_text="Chunk count of the resume chunk's episode")),
+                ('last_studied_at', models.DateTimeField(blank=True, null=True)),
+                ('studied_chunks', models.PositiveIntegerField(default=0)),
+                ('hard_sentences', models.PositiveIntegerField(default=0, help_text='ScriptLines with highlight=red')),
+                ('review_sentences', models.PositiveIntegerField(default=0, help_text='ScriptLines with highlight=yellow')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('resume_chunk', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='audio_slicer.audiochunk')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='learning_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0020_learningprogress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audioslice',
+            name='embedding',
+            field=models.BinaryField(blank=True, help_text='L2-normalised float32 vector', null=True),
+        ),
+        migrations.AddField(
+            model_name='audioslice',
+            name='embedding_key',
+            field=models.CharField(blank=True, default='', help_text='Backend + text digest the embedding was computed from', max_length=64),
+        ),
+    ]
@@ -5,6 +5,7 @@ import re
 class Drama(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     name = models.CharField(max_length=255, unique=True, help_text="e.g., Friends, The Office")
+    chunk_seconds = models.PositiveIntegerField(default=60, help_text="Default chunk length for new episodes of this drama")
     
     # [NEW] Cover image for Dashboard display (Retained due to historical data)
     cover_image = models.ImageField(
@@ -25,6 +26,10 @@ class AudioTag(models.Model):
         return self.name
 
 class SourceAudio(models.Model):
+    class ChunkStrategy(models.TextChoices):
+        FIXED = 'fixed', 'Fixed Length'
+        SILENCE = 'silence', 'Snap to Silence'
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     drama = models.ForeignKey(Drama, on_delete=models.PROTECT, related_name='audios')
 
@@ -33,7 +38,14 @@ class SourceAudio(models.Model):
     title = models.CharField(max_length=255, blank=True, default="", help_text="Optional title for the audio source, e.g., 'The Last One'")
 
     file = models.FileField(upload_to='audio_slicer/originals/')
+    # SHA-256 of the original; the file is stored under this hash (see services.store_original_blob)
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, help_text="SHA-256 of the uploaded file")
     uploaded_at = models.DateTimeField(auto_now_add=True)
+
+    # How the episode is cut into chunks (see chunking.CHUNK_STRATEGIES)
+    chunk_strategy = models.CharField(max_length=20, choices=ChunkStrategy.choices, default=ChunkStrategy.FIXED)
+    chunk_seconds = models.PositiveIntegerField(null=True, blank=True, help_text="Target chunk length, defaults to the drama's")
+    snap_window = models.FloatField(default=5.0, help_text="Snap to Silence: max seconds a boundary may move")
     
     # Cover image for this episode (for Dashboard display & plot recall)
     cover_image = models.ImageField(
@@ -52,11 +64,38 @@ class SourceAudio(models.Model):
     def save(self, *args, **kwargs):
         if not self.title:
             self.title = f"{self.drama.name} S{self.season} E{self.episode}"
+        if not self.chunk_seconds:
+            self.chunk_seconds = self.drama.chunk_seconds
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.drama.name} S{self.season:02d}E{self.episode:02d} - {self.title or 'Untitled'}"
 
+class IngestTask(models.Model):
+    """
+    Tracks the background ingest of a SourceAudio (ffmpeg segmentation + chunk registration).
+    Created when a SourceAudio is uploaded; updated by the Huey worker.
+    Frontend polls this to know when the chunks are ready. A failed or interrupted
+    ingest can be resumed: already-segmented files and already-registered chunks are reused.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SEGMENTING = 'segmenting', 'Segmenting Audio'
+        REGISTERING = 'registering', 'Registering Chunks'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+
+    source_audio = models.OneToOneField(SourceAudio, on_delete=models.CASCADE, related_name='ingest_task')
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    message = models.TextField(blank=True, default='')
+    total_chunks = models.IntegerField(default=0, help_text="Number of segments produced by ffmpeg")
+    registered_chunks = models.IntegerField(default=0, help_text="Number of AudioChunk rows created so far")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"IngestTask({self.source_audio}) - {self.status}"
+
 def audio_chunk_upload_path(instance, filename):
     """
     Generates a dynamic upload path for AudioChunk files.
@@ -81,6 +120,11 @@ class AudioChunk(models.Model):
     # [NEW] Progress tracking for Dashboard
     is_studied = models.BooleanField(default=False, db_index=True, help_text="已完成复习")
     last_studied_at = models.DateTimeField(null=True, blank=True, help_text="最后复习时间")
+
+    # MP3 frame offsets sampled every `step` seconds, built at ingest (see services.build_seek_index)
+    seek_index = models.JSONField(default=dict, blank=True, help_text="Time -> byte offset index for slice streaming")
+    # int8 min/max pairs per PEAKS_WINDOW_MS window, built after ingest (see services.compute_chunk_peaks)
+    peaks = models.FileField(upload_to=audio_chunk_upload_path, null=True, blank=True, help_text="Precomputed waveform peaks (binary)")
     
     class Meta:
         ordering = ['source_audio', 'chunk_index']  # Ensure consistent ordering
@@ -118,6 +162,11 @@ class AudioSlice(models.Model):
     
     is_pronunciation_hard = models.BooleanField(default=False, help_text="Mark slice as hard for pronunciation")
     is_idiom = models.BooleanField(default=False, help_text="Mark slice as containing idioms (Auto-triggers ReviewCard creation)")
+    is_draft = models.BooleanField(default=False, db_index=True, help_text="Proposed by VAD, not yet accepted by the user")
+
+    # Precomputed embedding of original_text for script line matching (scripts/embeddings.py)
+    embedding = models.BinaryField(null=True, blank=True, help_text="L2-normalised float32 vector")
+    embedding_key = models.CharField(max_length=64, blank=True, default='', help_text="Backend + text digest the embedding was computed from")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -169,3 +218,29 @@ class ReviewCard(models.Model):
 
     def __str__(self):
         return f"Review ({self.review_type}) for {self.audio_slice} - Level {self.box_level}"
+
+
+class LearningProgress(models.Model):
+    """
+    Per-user dashboard aggregate, so resume/stats are answered from one row.
+
+    Maintained incrementally by services.record_chunk_completed / record_highlight_change.
+    Bulk changes (chunk registration, script re-ingest, episode deletion) just drop the row; it is rebuilt
+    from the source tables on the next dashboard read (services.rebuild_learning_progress).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='learning_progress')
+
+    # --- Resume ---
+    resume_chunk = models.ForeignKey(AudioChunk, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    resume_total_chunks = models.PositiveIntegerField(default=0, help_text="Chunk count of the resume chunk's episode")
+    last_studied_at = models.DateTimeField(null=True, blank=True)
+
+    # --- Stats ---
+    studied_chunks = models.PositiveIntegerField(default=0)
+    hard_sentences = models.PositiveIntegerField(default=0, help_text="ScriptLines with highlight=red")
+    review_sentences = models.PositiveIntegerField(default=0, help_text="ScriptLines with highlight=yellow")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"LearningProgress({self.user}) - {self.studied_chunks} chunks studied"
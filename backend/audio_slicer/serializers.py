@@ -1,11 +1,12 @@
 from rest_framework import serializers
 from .models import SourceAudio, AudioChunk, AudioSlice, Drama, ReviewCard
+from .services import get_slice_stream_url
 
 class SourceAudioSerializer(serializers.ModelSerializer):
     class Meta:
         model = SourceAudio
         fields = '__all__'
-        read_only_fields = ['user', 'uploaded_at']
+        read_only_fields = ['user', 'uploaded_at', 'content_hash']
 
 class AudioChunkSerializer(serializers.ModelSerializer):
     title = serializers.CharField(source='source_audio.title', read_only=True)
@@ -20,11 +21,26 @@ class AudioSliceSerializer(serializers.ModelSerializer):
         model = AudioSlice
         fields = ['id', 'audio_chunk', 'start_time', 'end_time', 'original_text', 
                   'translation', 'highlights', 'is_pronunciation_hard', 'is_idiom', 
-                  'created_at', 'updated_at']
-        read_only_fields = ['created_at', 'updated_at']
+                  'is_draft', 'created_at', 'updated_at']
+        read_only_fields = ['is_draft', 'created_at', 'updated_at']
         # Disable unique_together validators - we use update_or_create in batch view
         validators = []
 
+class AudioSliceBatchItemSerializer(serializers.Serializer):
+    """
+    One item of AudioSliceViewSet.create_batch.
+    audio_chunk is kept as a raw ID (no per-item lookup) so the whole batch
+    is resolved and ownership-checked with a single query.
+    """
+    id = serializers.IntegerField(required=False, allow_null=True)
+    audio_chunk = serializers.IntegerField()
+    start_time = serializers.FloatField()
+    end_time = serializers.FloatField()
+    original_text = serializers.CharField(required=False, allow_blank=True, default='')
+    highlights = serializers.JSONField(required=False, default=list)
+    is_pronunciation_hard = serializers.BooleanField(required=False, default=False)
+    is_idiom = serializers.BooleanField(required=False, default=False)
+
 class DramaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Drama
@@ -37,9 +53,14 @@ class ReviewCardSerializer(serializers.ModelSerializer):
     audio_url = serializers.FileField(source='audio_slice.audio_chunk.file', read_only=True)
     start_time = serializers.FloatField(source='audio_slice.start_time', read_only=True)
     end_time = serializers.FloatField(source='audio_slice.end_time', read_only=True)
+    # Only the slice's own bytes (times restart at 0), see AudioSliceViewSet.stream
+    slice_audio_url = serializers.SerializerMethodField()
 
     class Meta:
         model = ReviewCard
         fields = ['id', 'box_level', 'next_review_date', 'last_reviewed_at', 'review_type', 
-                  'slice_text', 'slice_translation', 'audio_url', 'start_time', 'end_time', 'audio_slice']
-        read_only_fields = ['box_level', 'next_review_date', 'last_reviewed_at', 'review_type', 'audio_slice']
\ No newline at end of file
+                  'slice_text', 'slice_translation', 'audio_url', 'slice_audio_url', 'start_time', 'end_time', 'audio_slice']
+        read_only_fields = ['box_level', 'next_review_date', 'last_reviewed_at', 'review_type', 'audio_slice']
+
+    def get_slice_audio_url(self, obj):
+        return get_slice_stream_url(obj.audio_slice, self.context.get('request'))
\ No newline at end of file
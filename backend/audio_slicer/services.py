@@ -1,13 +1,26 @@
 import os
+import math
+import hashlib
 import uuid
+import shutil
 import subprocess
 import tempfile
 from pathlib import Path
 
 from django.conf import settings
+from django.core import signing
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.urls import reverse
 
-from .models import SourceAudio, AudioChunk, AudioSlice
+from .models import (
+    SourceAudio, AudioChunk, AudioSlice, ReviewCard, IngestTask, LearningProgress, audio_chunk_upload_path,
+)
+from .chunking import get_segment_args
 
 # def slice_audio(source_audio: SourceAudio, start_time: str, end_time: str) -> str:
 #     """
@@ -65,23 +78,125 @@ from .models import SourceAudio, AudioChunk, AudioSlice
 #         print(f"ffmpeg stderr: {e.stderr}")
 #         return None
 
-def slice_source_to_chunks(source_audio: SourceAudio):
+# ============ Content-Addressed Originals ============
+
+ORIGINALS_BLOB_DIR = 'audio_slicer/originals'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(f) -> str:
+    """SHA-256 of a file-like object, read chunk by chunk."""
+    sha256 = hashlib.sha256()
+    if hasattr(f, 'chunks'):
+        for block in f.chunks(HASH_CHUNK_SIZE):
+            sha256.update(block)
+    else:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def original_blob_name(content_hash: str, filename: str) -> str:
+    """e.g., audio_slicer/originals/3f/3fa2...e1.mp3"""
+    ext = Path(filename).suffix.lower()
+    return f'{ORIGINALS_BLOB_DIR}/{content_hash[:2]}/{content_hash}{ext}'
+
+
+def store_original_blob(uploaded_file, content_hash: str) -> str:
     """
-    Slices a SourceAudio file into 60-second AudioChunks using ffmpeg.
+    Store an uploaded original under its content hash.
+    Identical bytes are only ever stored once: if the blob exists, the upload is dropped.
+
+    Returns:
+        The storage name to assign to SourceAudio.file
     """
-    source_file_path = source_audio.file.path
+    name = original_blob_name(content_hash, uploaded_file.name)
+    if default_storage.exists(name):
+        return name
+    # FileSystemStorage moves a temporary upload into place instead of copying it
+    return default_storage.save(name, uploaded_file)
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        output_pattern = os.path.join(temp_dir, 'chunk_%03d.mp3')
+
+def find_ingested_twin(source_audio: SourceAudio):
+    """Another SourceAudio with identical bytes and chunking whose ingest completed, or None."""
+    if not source_audio.content_hash:
+        return None
+    return SourceAudio.objects.filter(
+        content_hash=source_audio.content_hash,
+        chunk_strategy=source_audio.chunk_strategy,
+        chunk_seconds=source_audio.chunk_seconds,
+        snap_window=source_audio.snap_window,
+        ingest_task__status=IngestTask.Status.COMPLETED,
+    ).exclude(id=source_audio.id).first()
+
+
+def clone_chunks(source_audio: SourceAudio, twin: SourceAudio) -> int:
+    """
+    Give source_audio the chunks of an identical, already-ingested twin.
+    The rows are new but point at the twin's chunk files, seek indexes and peaks: no ffmpeg, no copies.
+
+    Returns:
+        Number of AudioChunk rows created
+    """
+    existing = set(source_audio.chunks.values_list('chunk_index', flat=True))
+    new_chunks = [
+        AudioChunk(
+            source_audio=source_audio,
+            chunk_index=chunk.chunk_index,
+            file=chunk.file.name,
+            seek_index=chunk.seek_index,
+            peaks=chunk.peaks.name or None,
+        )
+        for chunk in twin.chunks.all()
+        if chunk.chunk_index not in existing
+    ]
+    with transaction.atomic():
+        AudioChunk.objects.bulk_create(new_chunks)
+    return len(new_chunks)
+
+
+# ============ Episode Ingest (ffmpeg segmentation) ============
+
+INGEST_STAGING_DIR = 'audio_slicer/ingest'
+SEGMENT_DONE_MARKER = '.segmented'
+
+
+def get_ingest_staging_dir(source_audio: SourceAudio) -> Path:
+    """
+    Working directory where ffmpeg writes the segments of a SourceAudio.
+    Lives under MEDIA_ROOT (not a TemporaryDirectory) so an interrupted ingest can be resumed.
+    """
+    return Path(settings.MEDIA_ROOT) / INGEST_STAGING_DIR / str(source_audio.id)
+
+
+def segment_source_audio(source_audio: SourceAudio, output_dir: Path) -> list[Path]:
+    """
+    Segments a SourceAudio file into mp3 chunks inside output_dir using ffmpeg.
+    Where it cuts is decided by the SourceAudio's chunk strategy (see chunking.py);
+    segments are stream-copied, never re-encoded.
+
+    If a previous run already finished segmenting (marker file present), the existing
+    segments are reused and ffmpeg is not run again.
+
+    :return: Sorted list of segment paths (chunk_000.mp3, chunk_001.mp3, ...).
+    """
+    output_dir = Path(output_dir)
+    marker = output_dir / SEGMENT_DONE_MARKER
+
+    if not marker.exists():
+        # Half-written segments from an interrupted run are not trustworthy, start clean
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
         try:
             command = [
                 'ffmpeg',
-                '-i', source_file_path,
+                '-i', source_audio.file.path,
                 '-f', 'segment',
-                '-segment_time', '60',
+                *get_segment_args(source_audio),
                 '-c', 'copy',
-                output_pattern
+                str(output_dir / 'chunk_%03d.mp3')
             ]
             subprocess.run(command, check=True, capture_output=True, text=True)
         except FileNotFoundError:
@@ -89,14 +204,523 @@ def slice_source_to_chunks(source_audio: SourceAudio):
         except subprocess.CalledProcessError as e:
             raise Exception(f"ffmpeg processing failed: {e.stderr}")
 
-        chunk_files = sorted(Path(temp_dir).glob('chunk_*.mp3'))
-        for i, chunk_path in enumerate(chunk_files):
-            with open(chunk_path, 'rb') as f:
-                AudioChunk.objects.create(
-                    source_audio=source_audio,
-                    chunk_index=i + 1,
-                    file=File(f, name=chunk_path.name)
-                )
+        marker.touch()
+
+    return sorted(output_dir.glob('chunk_*.mp3'))
+
+
+def _chunk_index_from_path(chunk_path: Path) -> int:
+    """chunk_000.mp3 -> 1 (chunk_index is 1-based, ffmpeg numbering is 0-based)."""
+    return int(chunk_path.stem.rsplit('_', 1)[-1]) + 1
+
+
+def _place_segment(chunk: AudioChunk, chunk_path: Path) -> str:
+    """
+    Puts a staged segment at its final MEDIA_ROOT location without copying it.
+
+    The segment is hard-linked to the path audio_chunk_upload_path() would give it
+    (falls back to a copy if the filesystem can't link). The staged file stays
+    in place until the rows are committed, so an interrupted ingest loses nothing.
+
+    :return: The storage name to store on AudioChunk.file.
+    """
+    storage = chunk.file.storage
+    name = audio_chunk_upload_path(chunk, chunk_path.name)
+    final_path = Path(storage.path(name))
+
+    if final_path.exists():
+        if final_path.samefile(chunk_path):
+            # Linked by a previous, interrupted run
+            return name
+        name = storage.get_available_name(name)
+        final_path = Path(storage.path(name))
+
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(chunk_path, final_path)
+    except OSError:
+        shutil.copyfile(chunk_path, final_path)
+    return name
+
+
+def register_chunks(source_audio: SourceAudio, chunk_paths: list[Path]) -> int:
+    """
+    Creates the AudioChunk rows for the given segments in a single transaction.
+    Segments whose chunk_index is already registered (resumed ingest) are skipped.
+
+    With settings.AUDIO_CHUNK_STORAGE_MODE == 'direct' (default) the segments are
+    linked into place and AudioChunk.file just points at them. 'copy' streams each
+    segment through the storage API instead (needed for non-filesystem storages).
+
+    :return: Number of newly created chunks.
+    """
+    existing_indexes = set(
+        AudioChunk.objects.filter(source_audio=source_audio).values_list('chunk_index', flat=True)
+    )
+    direct = getattr(settings, 'AUDIO_CHUNK_STORAGE_MODE', 'direct') == 'direct'
+
+    handles = []
+    new_chunks = []
+    try:
+        for chunk_path in chunk_paths:
+            chunk_index = _chunk_index_from_path(chunk_path)
+            if chunk_index in existing_indexes:
+                continue
+            chunk = AudioChunk(
+                source_audio=source_audio,
+                chunk_index=chunk_index,
+                seek_index=build_seek_index(chunk_path)
+            )
+            if direct:
+                chunk.file.name = _place_segment(chunk, chunk_path)
+            else:
+                f = open(chunk_path, 'rb')
+                handles.append(f)
+                chunk.file = File(f, name=chunk_path.name)
+            new_chunks.append(chunk)
+
+        with transaction.atomic():
+            AudioChunk.objects.bulk_create(new_chunks)
+    finally:
+        for f in handles:
+            f.close()
+
+    return len(new_chunks)
+
+
+def slice_source_to_chunks(source_audio: SourceAudio):
+    """
+    Slices a SourceAudio file into 60-second AudioChunks using ffmpeg (synchronously).
+    Uploads go through the background ingest task (audio_slicer.tasks.ingest_source_audio) instead.
+    """
+    staging_dir = get_ingest_staging_dir(source_audio)
+    chunk_paths = segment_source_audio(source_audio, staging_dir)
+    register_chunks(source_audio, chunk_paths)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+# ============ Waveform Peaks ============
+
+PEAKS_SAMPLE_RATE = 8000  # Hz, plenty for drawing a waveform
+PEAKS_WINDOW_MS = 10      # one min/max pair per window
+
+
+def decode_chunk_pcm(chunk_path, sample_rate: int = PEAKS_SAMPLE_RATE):
+    """Decodes a chunk to mono 16-bit PCM with ffmpeg (piped, nothing written to disk)."""
+    import numpy as np
+
+    command = [
+        'ffmpeg',
+        '-i', str(chunk_path),
+        '-f', 's16le',
+        '-ac', '1',
+        '-ar', str(sample_rate),
+        '-'
+    ]
+    try:
+        result = subprocess.run(command, check=True, capture_output=True)
+    except FileNotFoundError:
+        raise Exception("ffmpeg is not installed or not in the system's PATH.")
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"ffmpeg decoding failed: {e.stderr.decode(errors='replace')}")
+
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+
+def compute_peaks(samples, sample_rate: int = PEAKS_SAMPLE_RATE, window_ms: int = PEAKS_WINDOW_MS) -> bytes:
+    """
+    Reduces PCM samples to interleaved int8 [min0, max0, min1, max1, ...] per window.
+    60s of audio at 10ms windows -> 12 KB.
+    """
+    import numpy as np
+
+    window = max(1, sample_rate * window_ms // 1000)
+    if len(samples) == 0:
+        return b''
+
+    # Pad the tail with silence so the samples reshape into whole windows
+    padded = np.zeros(-(-len(samples) // window) * window, dtype=np.int16)
+    padded[:len(samples)] = samples
+    frames = padded.reshape(-1, window)
+
+    # int16 -> int8 by keeping the high byte
+    mins = (frames.min(axis=1) >> 8).astype(np.int8)
+    maxs = (frames.max(axis=1) >> 8).astype(np.int8)
+    return np.column_stack((mins, maxs)).tobytes()
+
+
+def compute_chunk_peaks(chunk: AudioChunk, samples=None) -> None:
+    """
+    Stores the chunk's peaks file on AudioChunk.peaks.
+    Pass already-decoded samples (decode_chunk_pcm) to avoid decoding twice.
+    """
+    if samples is None:
+        samples = decode_chunk_pcm(chunk.file.path)
+    name = f"{Path(chunk.file.name).stem}.peaks"
+    chunk.peaks.save(name, ContentFile(compute_peaks(samples)), save=False)
+    chunk.save(update_fields=['peaks'])
+
+
+# ============ Slice Proposals (VAD) ============
+
+def propose_chunk_slices(chunk: AudioChunk, samples=None) -> list[AudioSlice]:
+    """
+    Replaces the chunk's draft slices with fresh VAD proposals.
+
+    Voiced ranges overlapping a slice the user already saved are skipped, so
+    proposals only fill the gaps. Drafts become real slices via accept_drafts
+    (or by saving them through create_batch).
+    """
+    from .vad import detect_voice_ranges
+
+    if samples is None:
+        samples = decode_chunk_pcm(chunk.file.path)
+    ranges = detect_voice_ranges(samples, PEAKS_SAMPLE_RATE)
+
+    with transaction.atomic():
+        AudioSlice.objects.filter(audio_chunk=chunk, is_draft=True).delete()
+        taken = list(
+            AudioSlice.objects.filter(audio_chunk=chunk).values_list('start_time', 'end_time')
+        )
+        drafts = [
+            AudioSlice(audio_chunk=chunk, start_time=start, end_time=end, is_draft=True)
+            for start, end in ranges
+            if not any(start < t_end and t_start < end for t_start, t_end in taken)
+        ]
+        AudioSlice.objects.bulk_create(drafts)
+    return drafts
+
+
+# ============ Slice Batch Save ============
+
+SLICE_BATCH_FIELDS = ['start_time', 'end_time', 'original_text', 'highlights', 'is_pronunciation_hard', 'is_idiom']
+
+
+def build_review_card(audio_slice: AudioSlice, user) -> ReviewCard:
+    """
+    Unsaved ReviewCard for an idiom slice, scheduled for immediate review (next_review_date = today).
+    """
+    # Determine review type based on translation availability
+    # (Though logic can be dynamic in frontend, we set a reasonable default here)
+    review_type = 'translation' if audio_slice.translation else 'listening'
+    return ReviewCard(
+        audio_slice=audio_slice,
+        user=user,
+        next_review_date=timezone.now().date(),  # Due immediately
+        review_type=review_type
+    )
+
+
+def save_slices_batch(user, items: list[dict]) -> tuple[list[AudioSlice], list[str]]:
+    """
+    Creates or updates a batch of AudioSlices (AudioSliceBatchItemSerializer data) in one transaction.
+
+    Each item is matched to an existing slice by `id` if given, else by (chunk, start_time, end_time).
+    Costs a fixed number of queries regardless of batch size: one ownership-checked chunk fetch,
+    one slice fetch, bulk_create + bulk_update, one has_slices update and the ReviewCard bulk insert
+    for new idioms (bulk writes skip the post_save signal, so cards are created here).
+
+    :return: (saved slices in input order, error messages for rejected items)
+    """
+    chunk_ids = {item['audio_chunk'] for item in items}
+    slice_ids = {item['id'] for item in items if item.get('id')}
+
+    # 1 query: only chunks owned by the user come back
+    chunks = AudioChunk.objects.filter(id__in=chunk_ids, source_audio__user=user).in_bulk()
+
+    # 1 query: every slice an item could refer to
+    existing = AudioSlice.objects.filter(audio_chunk__source_audio__user=user).filter(
+        Q(audio_chunk_id__in=chunks.keys()) | Q(id__in=slice_ids)
+    )
+    by_id = {s.id: s for s in existing}
+    by_time = {(s.audio_chunk_id, s.start_time, s.end_time): s for s in by_id.values()}
+
+    saved, errors = [], []
+    to_create, to_update = [], {}
+    for item in items:
+        chunk = chunks.get(item['audio_chunk'])
+        if chunk is None:
+            errors.append(f"Unauthorized: chunk {item['audio_chunk']} does not belong to current user")
+            continue
+
+        time_key = (chunk.id, item['start_time'], item['end_time'])
+        slice_obj = by_id.get(item.get('id')) or by_time.get(time_key)
+        if slice_obj is None:
+            slice_obj = AudioSlice(audio_chunk=chunk)
+            to_create.append(slice_obj)
+        elif slice_obj.pk:
+            to_update[slice_obj.pk] = slice_obj
+
+        slice_obj.audio_chunk = chunk
+        slice_obj.is_draft = False  # Saving a proposed slice accepts it
+        for field in SLICE_BATCH_FIELDS:
+            setattr(slice_obj, field, item.get(field, getattr(slice_obj, field)))
+        by_time[time_key] = slice_obj  # Later duplicates in the same batch update this object
+        saved.append(slice_obj)
+
+    now = timezone.now()
+    for slice_obj in to_update.values():
+        slice_obj.updated_at = now  # bulk_update doesn't apply auto_now
+
+    with transaction.atomic():
+        AudioSlice.objects.bulk_create(to_create)
+        AudioSlice.objects.bulk_update(
+            list(to_update.values()), SLICE_BATCH_FIELDS + ['audio_chunk', 'is_draft', 'updated_at']
+        )
+
+        touched_chunk_ids = {s.audio_chunk_id for s in saved}
+        AudioChunk.objects.filter(id__in=touched_chunk_ids, has_slices=False).update(has_slices=True)
+
+        idioms = {s.id: s for s in saved if s.is_idiom}
+        if idioms:
+            has_card = set(
+                ReviewCard.objects.filter(audio_slice_id__in=idioms.keys()).values_list('audio_slice_id', flat=True)
+            )
+            ReviewCard.objects.bulk_create([
+                build_review_card(s, user) for slice_id, s in idioms.items() if slice_id not in has_card
+            ])
+
+    # Deduplicate (same slice listed twice) while keeping input order
+    return list(dict.fromkeys(saved)), errors
+
+
+# ============ Slice Streaming (MP3 seek index) ============
+
+SEEK_INDEX_STEP = 0.1  # seconds between index entries
+SLICE_STREAM_SALT = 'audio_slicer.slice_stream'
+
+# Layer III bitrates (kbps) by MPEG version: 1 = MPEG-1, 2 = MPEG-2 / 2.5
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_MP3_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),
+    2: (22050, 24000, 16000),
+    3: (44100, 48000, 32000),
+}
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Returns the offset of the first byte after an ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    # Tag size is a 28-bit "synchsafe" integer (7 bits per byte)
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _parse_mp3_frame_header(data: bytes, pos: int):
+    """
+    Parses the MPEG Layer III frame header at pos.
+
+    :return: (frame_length_bytes, frame_duration_seconds), or None if pos is not a valid header.
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (data[pos + 1] >> 3) & 0x03
+    layer_bits = (data[pos + 1] >> 1) & 0x03
+    bitrate_idx = data[pos + 2] >> 4
+    sample_rate_idx = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+
+    if version_bits == 1 or layer_bits != 1:  # reserved version / not Layer III
+        return None
+    if bitrate_idx in (0, 15) or sample_rate_idx == 3:  # free-format / bad values
+        return None
+
+    is_mpeg1 = version_bits == 3
+    bitrate = _MP3_BITRATES[1 if is_mpeg1 else 2][bitrate_idx] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_idx]
+    samples = 1152 if is_mpeg1 else 576
+
+    frame_length = (samples // 8) * bitrate // sample_rate + padding
+    return frame_length, samples / sample_rate
+
+
+def build_seek_index(chunk_path, step: float = SEEK_INDEX_STEP) -> dict:
+    """
+    Walks the MP3 frames of a chunk file and records, every `step` seconds,
+    the byte offset of the frame playing at that time.
+
+    Returns:
+        {'step': 0.1, 'offsets': [417, 1253, ...], 'duration': 60.003, 'size': 960417}
+    """
+    data = Path(chunk_path).read_bytes()
+    pos = _skip_id3v2(data)
+
+    offsets = []
+    elapsed = 0.0
+    while pos < len(data):
+        header = _parse_mp3_frame_header(data, pos)
+        if header is None:
+            pos += 1  # Resync on garbage between frames
+            continue
+        frame_length, frame_duration = header
+        # Every index mark that falls inside this frame points at it
+        while len(offsets) * step < elapsed + frame_duration:
+            offsets.append(pos)
+        elapsed += frame_duration
+        pos += frame_length
+
+    return {
+        'step': step,
+        'offsets': offsets,
+        'duration': round(elapsed, 3),
+        'size': len(data),
+    }
+
+
+def get_seek_index(chunk: AudioChunk) -> dict:
+    """Returns the chunk's seek index, building and saving it for chunks ingested before it existed."""
+    if not chunk.seek_index:
+        chunk.seek_index = build_seek_index(chunk.file.path)
+        chunk.save(update_fields=['seek_index'])
+    return chunk.seek_index
+
+
+def get_slice_byte_range(chunk: AudioChunk, start_time: float, end_time: float) -> tuple[int, int]:
+    """
+    Maps a [start_time, end_time] window of a chunk to a [first_byte, end_byte) range of
+    whole MP3 frames, using the seek index (no decoding).
+    """
+    index = get_seek_index(chunk)
+    offsets = index['offsets']
+    step = index['step']
+    if not offsets:
+        return 0, index['size']
+
+    start_mark = max(0, int(start_time / step))
+    end_mark = int(math.ceil(end_time / step))
+
+    first_byte = offsets[min(start_mark, len(offsets) - 1)]
+    end_byte = offsets[end_mark] if end_mark < len(offsets) else index['size']
+    return first_byte, max(first_byte, end_byte)
+
+
+def make_slice_stream_token(audio_slice: AudioSlice) -> str:
+    """Signed, unguessable token so <audio> elements can fetch a slice without auth headers."""
+    return signing.Signer(salt=SLICE_STREAM_SALT).sign(str(audio_slice.id))
+
+
+def read_slice_stream_token(token: str) -> int:
+    """Returns the slice ID from a stream token. Raises signing.BadSignature if tampered."""
+    return int(signing.Signer(salt=SLICE_STREAM_SALT).unsign(token))
+
+
+def get_slice_stream_url(audio_slice: AudioSlice, request=None) -> str:
+    """
+    URL that streams only the bytes of this slice (see AudioSliceViewSet.stream).
+    The updated_at version busts client caches when the slice times change.
+    """
+    url = reverse('audioslice-stream', kwargs={'token': make_slice_stream_token(audio_slice)})
+    url = f"{url}?v={int(audio_slice.updated_at.timestamp())}"
+    return request.build_absolute_uri(url) if request else url
+
+
+# ============ Learning Progress (Dashboard) ============
+
+HIGHLIGHT_COUNTERS = {'red': 'hard_sentences', 'yellow': 'review_sentences'}
+
+
+def rebuild_learning_progress(user) -> LearningProgress:
+    """
+    Recompute a user's LearningProgress from the source tables (slow path).
+
+    Resume logic: the chunk after the most recently studied one (or that chunk itself
+    if it was the episode's last); with nothing studied, the first chunk of the first episode.
+    """
+    from scripts.models import ScriptLine
+
+    last_studied = AudioChunk.objects.filter(
+        source_audio__user=user, is_studied=True
+    ).order_by('-last_studied_at').first()
+
+    if last_studied:
+        next_chunk = AudioChunk.objects.filter(
+            source_audio_id=last_studied.source_audio_id,
+            chunk_index__gt=last_studied.chunk_index
+        ).order_by('chunk_index').first()
+        resume_chunk = next_chunk or last_studied
+    else:
+        resume_chunk = AudioChunk.objects.filter(
+            source_audio__user=user
+        ).order_by('source_audio__id', 'chunk_index').first()
+
+    counts = ScriptLine.objects.filter(user=user).aggregate(
+        hard=Count('id', filter=Q(highlight='red')),
+        review=Count('id', filter=Q(highlight='yellow')),
+    )
+
+    progress, _ = LearningProgress.objects.update_or_create(user=user, defaults={
+        'resume_chunk': resume_chunk,
+        'resume_total_chunks': (
+            AudioChunk.objects.filter(source_audio_id=resume_chunk.source_audio_id).count()
+            if resume_chunk else 0
+        ),
+        'last_studied_at': last_studied.last_studied_at if last_studied else None,
+        'studied_chunks': AudioChunk.objects.filter(source_audio__user=user, is_studied=True).count(),
+        'hard_sentences': counts['hard'],
+        'review_sentences': counts['review'],
+    })
+    return progress
+
+
+def get_learning_progress(user) -> LearningProgress:
+    """
+    The user's LearningProgress with resume_chunk -> source_audio -> drama joined in (one query).
+    Built on first access, or when the resume chunk is gone. A user without any chunks
+    keeps a row with no resume chunk (resume_total_chunks=0) until an ingest drops it.
+    """
+    progress = LearningProgress.objects.select_related(
+        'resume_chunk__source_audio__drama'
+    ).filter(user=user).first()
+
+    # resume_chunk nulled by on_delete=SET_NULL: its episode still counted chunks at build time
+    if progress is None or (progress.resume_chunk_id is None and progress.resume_total_chunks):
+        rebuild_learning_progress(user)
+        progress = LearningProgress.objects.select_related(
+            'resume_chunk__source_audio__drama'
+        ).get(user=user)
+    return progress
+
+
+def record_chunk_completed(user, chunk: AudioChunk, next_chunk, total_chunks: int, newly_studied: bool) -> None:
+    """Fold one AudioChunkViewSet.complete into the user's LearningProgress (single UPDATE)."""
+    # No row yet: nothing to maintain, the first dashboard read builds it from scratch
+    LearningProgress.objects.filter(user=user).update(
+        resume_chunk=next_chunk or chunk,
+        resume_total_chunks=total_chunks,
+        last_studied_at=chunk.last_studied_at,
+        studied_chunks=F('studied_chunks') + (1 if newly_studied else 0),
+    )
+
+
+def record_highlight_change(user, old: str, new: str) -> None:
+    """Move one ScriptLine between the hard/review counters (single UPDATE); the Blitz highlight index is dropped."""
+    if old == new:
+        return
+    changes = {}
+    if old in HIGHLIGHT_COUNTERS:
+        changes[HIGHLIGHT_COUNTERS[old]] = F(HIGHLIGHT_COUNTERS[old]) - 1
+    if new in HIGHLIGHT_COUNTERS:
+        changes[HIGHLIGHT_COUNTERS[new]] = F(HIGHLIGHT_COUNTERS[new]) + 1
+    if changes:
+        LearningProgress.objects.filter(user=user).update(**changes)
+
+    from scripts.blitz import invalidate_highlight_index
+    invalidate_highlight_index(user)
+
+
+def invalidate_learning_progress(user) -> None:
+    """Drop the aggregate (and the Blitz highlight index) after a bulk change; the next read rebuilds it."""
+    LearningProgress.objects.filter(user=user).delete()
+
+    from scripts.blitz import invalidate_highlight_index
+    invalidate_highlight_index(user)
+
 
 def slice_chunk_to_slice(chunk: AudioChunk, start_time: float, end_time: float, original_text: str, notes: str, tags: list) -> 'AudioSlice':
     """
@@ -1,8 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.utils import timezone
-from .models import AudioSlice, ReviewCard, SourceAudio
-from .services import slice_source_to_chunks
+from django.db import transaction
+from .models import AudioSlice, SourceAudio, IngestTask
+from .tasks import ingest_source_audio
+from .services import build_review_card, invalidate_learning_progress
 
 @receiver(post_save, sender=AudioSlice)
 def create_review_card_if_idiom(sender, instance, created, **kwargs):
@@ -13,35 +14,42 @@ def create_review_card_if_idiom(sender, instance, created, **kwargs):
     if instance.is_idiom:
         # Check if card already exists
         if not hasattr(instance, 'review_card'):
-            # Determine review type based on translation availability
-            # (Though logic can be dynamic in frontend, we set a reasonable default here)
-            review_type = 'translation' if instance.translation else 'listening'
-            
-            ReviewCard.objects.create(
-                audio_slice=instance,
-                user=instance.audio_chunk.source_audio.user, # Inherit owner from parent Audio -> Source
-                next_review_date=timezone.now().date(),      # Due immediately
-                review_type=review_type
-            )
+            # Inherit owner from parent Audio -> Source
+            build_review_card(instance, instance.audio_chunk.source_audio.user).save()
+
+@receiver(post_save, sender=AudioSlice)
+def schedule_slice_embedding(sender, instance, created, **kwargs):
+    """
+    Keep the episode's precomputed embeddings (script line matching) current.
+    The task only re-embeds rows whose text changed, so re-saves are cheap.
+    """
+    if instance.is_draft:
+        return
+    from scripts.tasks import precompute_episode_embeddings
+    source_audio_id = instance.audio_chunk.source_audio_id
+    transaction.on_commit(lambda: precompute_episode_embeddings(source_audio_id))
 
 @receiver(post_save, sender=SourceAudio)
 def trigger_audio_slicing(sender, instance, created, **kwargs):
     """
-    Trigger the slicing process when a SourceAudio is created (uploaded).
-    After slicing, schedule a background task to ingest and translate the script.
+    Queue the background ingest when a SourceAudio is created (uploaded).
+    Segmentation, chunk registration and the script ingest + translate task
+    all run in the Huey worker, so the upload request returns immediately.
     """
     if created:
-        print(f"Triggering slice logic for SourceAudio: {instance.id}")
-        slice_source_to_chunks(instance)
-
-        # Schedule background script ingest + translate task
-        from scripts.models import ScriptTask
-        from scripts.tasks import ingest_and_translate_script
-
-        script_task = ScriptTask.objects.create(
+        ingest_task = IngestTask.objects.create(
             source_audio=instance,
-            status='pending',
             message=f'Queued for S{instance.season:02d}E{instance.episode:02d}',
         )
-        ingest_and_translate_script(script_task.id)
-        print(f"Scheduled script ingest+translate task #{script_task.id} for SourceAudio: {instance.id}")
+        # Enqueue after commit so the worker never sees a missing row
+        transaction.on_commit(lambda: ingest_source_audio(ingest_task.id))
+        print(f"Scheduled ingest task #{ingest_task.id} for SourceAudio: {instance.id}")
+
+@receiver(post_delete, sender=SourceAudio)
+def invalidate_progress_on_episode_delete(sender, instance, **kwargs):
+    """
+    Deleting an episode cascades to its chunks and script lines, which the dashboard
+    aggregate counts. Drop the aggregate so it is rebuilt on the next dashboard read.
+    """
+    if instance.user_id:
+        invalidate_learning_progress(instance.user_id)
@@ -0,0 +1,136 @@
+"""
+Huey background tasks for audio processing.
+Handles episode ingest (ffmpeg segmentation + AudioChunk registration) off the upload request.
+"""
+import shutil
+import logging
+from huey.contrib.djhuey import db_task
+
+logger = logging.getLogger(__name__)
+
+
+@db_task()
+def ingest_source_audio(ingest_task_id):
+    """
+    Background task: segment an uploaded SourceAudio into chunks, then schedule the script ingest.
+
+    Steps:
+    0. If identical bytes were already ingested (same content hash), reuse their chunks and skip 1-2
+    1. Segment the original with ffmpeg into the staging dir (skipped if already done)
+    2. Bulk-insert the missing AudioChunk rows in one transaction
+    3. Schedule the chunk analysis (peaks + slice proposals) and script ingest + translate tasks
+    Progress is recorded on the IngestTask row throughout. Re-running the task on a
+    failed/interrupted ingest resumes from the last completed stage.
+
+    Args:
+        ingest_task_id: ID of the IngestTask record to track progress
+    """
+    from .models import IngestTask
+    from .services import (
+        get_ingest_staging_dir, segment_source_audio, register_chunks,
+        find_ingested_twin, clone_chunks, invalidate_learning_progress,
+    )
+
+    try:
+        ingest_task = IngestTask.objects.select_related('source_audio').get(id=ingest_task_id)
+    except IngestTask.DoesNotExist:
+        logger.error(f"IngestTask {ingest_task_id} not found")
+        return
+
+    if ingest_task.status == IngestTask.Status.COMPLETED:
+        return
+
+    source_audio = ingest_task.source_audio
+    staging_dir = get_ingest_staging_dir(source_audio)
+
+    try:
+        twin = find_ingested_twin(source_audio)
+        if twin:
+            # ========== Identical upload: share the twin's chunks ==========
+            ingest_task.status = IngestTask.Status.REGISTERING
+            ingest_task.message = f'Identical audio already ingested ({twin}), reusing its chunks...'
+            ingest_task.save()
+
+            created = clone_chunks(source_audio, twin)
+        else:
+            # ========== Phase 1: Segment ==========
+            ingest_task.status = IngestTask.Status.SEGMENTING
+            ingest_task.message = f'Segmenting S{source_audio.season:02d}E{source_audio.episode:02d}...'
+            ingest_task.save()
+
+            chunk_paths = segment_source_audio(source_audio, staging_dir)
+            if not chunk_paths:
+                raise Exception('ffmpeg produced no segments.')
+
+            # ========== Phase 2: Register chunks ==========
+            ingest_task.status = IngestTask.Status.REGISTERING
+            ingest_task.total_chunks = len(chunk_paths)
+            ingest_task.message = f'Registering {len(chunk_paths)} chunks...'
+            ingest_task.save()
+
+            created = register_chunks(source_audio, chunk_paths)
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        # A user's first chunks give the dashboard a resume point: rebuild it on next read
+        invalidate_learning_progress(source_audio.user)
+
+        ingest_task.status = IngestTask.Status.COMPLETED
+        ingest_task.registered_chunks = source_audio.chunks.count()
+        ingest_task.total_chunks = ingest_task.registered_chunks
+        ingest_task.message = f'Done! {ingest_task.registered_chunks} chunks ready ({created} new).'
+        ingest_task.save()
+
+    except Exception as e:
+        logger.exception(f"[IngestTask {ingest_task_id}] Ingest failed: {e}")
+        ingest_task.status = IngestTask.Status.FAILED
+        ingest_task.message = f'Ingest failed: {str(e)}'
+        ingest_task.save()
+        return
+
+    # Waveforms and slice proposals are only needed by the slicer UI, compute them alongside the script ingest
+    analyze_source_chunks(source_audio.id)
+
+    # ========== Phase 3: Hand off to script ingest ==========
+    from scripts.models import ScriptTask
+    from scripts.tasks import ingest_and_translate_script
+
+    if source_audio.script_tasks.exists():
+        # Resumed ingest: the script task was already scheduled by a previous run
+        return
+
+    script_task = ScriptTask.objects.create(
+        source_audio=source_audio,
+        status='pending',
+        message=f'Queued for S{source_audio.season:02d}E{source_audio.episode:02d}',
+    )
+    ingest_and_translate_script(script_task.id)
+    logger.info(f"Scheduled script ingest+translate task #{script_task.id} for SourceAudio: {source_audio.id}")
+
+
+@db_task()
+def analyze_source_chunks(source_audio_id):
+    """
+    Background task: decode each chunk of a SourceAudio once and derive
+    1. its waveform peaks (if missing)
+    2. VAD draft slices (only for chunks the user hasn't sliced yet)
+    Safe to re-run.
+    """
+    from django.db.models import Count
+    from .models import AudioChunk
+    from .services import decode_chunk_pcm, compute_chunk_peaks, propose_chunk_slices
+
+    chunks = AudioChunk.objects.filter(source_audio_id=source_audio_id).annotate(slice_count=Count('slices'))
+    for chunk in chunks:
+        needs_peaks = not chunk.peaks
+        needs_proposals = chunk.slice_count == 0
+        if not (needs_peaks or needs_proposals):
+            continue
+        try:
+            samples = decode_chunk_pcm(chunk.file.path)
+            if needs_peaks:
+                compute_chunk_peaks(chunk, samples)
+            if needs_proposals:
+                propose_chunk_slices(chunk, samples)
+        except Exception as e:
+            # Peaks and proposals can both be (re)computed on demand, keep going
+            logger.exception(f"[Chunk {chunk.id}] Analysis failed: {e}")
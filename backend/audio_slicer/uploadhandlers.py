@@ -0,0 +1,33 @@
+"""
+Upload handlers for audio_slicer.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class SHA256UploadHandler(FileUploadHandler):
+    """
+    Pass-through handler that hashes every uploaded file while it streams in.
+    Chunks are forwarded untouched to the next handler (memory / temporary file),
+    the digests end up in request.upload_sha256 = {field_name: hexdigest}.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_sha256'):
+            self.request.upload_sha256 = {}
+        self.request.upload_sha256[self.field_name] = self.sha256.hexdigest()
+        return None  # Let the next handler return the file object
+
+
+def get_upload_sha256(request, field_name: str):
+    """SHA-256 recorded by SHA256UploadHandler for an uploaded field, or None."""
+    return getattr(request, 'upload_sha256', {}).get(field_name)
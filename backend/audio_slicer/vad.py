@@ -0,0 +1,85 @@
+"""
+Energy-based voice activity detection (VAD) for AudioChunks.
+
+Promoted from whisper/podcast_miner.py (detect_voice_chunks), which used pydub's
+detect_nonsilent with seek_step=1: one dBFS computation per millisecond in Python.
+Here the signal is cut into fixed frames and every frame's energy is computed in one
+NumPy pass over the int16 samples, so a 60-second chunk takes a few milliseconds and a
+whole episode (chunking.silence_segment_args) needs no copy beyond its decoded PCM.
+"""
+
+# ==========================================
+# VAD configuration constants for tuning
+# ==========================================
+SILENCE_THRESH_OFFSET = -16   # dB: offset against the chunk's overall dBFS to define silence dynamically
+MIN_SILENCE_LEN = 700         # ms: the minimum length of silence to constitute a split
+MIN_SPEECH_LEN = 250          # ms: drop shorter voiced blips (clicks, breaths)
+FRAME_LEN = 10                # ms: energy resolution
+PADDING = 100                 # ms: kept around each voiced range so onsets aren't clipped
+
+
+def _dbfs(rms):
+    """RMS of 16-bit samples -> dBFS (silence floors at -inf like pydub)."""
+    import numpy as np
+
+    with np.errstate(divide='ignore'):
+        return 20 * np.log10(rms / 32768.0)
+
+
+def frame_energy_db(samples, sample_rate: int, frame_len: int = FRAME_LEN):
+    """
+    Energy of mono 16-bit PCM in fixed frames, in one NumPy pass.
+
+    Returns:
+        (per-frame dBFS array, overall dBFS)
+    """
+    import numpy as np
+
+    frame = max(1, sample_rate * frame_len // 1000)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return np.empty(0), float('-inf')
+
+    # A view on the int16 samples; einsum accumulates each frame's sum of squares in
+    # int64 without materialising a float (or squared) copy of the whole signal
+    frames = np.asarray(samples, dtype=np.int16)[:n_frames * frame].reshape(n_frames, frame)
+    energy = np.einsum('ij,ij->i', frames, frames, dtype=np.int64)
+    frame_db = _dbfs(np.sqrt(energy / frame))
+    overall_db = _dbfs(np.sqrt(energy.sum() / (n_frames * frame)))
+    return frame_db, overall_db
+
+
+def detect_voice_ranges(samples, sample_rate: int) -> list[tuple[float, float]]:
+    """
+    Detect non-silent ranges in mono 16-bit PCM samples.
+
+    Returns:
+        list of (start_seconds, end_seconds), in order.
+    """
+    import numpy as np
+
+    frame_db, overall_db = frame_energy_db(samples, sample_rate)
+    n_frames = len(frame_db)
+    if n_frames == 0 or not np.isfinite(overall_db):
+        return []  # Too short / digital silence
+
+    silent = frame_db <= overall_db + SILENCE_THRESH_OFFSET
+
+    # Start/end frame of every silent run
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    long_runs = (run_ends - run_starts) >= MIN_SILENCE_LEN // FRAME_LEN
+
+    # Voiced ranges are the gaps between long silences
+    voiced_starts = np.concatenate(([0], run_ends[long_runs]))
+    voiced_ends = np.concatenate((run_starts[long_runs], [n_frames]))
+    keep = (voiced_ends - voiced_starts) >= max(1, MIN_SPEECH_LEN // FRAME_LEN)
+
+    duration = len(samples) / sample_rate
+    pad = PADDING / 1000
+    return [
+        (round(max(0.0, start * FRAME_LEN / 1000 - pad), 2),
+         round(min(duration, end * FRAME_LEN / 1000 + pad), 2))
+        for start, end in zip(voiced_starts[keep], voiced_ends[keep])
+    ]
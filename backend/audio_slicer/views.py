@@ -1,22 +1,33 @@
+import re
 from pathlib import Path
 
+from django.core import signing
 from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
 from rest_framework import viewsets, parsers, serializers, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from datetime import timedelta
 from django.utils import timezone
-from .models import SourceAudio, AudioChunk, AudioSlice, Drama, ReviewCard
-from .serializers import SourceAudioSerializer, AudioSliceSerializer, DramaSerializer, AudioChunkSerializer, ReviewCardSerializer
-from .services import slice_source_to_chunks
+from .models import SourceAudio, AudioChunk, AudioSlice, Drama, ReviewCard, IngestTask
+from .serializers import SourceAudioSerializer, AudioSliceSerializer, AudioSliceBatchItemSerializer, DramaSerializer, AudioChunkSerializer, ReviewCardSerializer
+from .tasks import ingest_source_audio
+from .services import (
+    get_slice_byte_range, read_slice_stream_token, save_slices_batch,
+    compute_chunk_peaks, propose_chunk_slices, PEAKS_WINDOW_MS,
+    hash_file, store_original_blob,
+    get_learning_progress, record_chunk_completed,
+)
+from .uploadhandlers import SHA256UploadHandler, get_upload_sha256
 from ai_analysis.services import batch_translate_texts
 
 class SourceAudioViewSet(viewsets.ModelViewSet):
     """
     API endpoint for uploading and managing source audio files.
-    Triggers ffmpeg segmentation on upload.
+    Queues the background ingest (ffmpeg segmentation) on upload.
     """
     # queryset = SourceAudio.objects.all() # Removed static queryset
     serializer_class = SourceAudioSerializer
@@ -30,6 +41,49 @@ class SourceAudioViewSet(viewsets.ModelViewSet):
         """
         return SourceAudio.objects.filter(user=self.request.user)
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Hash uploads while they stream in, so the original never has to be re-read
+        request.upload_handlers.insert(0, SHA256UploadHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
+
+    def _get_upload_hash(self):
+        content_hash = get_upload_sha256(self.request, 'file')
+        if not content_hash and 'file' in self.request.FILES:
+            content_hash = hash_file(self.request.FILES['file'])
+        return content_hash
+
+    def _reuse_existing_upload(self, data):
+        """
+        The same bytes were already uploaded for this episode (e.g. a retry after a failed ingest):
+        return the existing SourceAudio instead of storing another copy, resuming its ingest if needed.
+        """
+        content_hash = self._get_upload_hash()
+        if not content_hash:
+            return None
+
+        try:
+            existing = SourceAudio.objects.filter(
+                user=self.request.user,
+                content_hash=content_hash,
+                drama_id=int(data.get('drama')),
+                season=int(data.get('season')),
+                episode=int(data.get('episode')),
+            ).first()
+        except (TypeError, ValueError):
+            return None  # Let the serializer report the invalid fields
+
+        if not existing:
+            return None
+
+        ingest_task, _ = IngestTask.objects.get_or_create(source_audio=existing)
+        if ingest_task.status == IngestTask.Status.FAILED:
+            ingest_task.status = IngestTask.Status.PENDING
+            ingest_task.message = 'Resuming ingest...'
+            ingest_task.save()
+            ingest_source_audio(ingest_task.id)
+
+        return Response(self.get_serializer(existing).data, status=status.HTTP_200_OK)
+
     def create(self, request, *args, **kwargs):
         drama_value = request.data.get('drama')
 
@@ -56,6 +110,10 @@ class SourceAudioViewSet(viewsets.ModelViewSet):
             # mutable_data = {key: value for key, value in request.data.items()}
             mutable_data = request.data.copy()
             mutable_data['drama'] = drama.id
+
+            existing_response = self._reuse_existing_upload(mutable_data)
+            if existing_response:
+                return existing_response
             
             # Proceed with the serializer and standard creation flow
             serializer = self.get_serializer(data=mutable_data)
@@ -65,6 +123,9 @@ class SourceAudioViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers) 
         
         # If drama is an ID or not provided, proceed with default behavior
+        existing_response = self._reuse_existing_upload(request.data)
+        if existing_response:
+            return existing_response
         return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
@@ -73,7 +134,11 @@ class SourceAudioViewSet(viewsets.ModelViewSet):
             episode = serializer.validated_data.get('episode')
             if season is not None and episode is not None:
                 serializer.validated_data['title'] = f"S{season:02d}E{episode:02d}"
-        serializer.save(user=self.request.user)
+
+        # Content-addressed original: identical uploads share one file
+        content_hash = self._get_upload_hash()
+        serializer.validated_data['file'] = store_original_blob(serializer.validated_data['file'], content_hash)
+        serializer.save(user=self.request.user, content_hash=content_hash)
 
     @action(detail=False, methods=['get'])
     def episodes(self, request):
@@ -134,6 +199,58 @@ class SourceAudioViewSet(viewsets.ModelViewSet):
             'cover_url': cover_url,
         })
 
+    @action(detail=True, methods=['get'])
+    def ingest_status(self, request, pk=None):
+        """
+        Get the background ingest status for this episode.
+        GET /api/v1/audios/{id}/ingest_status/
+        """
+        source_audio = self.get_object()
+
+        try:
+            ingest_task = source_audio.ingest_task
+        except IngestTask.DoesNotExist:
+            return Response(
+                {'error': 'No ingest task found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response({
+            'id': ingest_task.id,
+            'status': ingest_task.status,
+            'message': ingest_task.message,
+            'total_chunks': ingest_task.total_chunks,
+            'registered_chunks': ingest_task.registered_chunks,
+            'created_at': ingest_task.created_at.isoformat(),
+            'updated_at': ingest_task.updated_at.isoformat(),
+        })
+
+    @action(detail=True, methods=['post'])
+    def resume_ingest(self, request, pk=None):
+        """
+        Re-queue a failed or interrupted ingest. Finished stages are not repeated.
+        POST /api/v1/audios/{id}/resume_ingest/
+        """
+        source_audio = self.get_object()
+        ingest_task, _ = IngestTask.objects.get_or_create(source_audio=source_audio)
+
+        if ingest_task.status == IngestTask.Status.COMPLETED:
+            return Response(
+                {'error': 'Ingest already completed'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        ingest_task.status = IngestTask.Status.PENDING
+        ingest_task.message = 'Resuming ingest...'
+        ingest_task.save()
+        ingest_source_audio(ingest_task.id)
+
+        return Response({
+            'id': ingest_task.id,
+            'status': ingest_task.status,
+            'message': ingest_task.message,
+        }, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=False, methods=['get'])
     def lookup(self, request):
         """
@@ -169,6 +286,36 @@ class SourceAudioViewSet(viewsets.ModelViewSet):
 
 
 
+def _parse_range_header(header, size):
+    """
+    Parses a single-range "bytes=a-b" / "bytes=a-" / "bytes=-n" header.
+    Returns inclusive (start, end) clamped to size, or None if unsatisfiable.
+    """
+    match = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', header)
+    if not match or size <= 0 or match.groups() == ('', ''):
+        return None
+
+    start_str, end_str = match.groups()
+    if start_str:
+        start = int(start_str)
+        end = min(int(end_str), size - 1) if end_str else size - 1
+    else:
+        # Suffix range: last n bytes
+        start = max(0, size - int(end_str))
+        end = size - 1
+
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def _schedule_embeddings(chunks):
+    """Queue embedding precomputation for the episodes of these chunks."""
+    from scripts.tasks import precompute_episode_embeddings
+    for source_audio_id in chunks.order_by().values_list('source_audio_id', flat=True).distinct():
+        precompute_episode_embeddings(source_audio_id)
+
+
 class AudioSliceViewSet(viewsets.ModelViewSet):
     """
     API endpoint for managing audio slices.
@@ -181,6 +328,7 @@ class AudioSliceViewSet(viewsets.ModelViewSet):
         """
         Return AudioSlice objects for the authenticated user.
         Optional filter by audio_chunk query param.
+        Lists hide VAD drafts unless ?draft=true (then only drafts are listed).
         """
         queryset = AudioSlice.objects.filter(audio_chunk__source_audio__user=self.request.user)
         
@@ -188,82 +336,121 @@ class AudioSliceViewSet(viewsets.ModelViewSet):
         audio_chunk_id = self.request.query_params.get('audio_chunk')
         if audio_chunk_id:
             queryset = queryset.filter(audio_chunk_id=audio_chunk_id)
+
+        if self.action == 'list':
+            queryset = queryset.filter(is_draft=self.request.query_params.get('draft') == 'true')
         
         return queryset.order_by('start_time')
 
     @action(detail=False, methods=['post'], url_path='create_batch')
     def create_batch(self, request):
         """
-        Create multiple AudioSlice records in a batch.
+        Create or update multiple AudioSlice records in a batch (one transaction).
         No longer cuts audio files - just stores metadata with highlights.
         """
-        serializer = self.get_serializer(data=request.data, many=True)
+        serializer = AudioSliceBatchItemSerializer(data=request.data, many=True)
         if not serializer.is_valid():
             print("Serializer validation errors:", serializer.errors)
             return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-        created_slices = []
-        errors = []
+        try:
+            saved_slices, errors = save_slices_batch(request.user, serializer.validated_data)
+        except IntegrityError as e:
+            return Response({"errors": [f"Error saving slices: {e}"]}, status=status.HTTP_400_BAD_REQUEST)
 
-        for item_data in serializer.validated_data:
-            audio_chunk = item_data['audio_chunk']
-            
-            # Verify the user owns this chunk
-            if audio_chunk.source_audio.user != request.user:
-                errors.append(f"Unauthorized: chunk {audio_chunk.id} does not belong to current user")
-                continue
+        if saved_slices:
+            # bulk_create/bulk_update skip the post_save embedding hook
+            _schedule_embeddings(AudioChunk.objects.filter(id__in={s.audio_chunk_id for s in saved_slices}))
 
-            try:
-                slice_id = item_data.get('id')
-                defaults = {
-                    'audio_chunk': audio_chunk,
-                    'start_time': item_data['start_time'],
-                    'end_time': item_data['end_time'],
-                    'original_text': item_data.get('original_text', ''),
-                    'highlights': item_data.get('highlights', []),
-                    # 'is_favorite': item_data.get('is_favorite', False),
-                    'is_pronunciation_hard': item_data.get('is_pronunciation_hard', False),
-                    'is_idiom': item_data.get('is_idiom', False)
-                }
-                
-                if slice_id:
-                    # Update by ID if provided (allows time changes)
-                    slice_obj, created = AudioSlice.objects.update_or_create(
-                        id=slice_id,
-                        defaults=defaults
-                    )
-                else:
-                    # Fallback: create new or update by time-based lookup
-                    slice_obj, created = AudioSlice.objects.update_or_create(
-                        audio_chunk=audio_chunk,
-                        start_time=item_data['start_time'],
-                        end_time=item_data['end_time'],
-                        defaults={
-                            'original_text': item_data.get('original_text', ''),
-                            'highlights': item_data.get('highlights', []),
-                            # 'is_favorite': item_data.get('is_favorite', False),
-                            'is_pronunciation_hard': item_data.get('is_pronunciation_hard', False),
-                            'is_idiom': item_data.get('is_idiom', False)
-                        }
-                    )
-                created_slices.append(slice_obj)
-                
-                # Mark the chunk as having slices
-                if not audio_chunk.has_slices:
-                    audio_chunk.has_slices = True
-                    audio_chunk.save()
-                    
-            except Exception as e:
-                errors.append(f"Error creating slice for chunk {audio_chunk.id}: {e}")
-        
         if errors:
             return Response({
                 "message": "Some slices failed to create", 
                 "errors": errors, 
-                "created_slices": AudioSliceSerializer(created_slices, many=True).data
+                "created_slices": AudioSliceSerializer(saved_slices, many=True).data
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response(AudioSliceSerializer(created_slices, many=True).data, status=status.HTTP_201_CREATED)
+        return Response(AudioSliceSerializer(saved_slices, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def accept_drafts(self, request):
+        """
+        Accept VAD-proposed draft slices of a chunk in bulk.
+        POST /api/v1/audioslices/accept_drafts/
+        Body: { "audio_chunk": 12, "ids": [1, 2, 3] }  // ids optional, defaults to all drafts
+        """
+        audio_chunk_id = request.data.get('audio_chunk')
+        if not audio_chunk_id:
+            return Response({"error": "audio_chunk is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        drafts = AudioSlice.objects.filter(
+            audio_chunk_id=audio_chunk_id,
+            audio_chunk__source_audio__user=request.user,
+            is_draft=True
+        )
+        ids = request.data.get('ids')
+        if ids:
+            drafts = drafts.filter(id__in=ids)
+
+        with transaction.atomic():
+            accepted = drafts.update(is_draft=False, updated_at=timezone.now())
+            if accepted:
+                AudioChunk.objects.filter(id=audio_chunk_id).update(has_slices=True)
+
+        if accepted:
+            _schedule_embeddings(AudioChunk.objects.filter(id=audio_chunk_id))
+        return Response({"accepted": accepted})
+
+    @action(
+        detail=False, methods=['get'], url_path=r'stream/(?P<token>[^/]+)',
+        permission_classes=[AllowAny], authentication_classes=[]
+    )
+    def stream(self, request, token=None):
+        """
+        Stream only the MP3 frames of one slice, with HTTP Range support.
+        GET /api/v1/audioslices/stream/{token}/
+
+        The token comes from services.get_slice_stream_url (signed slice ID), so plain
+        <audio src> elements can use it. Byte ranges are relative to the slice, not the chunk.
+        """
+        try:
+            slice_id = read_slice_stream_token(token)
+        except (signing.BadSignature, ValueError):
+            return Response({'error': 'Invalid stream token'}, status=status.HTTP_404_NOT_FOUND)
+
+        audio_slice = AudioSlice.objects.select_related('audio_chunk').filter(id=slice_id).first()
+        if not audio_slice:
+            return Response({'error': 'Slice not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        chunk = audio_slice.audio_chunk
+        first_byte, end_byte = get_slice_byte_range(chunk, audio_slice.start_time, audio_slice.end_time)
+        size = end_byte - first_byte
+
+        # Resolve an optional "Range: bytes=a-b" header against the slice window
+        range_start, range_end = 0, size - 1
+        range_header = request.headers.get('Range')
+        if range_header:
+            byte_range = _parse_range_header(range_header, size)
+            if byte_range is None:
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+            range_start, range_end = byte_range
+
+        with chunk.file.open('rb') as f:
+            f.seek(first_byte + range_start)
+            content = f.read(range_end - range_start + 1)
+
+        response = HttpResponse(
+            content,
+            content_type='audio/mpeg',
+            status=status.HTTP_206_PARTIAL_CONTENT if range_header else status.HTTP_200_OK
+        )
+        response['Accept-Ranges'] = 'bytes'
+        response['Content-Length'] = str(len(content))
+        response['Cache-Control'] = 'private, max-age=86400'
+        if range_header:
+            response['Content-Range'] = f'bytes {range_start}-{range_end}/{size}'
+        return response
 
     @action(detail=False, methods=['get'])
     def missing_translations(self, request):
@@ -430,6 +617,7 @@ class AudioChunkViewSet(viewsets.ReadOnlyModelViewSet):
         - current_index: current chunk's index (0-based)
         """
         chunk = self.get_object()
+        newly_studied = not chunk.is_studied
         
         # Mark as studied
         chunk.is_studied = True
@@ -446,6 +634,8 @@ class AudioChunkViewSet(viewsets.ReadOnlyModelViewSet):
         total_chunks = AudioChunk.objects.filter(
             source_audio=chunk.source_audio
         ).count()
+
+        record_chunk_completed(request.user, chunk, next_chunk, total_chunks, newly_studied)
         
         return Response({
             'success': True,
@@ -457,6 +647,50 @@ class AudioChunkViewSet(viewsets.ReadOnlyModelViewSet):
             'message': 'Chunk marked as complete!'
         })
 
+    @action(detail=True, methods=['post'])
+    def propose_slices(self, request, pk=None):
+        """
+        (Re)run VAD on this chunk and replace its draft slices.
+        POST /api/v1/audiochunks/{id}/propose_slices/
+        """
+        chunk = self.get_object()
+
+        try:
+            drafts = propose_chunk_slices(chunk)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response(AudioSliceSerializer(drafts, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def peaks(self, request, pk=None):
+        """
+        Precomputed waveform peaks for this chunk.
+        GET /api/v1/audiochunks/{id}/peaks/
+
+        Binary body: interleaved int8 [min, max] pairs, one pair per X-Peaks-Window-Ms.
+        Chunk audio never changes, so the response is cacheable forever.
+        """
+        chunk = self.get_object()
+
+        if not chunk.peaks:
+            try:
+                compute_chunk_peaks(chunk)
+            except Exception as e:
+                return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        etag = f'"peaks-{chunk.id}-{PEAKS_WINDOW_MS}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            with chunk.peaks.open('rb') as f:
+                response = HttpResponse(f.read(), content_type='application/octet-stream')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        response['X-Peaks-Window-Ms'] = str(PEAKS_WINDOW_MS)
+        response['Access-Control-Expose-Headers'] = 'X-Peaks-Window-Ms'
+        return response
+
 
 
 
@@ -532,6 +766,7 @@ class DashboardViewSet(viewsets.ViewSet):
         1. Find the last studied chunk (most recent last_studied_at)
         2. Return the next unstudied chunk after it
         3. If no studied chunks, return the first chunk
+        Answered from the user's LearningProgress row (one query, see services.get_learning_progress).
         
         Returns:
         - chunk_id: ID of chunk to resume from
@@ -541,43 +776,16 @@ class DashboardViewSet(viewsets.ViewSet):
         - total_chunks: Total chunks in this episode
         - last_studied_at: When last studied
         """
-        user = request.user
-        
-        # Find the most recently studied chunk
-        last_studied = AudioChunk.objects.filter(
-            source_audio__user=user,
-            is_studied=True
-        ).order_by('-last_studied_at').first()
-        
-        if last_studied:
-            # Find the next chunk after the last studied one
-            next_chunk = AudioChunk.objects.filter(
-                source_audio=last_studied.source_audio,
-                chunk_index__gt=last_studied.chunk_index
-            ).order_by('chunk_index').first()
-            
-            # If no next chunk, use the last studied one (user can review it)
-            resume_chunk = next_chunk if next_chunk else last_studied
-            source_audio = resume_chunk.source_audio
-        else:
-            # No studied chunks - find the first chunk of any source audio
-            first_chunk = AudioChunk.objects.filter(
-                source_audio__user=user
-            ).order_by('source_audio__id', 'chunk_index').first()
-            
-            if not first_chunk:
-                return Response({
-                    'has_content': False,
-                    'message': 'No audio content found. Upload some audio to get started!'
-                })
-            
-            resume_chunk = first_chunk
-            source_audio = first_chunk.source_audio
-        
-        # Get total chunks for this source audio
-        total_chunks = AudioChunk.objects.filter(
-            source_audio=source_audio
-        ).count()
+        progress = get_learning_progress(request.user)
+        resume_chunk = progress.resume_chunk
+
+        if not resume_chunk:
+            return Response({
+                'has_content': False,
+                'message': 'No audio content found. Upload some audio to get started!'
+            })
+
+        source_audio = resume_chunk.source_audio
         
         # Build cover URL - use episode cover, fallback to drama cover
         cover_url = None
@@ -590,9 +798,9 @@ class DashboardViewSet(viewsets.ViewSet):
             'has_content': True,
             'chunk_id': resume_chunk.id,
             'chunk_index': resume_chunk.chunk_index,
-            'total_chunks': total_chunks,
+            'total_chunks': progress.resume_total_chunks,
             'is_studied': resume_chunk.is_studied,
-            'last_studied_at': last_studied.last_studied_at if last_studied else None,
+            'last_studied_at': progress.last_studied_at,
             'source_audio': {
                 'id': source_audio.id,
                 'drama_id': source_audio.drama.id,
@@ -614,30 +822,10 @@ class DashboardViewSet(viewsets.ViewSet):
         - hard_sentences: Count of sentences marked hard (highlight=red)
         - review_sentences: Count of sentences needing review (highlight=yellow)
         """
-        user = request.user
-        
-        # Import ScriptLine model
-        from scripts.models import ScriptLine
-        
-        # Count studied chunks
-        total_studied = AudioChunk.objects.filter(
-            source_audio__user=user,
-            is_studied=True
-        ).count()
-        
-        # Count hard/review sentences
-        hard_count = ScriptLine.objects.filter(
-            chunk__source_audio__user=user,
-            highlight='red'
-        ).count()
-        
-        review_count = ScriptLine.objects.filter(
-            chunk__source_audio__user=user,
-            highlight='yellow'
-        ).count()
+        progress = get_learning_progress(request.user)
         
         return Response({
-            'total_chunks_studied': total_studied,
-            'hard_sentences': hard_count,
-            'review_sentences': review_count,
+            'total_chunks_studied': progress.studied_chunks,
+            'hard_sentences': progress.hard_sentences,
+            'review_sentences': progress.review_sentences,
         })
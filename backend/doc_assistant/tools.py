@@ -6,6 +6,7 @@ Each tool is decorated with @tool for LangChain/LangGraph compatibility.
 """
 from langchain_core.tools import tool
 from typing import Optional
+from django.db import transaction
 
 
 @tool
@@ -27,24 +28,11 @@ def get_surrounding_lines(line_id: int, radius: int = 3) -> str:
     except ScriptLine.DoesNotExist:
         return f"Error: ScriptLine with id={line_id} not found."
     
-    # Get surrounding lines in the same chunk, ordered by `order`
-    siblings = ScriptLine.objects.filter(
-        chunk=ref_line.chunk,
-    ).order_by('order')
-    
-    # Find the position of the reference line
-    siblings_list = list(siblings.values_list('id', flat=True))
-    try:
-        ref_idx = siblings_list.index(ref_line.id)
-    except ValueError:
-        return f"Error: Could not locate line {line_id} among its siblings."
-    
-    start = max(0, ref_idx - radius)
-    end = min(len(siblings_list), ref_idx + radius + 1)
-    
-    # Fetch the surrounding slice
-    surrounding_ids = siblings_list[start:end]
-    surrounding = ScriptLine.objects.filter(id__in=surrounding_ids).order_by('order')
+    # ±radius neighbours in the same chunk, ordered by `order` (two small indexed reads)
+    siblings = ScriptLine.objects.filter(chunk=ref_line.chunk)
+    above = list(siblings.filter(order__lt=ref_line.order).order_by('-order')[:radius])
+    below = list(siblings.filter(order__gt=ref_line.order).order_by('order')[:radius])
+    surrounding = above[::-1] + [ref_line] + below
     
     lines = []
     for line in surrounding:
@@ -108,6 +96,7 @@ def insert_script_line(
         action_note: Optional action/stage direction in parentheses.
     """
     from scripts.models import ScriptLine
+    from scripts.ordering import order_next_to
     
     if position not in ('before', 'after'):
         return "Error: position must be 'before' or 'after'."
@@ -117,57 +106,23 @@ def insert_script_line(
     except ScriptLine.DoesNotExist:
         return f"Error: ScriptLine with id={reference_line_id} not found."
     
-    
-    # Auto-heal database: if existing lines have order=0.0 (the default), align them to their index
-    from django.db.models import F
-    ScriptLine.objects.filter(chunk_id=chunk_id, order=0.0).exclude(index=-1).update(order=F('index'))
-    
-    # Get ordered siblings in the same chunk
-    siblings = list(
-        ScriptLine.objects.filter(chunk=ref_line.chunk)
-        .order_by('order', 'index')
-        .values_list('id', 'order', 'index')
-    )
-    
-    ref_idx = None
-    for i, (sid, sorder, sidx) in enumerate(siblings):
-        if sid == ref_line.id:
-            ref_idx = i
-            break
-    
-    if ref_idx is None:
-        return f"Error: Could not locate reference line {reference_line_id} in its chunk."
-
-    ref_order = float(siblings[ref_idx][1])
-    
-    if position == 'before':
-        if ref_idx == 0:
-            new_order = ref_order - 1.0
-        else:
-            prev_order = float(siblings[ref_idx - 1][1])
-            new_order = (prev_order + ref_order) / 2.0
-    else:  # after
-        if ref_idx == len(siblings) - 1:
-            new_order = ref_order + 1.0
-        else:
-            next_order = float(siblings[ref_idx + 1][1])
-            new_order = (ref_order + next_order) / 2.0
-    
     # Build raw_text in canonical format
     raw_text = f"{speaker}: {text}" if speaker else text
     
     # Create the new ScriptLine
-    new_line = ScriptLine.objects.create(
-        chunk_id=chunk_id,
-        index=-1,  # -1 marks manually inserted lines
-        order=new_order,
-        line_type=line_type,
-        speaker=speaker if line_type == 'dialogue' else None,
-        text=text,
-        text_zh=text_zh,
-        action_note=action_note,
-        raw_text=raw_text,
-    )
+    with transaction.atomic():
+        new_order = order_next_to(ref_line, position, chunk_id=chunk_id)
+        new_line = ScriptLine.objects.create(
+            chunk_id=chunk_id,
+            index=-1,  # -1 marks manually inserted lines
+            order=new_order,
+            line_type=line_type,
+            speaker=speaker if line_type == 'dialogue' else None,
+            text=text,
+            text_zh=text_zh,
+            action_note=action_note,
+            raw_text=raw_text,
+        )
     
     return (
         f"Successfully inserted new line!\n"
@@ -261,6 +216,7 @@ def delete_script_line(line_id: int) -> str:
         line_id: The ID of the ScriptLine to delete.
     """
     from scripts.models import ScriptLine
+    from audio_slicer.services import record_highlight_change
     
     try:
         line = ScriptLine.objects.get(id=line_id)
@@ -270,6 +226,8 @@ def delete_script_line(line_id: int) -> str:
     text_preview = line.text[:50] + "..." if len(line.text) > 50 else line.text
     speaker_info = f"{line.speaker}: " if line.speaker else ""
     
+    # Take the line out of the dashboard's hard/review counters
+    record_highlight_change(line.user_id, line.highlight, None)
     line.delete()
     
     return f"Successfully deleted line #{line_id} ({speaker_info}'{text_preview}')."
@@ -302,6 +260,7 @@ def split_script_line(
         remaining_text_zh: Chinese translation for the remaining text (generate one).
     """
     from scripts.models import ScriptLine
+    from scripts.ordering import order_at_edge
     from audio_slicer.models import AudioChunk
 
     try:
@@ -323,49 +282,24 @@ def split_script_line(
     line.raw_text = f"{speaker_str}: {keep_text}" if speaker_str else keep_text
     line.save()
 
-    # 2. Calculate order for the new line in the target chunk
-    # Auto-heal database for the local chunk
-    from django.db.models import F
-    ScriptLine.objects.filter(chunk_id=target_chunk.id, order=0.0).exclude(index=-1).update(order=F('index'))
-    
-    if target_chunk.chunk_index < line.chunk.chunk_index:
-        # Moving to PREVIOUS chunk → insert at END
-        last_in_target = (
-            ScriptLine.objects.filter(chunk=target_chunk)
-            .order_by('-order', '-index')
-            .values_list('order', 'index')
-            .first()
-        )
-        if last_in_target:
-            new_order = float(last_in_target[0]) + 1.0
-        else:
-            new_order = 0.0
-    else:
-        # Moving to NEXT chunk → insert at BEGINNING
-        first_in_target = (
-            ScriptLine.objects.filter(chunk=target_chunk)
-            .order_by('order', 'index')
-            .values_list('order', 'index')
-            .first()
-        )
-        if first_in_target:
-            new_order = float(first_in_target[0]) - 1.0
-        else:
-            new_order = 0.0
+    # 2. Moving to PREVIOUS chunk → insert at END, to NEXT chunk → insert at BEGINNING
+    edge = 'end' if target_chunk.chunk_index < line.chunk.chunk_index else 'start'
+    raw = f"{speaker_str}: {remaining_text}" if speaker_str else remaining_text
 
     # 3. Create the new line
-    raw = f"{speaker_str}: {remaining_text}" if speaker_str else remaining_text
-    new_line = ScriptLine.objects.create(
-        chunk=target_chunk,
-        index=-1,
-        order=new_order,
-        line_type=line.line_type,
-        speaker=line.speaker,
-        text=remaining_text,
-        text_zh=remaining_text_zh,
-        action_note=line.action_note,
-        raw_text=raw,
-    )
+    with transaction.atomic():
+        new_order = order_at_edge(target_chunk.id, edge)
+        new_line = ScriptLine.objects.create(
+            chunk=target_chunk,
+            index=-1,
+            order=new_order,
+            line_type=line.line_type,
+            speaker=line.speaker,
+            text=remaining_text,
+            text_zh=remaining_text_zh,
+            action_note=line.action_note,
+            raw_text=raw,
+        )
 
     return (
         f"Successfully split line #{line_id}!\n"
@@ -391,6 +325,7 @@ def move_script_line(
         target_chunk_id: Optional chunk ID if moving to a different chunk. If None, uses the reference line's chunk ID.
     """
     from scripts.models import ScriptLine
+    from scripts.ordering import order_next_to
     
     if position not in ('before', 'after'):
         return "Error: position must be 'before' or 'after'."
@@ -403,45 +338,17 @@ def move_script_line(
         
     chunk_id = target_chunk_id if target_chunk_id is not None else ref_line.chunk_id
     
-    # Auto-heal database for calculation safety
-    from django.db.models import F
-    ScriptLine.objects.filter(chunk_id=chunk_id, order=0.0).exclude(index=-1).update(order=F('index'))
-    
-    siblings = list(
-        ScriptLine.objects.filter(chunk_id=chunk_id)
-        .exclude(id=line_id)
-        .order_by('order', 'index')
-        .values_list('id', 'order', 'index')
-    )
-    
-    ref_idx = None
-    for i, (sid, sorder, sidx) in enumerate(siblings):
-        if sid == ref_line.id:
-            ref_idx = i
-            break
-            
-    if ref_idx is None:
+    if ref_line.chunk_id != chunk_id:
         return f"Error: Could not locate reference line {reference_line_id} in chunk {chunk_id}."
-
-    ref_order = float(siblings[ref_idx][1])
+    if line.id == ref_line.id:
+        return "Error: A line cannot be moved relative to itself."
     
-    if position == 'before':
-        if ref_idx == 0:
-            new_order = ref_order - 1.0
-        else:
-            prev_order = float(siblings[ref_idx - 1][1])
-            new_order = (prev_order + ref_order) / 2.0
-    else:  # after
-        if ref_idx == len(siblings) - 1:
-            new_order = ref_order + 1.0
-        else:
-            next_order = float(siblings[ref_idx + 1][1])
-            new_order = (ref_order + next_order) / 2.0
-            
-    line.chunk_id = chunk_id
-    line.order = new_order
-    line.index = -1
-    line.save()
+    with transaction.atomic():
+        new_order = order_next_to(ref_line, position, exclude_id=line.id)
+        line.chunk_id = chunk_id
+        line.order = new_order
+        line.index = -1
+        line.save(update_fields=['chunk', 'order', 'index'])
     
     return f"Successfully moved line #{line_id} {position} line #{reference_line_id}. New order: {new_order} in chunk #{chunk_id}."
 
@@ -465,6 +372,7 @@ def merge_script_lines(
         text_zh: The combined Chinese translation for the merged text (generate one).
     """
     from scripts.models import ScriptLine
+    from audio_slicer.services import record_highlight_change
     
     try:
         target = ScriptLine.objects.get(id=target_line_id)
@@ -487,6 +395,8 @@ def merge_script_lines(
     speaker_str = target.speaker or ""
     target.raw_text = f"{speaker_str}: {merged_text}" if speaker_str else merged_text
     
+    # The source's highlight goes with it (the target keeps its own)
+    record_highlight_change(source.user_id, source.highlight, None)
     source.delete()
     target.save()
     
@@ -21,7 +21,7 @@ from django.conf import settings
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnablePassthrough
 from pydantic import BaseModel, Field
-from ai_analysis.services import get_llm as _get_llm
+from ai_analysis.services import get_llm as _get_llm, coalesce, is_fake_llm
 
 logger = logging.getLogger(__name__)
 
@@ -178,6 +178,10 @@ def generate_tts_audio(text: str, conversation_id: int, message_id: int) -> str:
     Generates 24kHz, 16-bit, Mono WAV.
     Returns: relative media URL (e.g. 'english_corner/tts/42/123.wav')
     """
+    if is_fake_llm("english_corner"):
+        # Offline runs (LLM_PROVIDER=fake): no audio
+        return ""
+
     try:
         from google import genai
         from google.genai import types
@@ -329,7 +333,15 @@ def generate_word_enrichment(label: str, context: str = "") -> dict:
     """
     Call LLM to generate explanation + example for a word/phrase.
     Returns: {"explanation": "...", "example": "..."}
+    Concurrent calls for the same word and context share one LLM call.
     """
+    return dict(coalesce(
+        ("word_enrichment", label, context),
+        lambda: _generate_word_enrichment(label, context),
+    ))
+
+
+def _generate_word_enrichment(label: str, context: str) -> dict:
     llm = _get_llm(feature="english_corner", temperature=0.3)
     prompt = ChatPromptTemplate.from_messages([
         ("system", WORD_ENRICHMENT_PROMPT),
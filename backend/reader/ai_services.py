@@ -1,5 +1,5 @@
 from langchain_core.prompts import ChatPromptTemplate
-from ai_analysis.services import get_llm as _get_llm
+from ai_analysis.services import get_llm as _get_llm, coalesce
 from .schemas import ArticleMetaResponse, CopilotResponse, AnnotationContext
 
 # ============ Article Background Analysis (Gemini) ============
@@ -89,6 +89,10 @@ Output Rules:
     return _copilot_chain
 
 def assist_annotation(ctx: AnnotationContext) -> dict:
+    # Identical in-flight requests (double-click, two tabs) share one LLM call
+    return dict(coalesce(("assist_annotation", ctx.model_dump()), lambda: _assist_annotation(ctx)))
+
+def _assist_annotation(ctx: AnnotationContext) -> dict:
     chain = get_copilot_chain()
     res = chain.invoke({
         "domain": ctx.domain or "General",
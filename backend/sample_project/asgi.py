@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sample_project.settings')
+# Serve /api/ai/ with the async views (ai_analysis/async_views.py): LLM calls are
+# awaited on the event loop instead of blocking a thread per request.
+#   uvicorn sample_project.asgi:application --workers 2
+os.environ.setdefault('AI_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -187,6 +187,35 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# How ffmpeg segments become AudioChunk files:
+# 'direct' links them into MEDIA_ROOT in place (no second copy), 'copy' goes through the storage API
+AUDIO_CHUNK_STORAGE_MODE = os.getenv('AUDIO_CHUNK_STORAGE_MODE', 'direct')
+
+# Django cache (Blitz highlight index and shuffle decks, scripts/blitz.py). A file cache
+# is shared by every web and Huey worker process, unlike the default per-process LocMemCache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('DJANGO_CACHE_DIR', str(BASE_DIR / 'cache' / 'django')),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# On-disk cache of fanfr.com script pages and their parses (scripts/parser.py)
+SCRIPT_CACHE_DIR = Path(os.getenv('SCRIPT_CACHE_DIR', BASE_DIR / 'cache' / 'scripts'))
+SCRIPT_CACHE_MAX_AGE = int(os.getenv('SCRIPT_CACHE_MAX_AGE', 30 * 24 * 3600))  # seconds before a cached page is revalidated
+
+# Embeddings for script line <-> audio slice matching (scripts/embeddings.py):
+# 'gemini' (needs GOOGLE_API_KEY) or 'hashing' (local, no network)
+EMBEDDING_BACKEND = os.getenv(
+    'EMBEDDING_BACKEND',
+    'gemini' if os.getenv('GOOGLE_API_KEY') and os.getenv('LLM_PROVIDER') != 'fake' else 'hashing',
+)
+
+# Local Whisper model used by script alignment (scripts/alignment.py)
+WHISPER_MODEL_NAME = os.getenv('WHISPER_MODEL_NAME', 'small')
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -242,6 +271,43 @@ LLM_CONFIG = {
         "api_key": os.getenv("DEEPSEEK_API_KEY"),
         "base_url": os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com"),
     },
+    "phrase_log": {
+        "provider": "deepseek" if os.getenv("MODEL_NAME") == "deepseek-chat" else "gemini",
+        "model_name": os.getenv("MODEL_NAME"),
+        "temperature": 0,
+        "api_key": os.getenv("DEEPSEEK_API_KEY") if os.getenv("MODEL_NAME") == "deepseek-chat" else os.getenv("GOOGLE_API_KEY"),
+        "base_url": os.getenv("BASE_URL"),
+    },
+}
+
+# LLM_PROVIDER=fake runs every feature on the local fake model (ai_analysis/fake_llm.py):
+# offline development, load tests and `manage.py benchmark_ai`. No provider is called.
+if os.getenv("LLM_PROVIDER") == "fake":
+    for _config in LLM_CONFIG.values():
+        _config.update({
+            "provider": "fake",
+            "latency": float(os.getenv("FAKE_LLM_LATENCY", 1.0)),              # seconds before the first token
+            "token_latency": float(os.getenv("FAKE_LLM_TOKEN_LATENCY", 0.02)),  # seconds per streamed token
+        })
+
+# Route /api/ai/ to ai_analysis.async_views (set by sample_project/asgi.py)
+AI_ASYNC_VIEWS = os.getenv("AI_ASYNC_VIEWS", "0") == "1"
+
+# In-process result cache for ai_analysis.services.analyze_sound_script / lookup_dictionary
+AI_RESPONSE_CACHE = {
+    "enabled": os.getenv("AI_RESPONSE_CACHE_ENABLED", "1") == "1",
+    "max_entries": int(os.getenv("AI_RESPONSE_CACHE_MAX_ENTRIES", 2048)),  # LRU eviction beyond this
+    "ttl": int(os.getenv("AI_RESPONSE_CACHE_TTL", 7 * 24 * 3600)),         # seconds
+    # Reuse a response for the same focus segment in a similar context (word-set Jaccard); None = exact only
+    "near_duplicate_threshold": float(os.getenv("AI_RESPONSE_CACHE_NEAR_DUPLICATE")) if os.getenv("AI_RESPONSE_CACHE_NEAR_DUPLICATE") else None,
+}
+
+# Budget for ai_analysis.services.translate_batches_concurrently (per worker process)
+TRANSLATION_RATE_LIMIT = {
+    "max_workers": int(os.getenv("TRANSLATION_MAX_WORKERS", 4)),  # concurrent LLM calls
+    "rpm": int(os.getenv("TRANSLATION_RPM", 60)),                # requests per minute
+    "tpm": int(os.getenv("TRANSLATION_TPM", 200000)),            # estimated tokens per minute
+    "retries": 2,                                                # per batch, with exponential backoff
 }
 
 LOGGING = {
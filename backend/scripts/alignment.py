@@ -0,0 +1,385 @@
+"""
+Forced alignment of an episode's ScriptLines to its AudioChunk timestamps.
+
+1. Transcribe every chunk with the local Whisper model (word timestamps on)
+2. Align the script's words to the ASR words with Needleman-Wunsch (global DP)
+3. Each line spans its first..last aligned word -> move it to that chunk and
+   bind it to an overlapping AudioSlice, or create one
+
+Whisper (openai-whisper, as used in whisper/tasks.py) is an optional dependency,
+only the worker running the alignment task needs it.
+
+auto_bind_chunk is the lightweight alternative for one chunk whose slices already
+exist: it matches lines to slices on text embeddings alone.
+"""
+import re
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# Alignment scoring
+# ==========================================
+MATCH_SCORE = 2
+MISMATCH_SCORE = -1
+GAP_SCORE = -1
+
+MIN_LINE_DURATION = 0.3   # s: pad very short lines so the slice is playable
+BIND_IOU_THRESHOLD = 0.5  # reuse an existing slice when it overlaps the aligned range this much
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+_whisper_model = None
+
+
+def normalize_words(text: str) -> list[str]:
+    """Lowercase word tokens without punctuation ("Don't!" -> ["don't"])."""
+    return _WORD_RE.findall((text or '').lower().replace('’', "'"))
+
+
+def get_whisper_model():
+    """Load the Whisper model once per worker process."""
+    global _whisper_model
+    if _whisper_model is None:
+        try:
+            import whisper
+        except ImportError:
+            raise Exception("openai-whisper is not installed; it is required for script alignment.")
+        model_name = getattr(settings, 'WHISPER_MODEL_NAME', 'small')
+        logger.info(f"Loading Whisper model '{model_name}'...")
+        _whisper_model = whisper.load_model(model_name, device='cpu')
+    return _whisper_model
+
+
+def transcribe_chunk_words(chunk) -> list[dict]:
+    """
+    Transcribe one AudioChunk.
+
+    Returns:
+        [{'word': 'how', 'start': 1.24, 'end': 1.41}, ...] with chunk-relative times
+    """
+    result = get_whisper_model().transcribe(
+        chunk.file.path, fp16=False, language='en', word_timestamps=True,
+    )
+    words = []
+    for segment in result.get('segments', []):
+        for w in segment.get('words', []):
+            # Whisper sometimes glues punctuation/contractions: normalize and keep every token
+            for token in normalize_words(w['word']):
+                words.append({'word': token, 'start': float(w['start']), 'end': float(w['end'])})
+    return words
+
+
+def align_sequences(ref: list[str], hyp: list[str]) -> list[int]:
+    """
+    Global alignment of ref (script words) against hyp (ASR words).
+
+    Each DP row is filled with NumPy: the diagonal/up moves are elementwise, and the
+    left move (a running max with a linear gap penalty) becomes a cumulative max over
+    H[j] + j. Only a 1-byte traceback matrix is kept.
+
+    Returns:
+        For every ref position, the hyp index it was aligned to (match or substitution), or -1.
+    """
+    import numpy as np
+
+    n, m = len(ref), len(hyp)
+    if n == 0 or m == 0:
+        return [-1] * n
+
+    vocab = {}
+    ref_ids = np.array([vocab.setdefault(w, len(vocab)) for w in ref], dtype=np.int64)
+    hyp_ids = np.array([vocab.setdefault(w, len(vocab)) for w in hyp], dtype=np.int64)
+
+    DIAG, UP, LEFT = 0, 1, 2
+    trace = np.empty((n + 1, m + 1), dtype=np.int8)
+    trace[0, :] = LEFT
+    trace[:, 0] = UP
+
+    cols = np.arange(m + 1)
+    prev = cols * GAP_SCORE
+    for i in range(1, n + 1):
+        sub = np.where(hyp_ids == ref_ids[i - 1], MATCH_SCORE, MISMATCH_SCORE)
+        diag = prev[:-1] + sub
+        up = prev[1:] + GAP_SCORE
+
+        best = np.empty(m + 1, dtype=np.int64)
+        best[0] = i * GAP_SCORE
+        best[1:] = np.maximum(diag, up)
+
+        # row[j] = max_k<=j (best[k] + (j - k) * GAP) = cummax(best - j * GAP) + j * GAP
+        row = np.maximum.accumulate(best - cols * GAP_SCORE) + cols * GAP_SCORE
+
+        trace[i, 1:] = np.where(row[1:] > best[1:], LEFT, np.where(diag >= up, DIAG, UP))
+        prev = row
+
+    aligned = [-1] * n
+    i, j = n, m
+    while i > 0 and j > 0:
+        move = trace[i, j]
+        if move == DIAG:
+            aligned[i - 1] = j - 1
+            i, j = i - 1, j - 1
+        elif move == UP:
+            i -= 1
+        else:
+            j -= 1
+    return aligned
+
+
+def _iou(a_start, a_end, b_start, b_end):
+    inter = min(a_end, b_end) - max(a_start, b_start)
+    if inter <= 0:
+        return 0.0
+    return inter / (max(a_end, b_end) - min(a_start, b_start))
+
+
+def align_episode_lines(source_audio, progress=None) -> dict:
+    """
+    Align all ScriptLines of a SourceAudio and bind them to AudioSlices.
+
+    Lines already bound to a slice keep their binding (they only follow its chunk).
+    Action/scene lines are not spoken; they follow the chunk of the preceding line.
+
+    Args:
+        source_audio: SourceAudio instance
+        progress: optional callback(done_chunks, total_chunks) during transcription
+
+    Returns:
+        {'aligned': n, 'bound': n, 'created': n, 'unaligned': n}
+    """
+    from audio_slicer.models import AudioChunk, AudioSlice
+    from .models import ScriptLine
+
+    chunks = list(AudioChunk.objects.filter(source_audio=source_audio).order_by('chunk_index'))
+    lines = list(
+        ScriptLine.objects.filter(source_audio=source_audio)
+        .select_related('slice')
+        .order_by('chunk__chunk_index', 'order', 'index')
+    )
+    if not chunks or not lines:
+        return {'aligned': 0, 'bound': 0, 'created': 0, 'unaligned': len(lines)}
+
+    # ========== 1. Transcribe ==========
+    asr_words = []  # (word, chunk, start, end)
+    for done, chunk in enumerate(chunks, start=1):
+        for w in transcribe_chunk_words(chunk):
+            asr_words.append((w['word'], chunk, w['start'], w['end']))
+        if progress:
+            progress(done, len(chunks))
+
+    # ========== 2. Align words ==========
+    ref, ref_line = [], []
+    for line_pos, line in enumerate(lines):
+        if line.line_type != 'dialogue':
+            continue
+        for token in normalize_words(line.text):
+            ref.append(token)
+            ref_line.append(line_pos)
+
+    aligned = align_sequences(ref, [w[0] for w in asr_words])
+
+    line_words = {}  # line_pos -> [asr word indexes]
+    for ref_pos, hyp_pos in enumerate(aligned):
+        if hyp_pos >= 0:
+            line_words.setdefault(ref_line[ref_pos], []).append(hyp_pos)
+
+    # ========== 3. Place lines ==========
+    slices_by_chunk = {c.id: [] for c in chunks}
+    for s in AudioSlice.objects.filter(audio_chunk__in=chunks, is_draft=False):
+        slices_by_chunk[s.audio_chunk_id].append(s)
+
+    stats = {'aligned': 0, 'bound': 0, 'created': 0, 'unaligned': 0}
+    new_slices = []  # (line, AudioSlice)
+    current_chunk = chunks[0]
+
+    chunk_by_id = {c.id: c for c in chunks}
+
+    for line_pos, line in enumerate(lines):
+        if line.slice_id:
+            # The chunk objects loaded above: no query per bound line
+            current_chunk = chunk_by_id.get(line.slice.audio_chunk_id, current_chunk)
+            line.chunk = current_chunk
+            continue
+
+        word_idx = line_words.get(line_pos)
+        if not word_idx:
+            if line.line_type == 'dialogue':
+                stats['unaligned'] += 1
+            line.chunk = current_chunk
+            continue
+
+        # A line belongs to the chunk of its first word; words spilling into the next chunk are clamped off
+        first = asr_words[word_idx[0]]
+        current_chunk = first[1]
+        same_chunk = [asr_words[k] for k in word_idx if asr_words[k][1] is current_chunk]
+        start = first[2]
+        end = max(w[3] for w in same_chunk)
+        if end - start < MIN_LINE_DURATION:
+            end = start + MIN_LINE_DURATION
+
+        line.chunk = current_chunk
+        stats['aligned'] += 1
+
+        best, best_iou = None, BIND_IOU_THRESHOLD
+        for s in slices_by_chunk[current_chunk.id]:
+            iou = _iou(start, end, s.start_time, s.end_time)
+            if iou > best_iou:
+                best, best_iou = s, iou
+
+        if best:
+            line.slice = best
+            stats['bound'] += 1
+        else:
+            new_slice = AudioSlice(
+                audio_chunk=current_chunk,
+                start_time=round(start, 2),
+                end_time=round(end, 2),
+                original_text=line.text,
+            )
+            slices_by_chunk[current_chunk.id].append(new_slice)
+            new_slices.append((line, new_slice))
+
+    # ========== 4. Save ==========
+    with transaction.atomic():
+        created = AudioSlice.objects.bulk_create([s for _, s in new_slices])
+        for (line, _), audio_slice in zip(new_slices, created):
+            line.slice = audio_slice
+        stats['created'] = len(created)
+
+        # Aligned slices supersede VAD drafts in the same range
+        drafts = AudioSlice.objects.filter(audio_chunk__in=chunks, is_draft=True).values_list(
+            'id', 'audio_chunk_id', 'start_time', 'end_time'
+        )
+        superseded = [
+            draft_id for draft_id, chunk_id, d_start, d_end in drafts
+            if any(s.start_time < d_end and s.end_time > d_start for s in slices_by_chunk[chunk_id])
+        ]
+        AudioSlice.objects.filter(id__in=superseded).delete()
+
+        ScriptLine.objects.bulk_update(lines, ['chunk', 'slice'], batch_size=500)
+        AudioChunk.objects.filter(
+            id__in={s.audio_chunk_id for _, s in new_slices}
+        ).update(has_slices=True)
+
+    return stats
+
+
+# ==========================================
+# Chunk auto-bind (embedding similarity, no audio needed)
+# ==========================================
+AUTO_BIND_MIN_SIMILARITY = 0.3
+
+
+def monotonic_assignment(scores) -> list[int]:
+    """
+    Order-preserving one-to-one assignment of rows (lines) to columns (slices)
+    maximising the summed score; pairs scoring <= 0 are never used.
+
+    Same row-by-row DP as align_sequences with a zero gap cost: the left move is a
+    plain cumulative max, so each row is three NumPy ops.
+
+    Returns:
+        For every row, its assigned column, or -1.
+    """
+    import numpy as np
+
+    n, m = scores.shape
+    if n == 0 or m == 0:
+        return [-1] * n
+
+    DIAG, UP, LEFT = 0, 1, 2
+    trace = np.empty((n + 1, m + 1), dtype=np.int8)
+    trace[0, :] = LEFT
+    trace[:, 0] = UP
+
+    prev = np.zeros(m + 1)
+    for i in range(1, n + 1):
+        diag = prev[:-1] + scores[i - 1]
+        up = prev[1:]
+
+        best = np.zeros(m + 1)
+        best[1:] = np.maximum(diag, up)
+        row = np.maximum.accumulate(best)
+
+        trace[i, 1:] = np.where(row[1:] > best[1:], LEFT, np.where(diag > up, DIAG, UP))
+        prev = row
+
+    assigned = [-1] * n
+    i, j = n, m
+    while i > 0 and j > 0:
+        move = trace[i, j]
+        if move == DIAG:
+            assigned[i - 1] = j - 1
+            i, j = i - 1, j - 1
+        elif move == UP:
+            i -= 1
+        else:
+            j -= 1
+    return assigned
+
+
+def auto_bind_chunk(chunk, min_similarity=AUTO_BIND_MIN_SIMILARITY, overwrite=False) -> dict:
+    """
+    Bind a chunk's dialogue lines to its slices in one pass.
+
+    Lines and slices (by start_time) are matched on precomputed embeddings
+    (scripts/embeddings.py): one similarity matrix, an order-preserving assignment,
+    one bulk_update.
+
+    Args:
+        chunk: AudioChunk instance
+        min_similarity: cosine similarity below which a pair is never bound
+        overwrite: also re-bind lines that already have a slice (otherwise bound lines
+            and their slices are left out of the matching)
+
+    Returns:
+        {'bound': n, 'lines': n, 'slices': n, 'bindings': [{'line_id', 'slice_id', 'similarity'}, ...]}
+    """
+    from audio_slicer.models import AudioSlice
+    from .models import ScriptLine
+    from .embeddings import ensure_embeddings, load_embeddings
+
+    lines = ScriptLine.objects.filter(chunk=chunk, line_type='dialogue').order_by('order')
+    slices = AudioSlice.objects.filter(
+        audio_chunk=chunk, is_draft=False
+    ).exclude(original_text='').order_by('start_time')
+    if not overwrite:
+        lines = lines.filter(slice__isnull=True)
+        slices = slices.exclude(
+            id__in=ScriptLine.objects.filter(chunk=chunk, slice__isnull=False).values('slice_id')
+        )
+
+    # No-op when the precompute task already ran
+    ensure_embeddings(lines, 'text')
+    ensure_embeddings(slices, 'original_text')
+    line_ids, line_vecs = load_embeddings(lines)
+    slice_ids, slice_vecs = load_embeddings(slices)
+
+    stats = {'bound': 0, 'lines': len(line_ids), 'slices': len(slice_ids), 'bindings': []}
+    if not line_ids or not slice_ids:
+        return stats
+
+    similarities = line_vecs @ slice_vecs.T
+    assigned = monotonic_assignment(similarities - min_similarity)
+
+    updates = []
+    for row, col in enumerate(assigned):
+        if col < 0:
+            continue
+        updates.append(ScriptLine(id=line_ids[row], slice_id=slice_ids[col]))
+        stats['bindings'].append({
+            'line_id': line_ids[row],
+            'slice_id': slice_ids[col],
+            'similarity': round(float(similarities[row, col]), 4),
+        })
+
+    # Only the write is transactional: embedding and matching above may call the
+    # embedding API, which must not hold the SQLite write lock
+    with transaction.atomic():
+        ScriptLine.objects.bulk_update(updates, ['slice'])
+    stats['bound'] = len(updates)
+    return stats
@@ -2,14 +2,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.utils.urls import replace_query_param
 from ..models import ScriptLine
+from ..blitz import ShuffledDeck, get_deck_ids, get_highlight_index, new_seed
 from ..serializers import BlitzCardSerializer
+from audio_slicer.services import record_highlight_change
 from django.db.models import Count, Case, When, Value, CharField, F
 
 class BlitzCardViewSet(viewsets.GenericViewSet):
     """
     ViewSet for Blitz Camp functionality.
-    GET /api/scripts/blitz-cards/ - Get cards with filters (random/shuffle)
+    GET /api/scripts/blitz-cards/ - Get cards with filters (normal/seeded shuffle)
     GET /api/scripts/blitz-cards/stats/ - Get character stats
     PATCH /api/scripts/blitz-cards/{id}/update_status/ - Update highlight status
     """
@@ -18,12 +21,17 @@ class BlitzCardViewSet(viewsets.GenericViewSet):
 
     # Shared definition for consistent "Misc" handling
     MAIN_CAST = ['Ross', 'Rachel', 'Joe', 'Joey', 'Phoebe', 'Monica', 'Chandler']
+    STATUS_HIGHLIGHTS = {
+        'hard': ('red',),
+        'review': ('yellow',),
+        'learning': ('red', 'yellow'),
+    }
 
     def get_queryset(self):
         # Base queryset: Return all script lines for the user
         queryset = ScriptLine.objects.filter(
-            chunk__source_audio__user=self.request.user
-        ).select_related('slice', 'slice__audio_chunk', 'chunk')
+            user=self.request.user
+        ).select_related('slice', 'slice__audio_chunk', 'chunk__source_audio')
 
         # Filter by Source if provided
         drama_id = self.request.query_params.get('drama_id')
@@ -31,11 +39,11 @@ class BlitzCardViewSet(viewsets.GenericViewSet):
         episode = self.request.query_params.get('episode')
 
         if drama_id:
-            queryset = queryset.filter(chunk__source_audio__drama_id=drama_id)
+            queryset = queryset.filter(source_audio__drama_id=drama_id)
         if season:
-            queryset = queryset.filter(chunk__source_audio__season=season)
+            queryset = queryset.filter(source_audio__season=season)
         if episode:
-            queryset = queryset.filter(chunk__source_audio__episode=episode)
+            queryset = queryset.filter(source_audio__episode=episode)
 
         return queryset
 
@@ -44,6 +52,7 @@ class BlitzCardViewSet(viewsets.GenericViewSet):
         Get filtered list of cards.
         Params:
         - mode: 'shuffle' | 'normal'
+        - seed: shuffle session seed (returned by the first shuffled page)
         - status: 'hard' | 'review' | 'all'
         - character: 'All' | 'Chandler' ...
         - drama_id, season, episode: source filters
@@ -51,16 +60,11 @@ class BlitzCardViewSet(viewsets.GenericViewSet):
         """
         queryset = self.get_queryset()
 
-        # 1. Filter by Status
+        # 1. Filter by Status ('all' or anything unknown: no filter)
         status_filter = request.query_params.get('status', 'all')
-        if status_filter == 'hard':
-            queryset = queryset.filter(highlight='red')
-        elif status_filter == 'review':
-            queryset = queryset.filter(highlight='yellow')
-        elif status_filter == 'learning':
-            queryset = queryset.filter(highlight__in=['red', 'yellow'])
-        elif status_filter == 'all':
-            pass # No filter
+        highlights = self.STATUS_HIGHLIGHTS.get(status_filter)
+        if highlights:
+            queryset = queryset.filter(highlight__in=highlights)
 
         # 2. Filter by Character
         character = request.query_params.get('character', 'All')
@@ -75,9 +79,8 @@ class BlitzCardViewSet(viewsets.GenericViewSet):
         mode = request.query_params.get('mode', 'normal')
         
         if mode == 'shuffle':
-            queryset = queryset.order_by('?')
-        else:
-            queryset = queryset.order_by('id')
+            return self._shuffled_list(request, queryset, highlights, character)
+        queryset = queryset.order_by('id')
 
         # Pagination
         page = self.paginate_queryset(queryset)
@@ -88,6 +91,54 @@ class BlitzCardViewSet(viewsets.GenericViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    def _shuffled_list(self, request, queryset, highlights, character):
+        """
+        Shuffle mode: a stable seeded permutation of the deck (see scripts/blitz.py).
+        The response carries `seed`; pass it back with the next pages.
+        """
+        try:
+            seed = int(request.query_params.get('seed') or new_seed())
+            source = {
+                key: int(request.query_params[key])
+                for key in ('drama_id', 'season', 'episode')
+                if request.query_params.get(key)
+            }
+        except ValueError:
+            return Response({'error': 'seed, drama_id, season and episode must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        def build():
+            if not highlights:
+                # 'all' includes lines that aren't highlighted, which the index doesn't hold
+                return list(queryset.order_by('id').values_list('id', flat=True))
+            return [
+                line_id
+                for line_id, highlight, speaker, drama_id, season, episode in get_highlight_index(request.user)
+                if highlight in highlights
+                and self._matches_character(speaker, character)
+                and source.get('drama_id', drama_id) == drama_id
+                and source.get('season', season) == season
+                and source.get('episode', episode) == episode
+            ]
+
+        deck_filters = {'highlights': highlights, 'character': character, **source}
+        deck = ShuffledDeck(get_deck_ids(request.user, seed, deck_filters, build), seed, queryset)
+
+        page = self.paginate_queryset(deck)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data['seed'] = seed
+        if response.data.get('next'):
+            response.data['next'] = replace_query_param(response.data['next'], 'seed', seed)
+        return response
+
+    def _matches_character(self, speaker, character):
+        """Python twin of the character filter in list()."""
+        if not character or character == 'All':
+            return True
+        if character == 'Misc':
+            return speaker not in self.MAIN_CAST
+        return speaker == character
+
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """
@@ -134,8 +185,10 @@ class BlitzCardViewSet(viewsets.GenericViewSet):
         new_status = request.data.get('status')
         
         if new_status in ['red', 'yellow', 'none']:
+            old_status = card.highlight
             card.highlight = new_status
             card.save()
+            record_highlight_change(request.user, old_status, new_status)
             return Response({'status': 'success', 'highlight': card.highlight})
             
         return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
@@ -3,11 +3,44 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from ..models import ScriptLine
 from ..serializers import ScriptLineListSerializer, SplitRequestSerializer
 from audio_slicer.models import AudioChunk, AudioSlice
-import os
+from audio_slicer.services import record_highlight_change
+import json
+import hashlib
+
+LINES_PAGE_MAX = 200
+
+
+def _parse_cursor(value):
+    """'<order>:<id>' -> (order, id); None passes through."""
+    if not value:
+        return None
+    order, _, line_id = value.partition(':')
+    return int(order), int(line_id)
+
+
+def _cursor(line):
+    return f"{line.order}:{line.id}"
+
+
+def _keyset_after(lines, cursor, inclusive=False):
+    """Lines after (order, id), ascending."""
+    if cursor is not None:
+        order, line_id = cursor
+        id_lookup = {'id__gte': line_id} if inclusive else {'id__gt': line_id}
+        lines = lines.filter(Q(order__gt=order) | Q(order=order, **id_lookup))
+    return lines.order_by('order', 'id')
+
+
+def _keyset_before(lines, cursor):
+    """Lines before (order, id), descending (nearest first)."""
+    order, line_id = cursor
+    return lines.filter(Q(order__lt=order) | Q(order=order, id__lt=line_id)).order_by('-order', '-id')
+
 
 class ScriptLineViewSet(viewsets.ViewSet):
     """
@@ -30,38 +63,107 @@ class ScriptLineViewSet(viewsets.ViewSet):
             )
         
         # Update allowed fields
+        old_highlight = line.highlight
         if 'highlight' in request.data:
             line.highlight = request.data['highlight']
         
         line.save()
+        record_highlight_change(request.user, old_highlight, line.highlight)
         
         return Response(ScriptLineListSerializer(line).data)
 
     def list(self, request, chunk_pk=None):
         """
         GET /api/scripts/chunk/{chunk_id}/lines/?limit=50
-        Returns script lines for a chunk.
+        Returns one window of script lines for a chunk, in `order`.
+        
+        Query params (all optional):
+            after / before: cursor from a previous page's `next` / `previous`
+            around: line id, returns the window centred on that line
+            fields: comma-separated subset of ScriptLineListSerializer fields (id is always included)
+        
+        Responds 304 when If-None-Match matches the window's ETag.
         """
         chunk = get_object_or_404(AudioChunk, pk=chunk_pk)
-        limit = int(request.query_params.get('limit', 50))
         
-        lines = ScriptLine.objects.filter(chunk=chunk).order_by('order')[:limit]
-        serializer = ScriptLineListSerializer(lines, many=True)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), LINES_PAGE_MAX)
+            after = _parse_cursor(request.query_params.get('after'))
+            before = _parse_cursor(request.query_params.get('before'))
+            around = request.query_params.get('around')
+            around = int(around) if around else None
+        except ValueError:
+            return Response(
+                {'error': 'limit and around must be integers, cursors must come from next/previous'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        total_count = ScriptLine.objects.filter(chunk=chunk).count()
+        fields = request.query_params.get('fields')
+        if fields:
+            fields = ['id'] + [f for f in fields.split(',') if f and f != 'id']
+            unknown = set(fields) - set(ScriptLineListSerializer.Meta.fields)
+            if unknown:
+                return Response(
+                    {'error': f"Unknown fields: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         
-        return Response({
-            'results': serializer.data,
-            'count': total_count,
+        lines = ScriptLine.objects.filter(chunk=chunk)
+        if fields:
+            lines = lines.only('order', *fields)
+        
+        # Keyset pagination on (order, id), served by the (chunk, order) index
+        if around is not None:
+            anchor = ScriptLine.objects.filter(chunk=chunk, pk=around).values_list('order', 'id').first()
+            if anchor is None:
+                return Response(
+                    {'error': f'Line {around} is not in this chunk'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            head = list(_keyset_before(lines, anchor)[:limit // 2 + 1])
+            has_previous = len(head) > limit // 2
+            head = head[:limit // 2][::-1]
+            tail = list(_keyset_after(lines, anchor, inclusive=True)[:limit - len(head) + 1])
+            has_next = len(tail) > limit - len(head)
+            page = head + tail[:limit - len(head)]
+        elif before is not None:
+            page = list(_keyset_before(lines, before)[:limit + 1])
+            has_previous, has_next = len(page) > limit, True
+            page = page[:limit][::-1]
+        else:
+            page = list(_keyset_after(lines, after)[:limit + 1])
+            has_previous, has_next = after is not None, len(page) > limit
+            page = page[:limit]
+        
+        payload = {
+            'results': ScriptLineListSerializer(page, many=True, fields=fields).data,
+            'count': ScriptLine.objects.filter(chunk=chunk).count(),
             'limit': limit,
-        })
+            'next': _cursor(page[-1]) if page and has_next else None,
+            'previous': _cursor(page[0]) if page and has_previous else None,
+        }
+        
+        # Script lines have no modified timestamp, so the ETag is a digest of the window itself:
+        # it saves the transfer (and client re-render) of unchanged windows, not the queries
+        etag = '"lines-{}"'.format(
+            hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        )
+        if request.headers.get('If-None-Match') == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
     @action(detail=False, methods=['post'])
     def split(self, request, chunk_pk=None):
         """
         POST /api/scripts/chunk/{chunk_id}/split/
         Body: { "start_index": 21, "next_chunk_id": 14 }
-        Move lines from start_index onwards to next_chunk.
+        Move lines from start_index onwards to next_chunk. "Onwards" is by order, so
+        lines inserted after the split point (index -1) move too and the order stays
+        increasing across the episode (see scripts/ordering.py).
         """
         serializer = SplitRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -73,10 +175,20 @@ class ScriptLineViewSet(viewsets.ViewSet):
         next_chunk = get_object_or_404(AudioChunk, pk=next_chunk_id)
         
         with transaction.atomic():
-            moved_count = ScriptLine.objects.filter(
+            boundary = ScriptLine.objects.filter(
                 chunk=current_chunk,
                 index__gte=start_index
-            ).update(chunk=next_chunk)
+            ).order_by('order').values_list('order', flat=True).first()
+            moved_count = 0
+            if boundary is not None:
+                moved_count = ScriptLine.objects.filter(
+                    chunk=current_chunk,
+                    order__gte=boundary
+                ).update(
+                    chunk=next_chunk,
+                    source_audio_id=next_chunk.source_audio_id,
+                    user_id=next_chunk.source_audio.user_id,
+                )
         
         return Response({
             'moved_count': moved_count,
@@ -105,7 +217,11 @@ class ScriptLineViewSet(viewsets.ViewSet):
         with transaction.atomic():
             moved_count = ScriptLine.objects.filter(
                 chunk=from_chunk
-            ).update(chunk=current_chunk)
+            ).update(
+                chunk=current_chunk,
+                source_audio_id=current_chunk.source_audio_id,
+                user_id=current_chunk.source_audio.user_id,
+            )
         
         return Response({
             'moved_count': moved_count,
@@ -113,15 +229,52 @@ class ScriptLineViewSet(viewsets.ViewSet):
             'from_chunk_id': from_chunk.id,
         })
 
+    @action(detail=False, methods=['post'], url_path='auto-bind')
+    def auto_bind(self, request, chunk_pk=None):
+        """
+        POST /api/scripts/chunk/{chunk_id}/auto-bind/
+        Body: { "min_similarity": 0.3, "overwrite": false }  // both optional
+        Bind all dialogue lines of the chunk to its slices in one order-preserving pass.
+        """
+        from ..alignment import auto_bind_chunk, AUTO_BIND_MIN_SIMILARITY
+
+        chunk = get_object_or_404(AudioChunk, pk=chunk_pk)
+
+        # Check ownership
+        if chunk.source_audio.user != request.user:
+            return Response(
+                {'error': 'Unauthorized'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            min_similarity = float(request.data.get('min_similarity', AUTO_BIND_MIN_SIMILARITY))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'min_similarity must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        overwrite = bool(request.data.get('overwrite', False))
+
+        stats = auto_bind_chunk(chunk, min_similarity=min_similarity, overwrite=overwrite)
+
+        return Response({
+            'chunk_id': chunk.id,
+            **stats,
+            'message': f"Bound {stats['bound']} of {stats['lines']} lines to {stats['slices']} slices",
+        })
+
     def search_slices(self, request, pk=None):
         """
         POST /api/scripts/lines/{id}/search-slices/
         Find the best matching AudioSlice for a ScriptLine using
         embedding similarity (cosine). Searches within the same chunk.
+        
+        Embeddings are precomputed (scripts/embeddings.py), so this is one
+        matrix-vector product; rows missing an embedding are filled in first.
         """
         import numpy as np
-        from langchain_google_genai import GoogleGenerativeAIEmbeddings
-        from django.conf import settings
+        from ..embeddings import ensure_embeddings, load_embeddings
 
         line = get_object_or_404(ScriptLine, pk=pk)
 
@@ -132,60 +285,41 @@ class ScriptLineViewSet(viewsets.ViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Get all AudioSlices in the same chunk
+        # Get all AudioSlices in the same chunk that have text
         slices = AudioSlice.objects.filter(
-            audio_chunk=line.chunk
-        ).order_by('start_time')
+            audio_chunk=line.chunk,
+            is_draft=False
+        ).exclude(original_text='').order_by('start_time')
 
         if not slices.exists():
             return Response({
                 'results': [],
-                'message': 'No audio slices found in this chunk.',
+                'message': 'No audio slices with text found in this chunk.',
             })
 
-        # Prepare texts
-        query_text = line.text
-        candidate_texts = [s.original_text for s in slices]
+        # No-op when the precompute task already ran
+        line_rows = ScriptLine.objects.filter(pk=line.pk)
+        ensure_embeddings(line_rows, 'text')
+        ensure_embeddings(slices, 'original_text')
 
-        # Filter out empty texts
-        valid_pairs = [
-            (s, t) for s, t in zip(slices, candidate_texts)
-            if t and t.strip()
-        ]
-        if not valid_pairs:
+        _, query_vecs = load_embeddings(line_rows)
+        slice_ids, candidate_vecs = load_embeddings(slices)
+        if not len(query_vecs) or not slice_ids:
             return Response({
                 'results': [],
                 'message': 'No audio slices with text found in this chunk.',
             })
 
-        valid_slices, valid_texts = zip(*valid_pairs)
-
-        # Compute embeddings
-        api_key = os.getenv('GOOGLE_API_KEY') or ''
-        embeddings_model = GoogleGenerativeAIEmbeddings(
-            model="models/gemini-embedding-001",
-            google_api_key=api_key,
-        )
-
-        # Batch: embed query + all candidates in one call
-        all_texts = [query_text] + list(valid_texts)
-        all_embeddings = embeddings_model.embed_documents(all_texts)
-
-        query_vec = np.array(all_embeddings[0])
-        candidate_vecs = np.array(all_embeddings[1:])
-
-        # Cosine similarity
-        dot_products = candidate_vecs @ query_vec
-        query_norm = np.linalg.norm(query_vec)
-        candidate_norms = np.linalg.norm(candidate_vecs, axis=1)
-        similarities = dot_products / (query_norm * candidate_norms + 1e-10)
+        # Cosine similarity (vectors are stored L2-normalised)
+        similarities = candidate_vecs @ query_vecs[0]
 
         # Rank and pick top 3
         top_indices = np.argsort(similarities)[::-1][:3]
+        top_slices = AudioSlice.objects.in_bulk([slice_ids[idx] for idx in top_indices])
 
         results = []
         for idx in top_indices:
-            s = valid_slices[idx]
+            s = top_slices[slice_ids[idx]]
             results.append({
                 'slice_id': s.id,
                 'original_text': s.original_text,
@@ -196,7 +330,7 @@ class ScriptLineViewSet(viewsets.ViewSet):
             })
 
         return Response({
-            'query_text': query_text,
+            'query_text': line.text,
             'results': results,
         })
 
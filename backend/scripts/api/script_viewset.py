@@ -3,11 +3,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from ..models import ScriptLine, ScriptTask
+from ..ordering import order_for_index
 from ..serializers import IngestRequestSerializer
 from ..parser import parse_fanfr_script
 from audio_slicer.models import AudioChunk, SourceAudio
-from ai_analysis.services import batch_translate_texts
-from django.db.models import Q
+from audio_slicer.services import invalidate_learning_progress
+from ..translation import get_untranslated_lines, translate_script_lines
 
 class ScriptViewSet(viewsets.ViewSet):
     """
@@ -66,15 +67,17 @@ class ScriptViewSet(viewsets.ViewSet):
             )
         
         # Delete existing script lines for this chunk (if re-ingesting)
-        ScriptLine.objects.filter(chunk__source_audio=source_audio).delete()
+        ScriptLine.objects.filter(source_audio=source_audio).delete()
         
         # Create script lines
         script_lines = []
         for idx, line_data in enumerate(parsed_lines):
             script_lines.append(ScriptLine(
                 chunk=first_chunk,
+                source_audio=source_audio,
+                user_id=source_audio.user_id,
                 index=idx,
-                order=float(idx),
+                order=order_for_index(idx),
                 line_type=line_data['type'],
                 speaker=line_data.get('speaker'),
                 text=line_data['text'],
@@ -83,6 +86,9 @@ class ScriptViewSet(viewsets.ViewSet):
             ))
         
         ScriptLine.objects.bulk_create(script_lines)
+        invalidate_learning_progress(request.user)
+        from ..tasks import precompute_episode_embeddings
+        precompute_episode_embeddings(source_audio.id)
         
         return Response({
             'created': len(script_lines),
@@ -116,7 +122,8 @@ class ScriptViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        deleted_count, _ = ScriptLine.objects.filter(chunk__source_audio=source_audio).delete()
+        deleted_count, _ = ScriptLine.objects.filter(source_audio=source_audio).delete()
+        invalidate_learning_progress(request.user)
         
         return Response({
             'deleted': deleted_count,
@@ -156,11 +163,7 @@ class ScriptViewSet(viewsets.ViewSet):
             )
         
         # Get script lines without translation
-        lines_to_translate = ScriptLine.objects.filter(
-            chunk__source_audio=source_audio
-        ).filter(
-            Q(text_zh__isnull=True) | Q(text_zh__exact='')
-        ).order_by('index')
+        lines_to_translate = get_untranslated_lines(source_audio)
         
         if not lines_to_translate.exists():
             return Response({
@@ -168,39 +171,68 @@ class ScriptViewSet(viewsets.ViewSet):
                 'translated_count': 0
             })
         
-        # Prepare data for translation (batch by 50)
-        BATCH_SIZE = 50
-        total_translated = 0
-        
-        all_lines = list(lines_to_translate.values('id', 'text'))
-        
-        for i in range(0, len(all_lines), BATCH_SIZE):
-            batch = all_lines[i:i + BATCH_SIZE]
-            # Format for batch_translate_texts: [{'id': 1, 'text': '...'}]
-            
-            try:
-                translations = batch_translate_texts(batch)
-                
-                # Update database
-                for item in translations:
-                    line_id = item.get('id')
-                    translation = item.get('translation')
-                    if line_id and translation:
-                        ScriptLine.objects.filter(id=line_id).update(text_zh=translation)
-                        total_translated += 1
-                        
-            except Exception as e:
-                return Response({
-                    'error': f'Translation failed at batch {i//BATCH_SIZE}: {str(e)}',
-                    'translated_so_far': total_translated
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # Concurrent batches of 50 under the translation rate limit
+        try:
+            total_translated, total_lines = translate_script_lines(lines_to_translate)
+        except Exception as e:
+            return Response({
+                'error': f'Translation failed: {str(e)}',
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         return Response({
             'message': f'Successfully translated {total_translated} lines',
             'translated_count': total_translated,
-            'total_lines': len(all_lines)
+            'total_lines': total_lines
         })
 
+    @action(detail=False, methods=['post'])
+    def align(self, request):
+        """
+        Force-align the script lines of a source audio to its chunks (background task).
+        POST /api/scripts/align/
+        Body: { "season": 10, "episode": 13 }
+
+        Moves every line to the chunk it is spoken in and binds it to an AudioSlice,
+        creating the slice if none overlaps. Poll task_status for progress.
+        """
+        from ..tasks import align_episode_script
+
+        serializer = IngestRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        season = serializer.validated_data['season']
+        episode = serializer.validated_data['episode']
+
+        source_audio = SourceAudio.objects.filter(
+            user=request.user,
+            season=season,
+            episode=episode
+        ).first()
+
+        if not source_audio:
+            return Response(
+                {'error': f'No source audio found for S{season:02d}E{episode:02d}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not ScriptLine.objects.filter(source_audio=source_audio).exists():
+            return Response(
+                {'error': 'No script lines to align, ingest the script first'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        script_task = ScriptTask.objects.create(
+            source_audio=source_audio,
+            status='pending',
+            message=f'Queued alignment for S{season:02d}E{episode:02d}',
+        )
+        align_episode_script(script_task.id)
+
+        return Response({
+            'task_id': script_task.id,
+            'source_audio_id': source_audio.id,
+        }, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=False, methods=['get'])
     def task_status(self, request):
         """
@@ -232,6 +264,9 @@ class ScriptViewSet(viewsets.ViewSet):
             'message': task.message,
             'ingest_count': task.ingest_count,
             'translate_count': task.translate_count,
+            'translate_batches_done': task.translate_batches_done,
+            'translate_batches_total': task.translate_batches_total,
+            'align_count': task.align_count,
             'created_at': task.created_at.isoformat(),
             'updated_at': task.updated_at.isoformat(),
         })
@@ -0,0 +1,130 @@
+"""
+Seeded shuffle for Blitz Camp decks.
+
+Instead of ORDER BY RANDOM() (a full sort per page, and repeated cards across pages),
+a shuffle session is a seed:
+
+1. The user's highlighted lines are kept as a cached index of
+   (id, highlight, speaker, drama_id, season, episode) rows, dropped on every
+   ScriptLine save (scripts/signals.py), highlight change (record_highlight_change)
+   and bulk ingest/clear (invalidate_learning_progress), and expired after
+   INDEX_CACHE_TIMEOUT for writes that bypass those.
+2. The session's deck is the filtered id list, snapshotted per seed, so pages of
+   one session always see the same deck.
+
+Both live in the default Django cache, which settings.CACHES points at a file cache
+so every worker process sees the same index and deck.
+3. Position i of the deck is ids[permute(i)], where permute is a seeded Feistel
+   permutation: any page is O(page size) and no card appears twice.
+"""
+import hashlib
+import secrets
+
+from django.core.cache import cache
+
+HIGHLIGHTED = ('red', 'yellow')
+INDEX_CACHE_TIMEOUT = 10 * 60  # s: the highlight index
+DECK_CACHE_TIMEOUT = 60 * 60  # s: a shuffle session's deck snapshot
+FEISTEL_ROUNDS = 4
+
+
+def _user_id(user):
+    return getattr(user, 'pk', user)
+
+
+# ============ Highlight index ============
+
+def _index_key(user) -> str:
+    return f'blitz-index:{_user_id(user)}'
+
+
+def get_highlight_index(user) -> list[tuple]:
+    """The user's highlighted lines as (id, highlight, speaker, drama_id, season, episode), by id."""
+    from .models import ScriptLine
+
+    key = _index_key(user)
+    index = cache.get(key)
+    if index is None:
+        index = list(
+            ScriptLine.objects.filter(
+                user=user, highlight__in=HIGHLIGHTED
+            ).order_by('id').values_list(
+                'id', 'highlight', 'speaker',
+                'source_audio__drama_id', 'source_audio__season', 'source_audio__episode',
+            )
+        )
+        cache.set(key, index, INDEX_CACHE_TIMEOUT)
+    return index
+
+
+def invalidate_highlight_index(user) -> None:
+    cache.delete(_index_key(user))
+
+
+# ============ Seeded permutation ============
+
+def new_seed() -> int:
+    return secrets.randbelow(2 ** 31)
+
+
+def _round(seed: int, round_no: int, value: int, mask: int) -> int:
+    digest = hashlib.blake2b(f'{seed}:{round_no}:{value}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') & mask
+
+
+def permute(position: int, n: int, seed: int) -> int:
+    """
+    Map position in [0, n) to a unique index in [0, n): a balanced Feistel network
+    over the next power-of-4 domain, cycle-walking back into range (< 4 steps on average).
+    """
+    half = max(1, ((n - 1).bit_length() + 1) // 2)
+    mask = (1 << half) - 1
+    x = position
+    while True:
+        left, right = x >> half, x & mask
+        for round_no in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ _round(seed, round_no, right, mask)
+        x = (left << half) | right
+        if x < n:
+            return x
+
+
+class ShuffledDeck:
+    """
+    Read-only sequence over a seeded permutation of `ids`, for DRF pagination.
+    Slicing loads only that page's rows from `queryset`.
+    """
+
+    def __init__(self, ids: list[int], seed: int, queryset):
+        self.ids = ids
+        self.seed = seed
+        self.queryset = queryset
+
+    def __len__(self):
+        return len(self.ids)
+
+    def count(self):
+        return len(self.ids)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        n = len(self.ids)
+        page_ids = [self.ids[permute(p, n, self.seed)] for p in range(*item.indices(n))]
+        rows = self.queryset.in_bulk(page_ids)
+        # Lines deleted or un-highlighted since the snapshot are skipped
+        return [rows[i] for i in page_ids if i in rows]
+
+
+def get_deck_ids(user, seed: int, filters: dict, build) -> list[int]:
+    """
+    The id list of one shuffle session (user + seed + filters), cached for
+    DECK_CACHE_TIMEOUT. `build()` computes it on the first page.
+    """
+    digest = hashlib.sha1(repr(sorted(filters.items())).encode()).hexdigest()[:16]
+    key = f'blitz-deck:{_user_id(user)}:{seed}:{digest}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = build()
+        cache.set(key, ids, DECK_CACHE_TIMEOUT)
+    return ids
@@ -0,0 +1,151 @@
+"""
+Precomputed text embeddings for ScriptLine <-> AudioSlice matching.
+
+ScriptLine.text and AudioSlice.original_text are embedded once (after slice save and
+script ingest, see scripts.tasks.precompute_episode_embeddings) and stored as
+L2-normalised float32 bytes. Matching is then a single matrix-vector product.
+
+Each row also stores an embedding_key (backend + text digest): an edited text or a
+changed settings.EMBEDDING_BACKEND makes the row stale, and ensure_embeddings()
+recomputes only the stale rows.
+
+Backends:
+    'gemini'  - Google gemini-embedding-001 (needs GOOGLE_API_KEY)
+    'hashing' - local feature-hashing vectorizer, no network or API key
+"""
+import os
+import re
+import zlib
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+
+EMBED_BATCH_SIZE = 100
+
+
+# ============ Backends ============
+
+class HashingEmbeddingBackend:
+    """
+    Signed feature hashing of word unigrams, word bigrams and character trigrams.
+    Captures lexical overlap only, which is what transcript-vs-script matching needs.
+    """
+    name = 'hashing-1024'
+    dim = 1024
+    TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+    def _features(self, text: str) -> list[str]:
+        words = self.TOKEN_RE.findall(text.lower())
+        features = [f'w:{w}' for w in words]
+        features += [f'b:{a} {b}' for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f' {w} '
+            features += [f'c:{padded[i:i + 3]}' for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode('utf-8'))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return vectors
+
+
+class GeminiEmbeddingBackend:
+    """Google embeddings; one client per process, batched requests."""
+    name = 'gemini-embedding-001'
+
+    def __init__(self):
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        self.client = GoogleGenerativeAIEmbeddings(
+            model="models/gemini-embedding-001",
+            google_api_key=os.getenv('GOOGLE_API_KEY') or '',
+        )
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return np.asarray(self.client.embed_documents(texts), dtype=np.float32)
+
+
+EMBEDDING_BACKENDS = {
+    'hashing': HashingEmbeddingBackend,
+    'gemini': GeminiEmbeddingBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def _build_backend(name: str):
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {name!r}, expected one of {sorted(EMBEDDING_BACKENDS)}")
+    return EMBEDDING_BACKENDS[name]()
+
+
+def get_embedding_backend():
+    """The configured backend (settings.EMBEDDING_BACKEND), built once per process."""
+    return _build_backend(settings.EMBEDDING_BACKEND)
+
+
+# ============ Storage ============
+
+def embedding_key(backend, text: str) -> str:
+    return f"{backend.name}:{hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]}"
+
+
+def embed_texts(texts: list[str]) -> np.ndarray:
+    """Embed with the configured backend; rows are L2-normalised float32."""
+    backend = get_embedding_backend()
+    parts = [backend.embed(texts[i:i + EMBED_BATCH_SIZE]) for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+    vectors = np.vstack(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-10)
+
+
+def ensure_embeddings(queryset, text_field: str) -> int:
+    """
+    Compute and store embeddings for rows of `queryset` whose embedding is missing
+    or stale. Reads only (id, text, embedding_key); one bulk_update.
+
+    Returns:
+        number of rows (re)embedded
+    """
+    backend = get_embedding_backend()
+    stale = [
+        (pk, text, key)
+        for pk, text, old_key in queryset.values_list('pk', text_field, 'embedding_key')
+        if text and text.strip()
+        for key in [embedding_key(backend, text)]
+        if key != old_key
+    ]
+    if not stale:
+        return 0
+
+    vectors = embed_texts([text for _, text, _ in stale])
+    model = queryset.model
+    model.objects.bulk_update(
+        [
+            model(pk=pk, embedding=vector.tobytes(), embedding_key=key)
+            for (pk, _, key), vector in zip(stale, vectors)
+        ],
+        ['embedding', 'embedding_key'],
+        batch_size=500,
+    )
+    return len(stale)
+
+
+def load_embeddings(queryset) -> tuple[list[int], np.ndarray]:
+    """
+    (ids, matrix) for the rows of `queryset` embedded with the current backend,
+    in queryset order. Call ensure_embeddings() first.
+    """
+    prefix = f"{get_embedding_backend().name}:"
+    rows = [
+        (pk, blob)
+        for pk, blob, key in queryset.values_list('pk', 'embedding', 'embedding_key')
+        if blob and key.startswith(prefix)
+    ]
+    if not rows:
+        return [], np.zeros((0, 0), dtype=np.float32)
+    ids = [pk for pk, _ in rows]
+    return ids, np.vstack([np.frombuffer(bytes(blob), dtype=np.float32) for _, blob in rows])
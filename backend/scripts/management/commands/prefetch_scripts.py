@@ -0,0 +1,88 @@
+"""
+Management command to pre-fetch and pre-parse a season of fanfr.com scripts
+into the on-disk script cache (settings.SCRIPT_CACHE_DIR), so script ingests
+never wait on the network.
+
+Usage:
+    python manage.py prefetch_scripts --season 10
+    python manage.py prefetch_scripts --season 10 --episodes 1-5,8
+    python manage.py prefetch_scripts --season 10 --revalidate --workers 8
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def parse_episode_range(value: str) -> list[int]:
+    """'1-5,8' -> [1, 2, 3, 4, 5, 8]"""
+    episodes = set()
+    for part in value.split(','):
+        start, _, end = part.strip().partition('-')
+        try:
+            episodes.update(range(int(start), int(end or start) + 1))
+        except ValueError:
+            raise CommandError(f"Invalid episode range: {part!r}")
+    return sorted(episodes)
+
+
+class Command(BaseCommand):
+    help = 'Pre-fetch and pre-parse a season of Friends scripts into the local script cache'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--season',
+            type=int,
+            required=True,
+            help='Season number (1-10)',
+        )
+        parser.add_argument(
+            '--episodes',
+            type=str,
+            default='1-25',
+            help='Episode numbers, e.g. "1-24" or "1-5,8" (default: 1-25)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Concurrent downloads',
+        )
+        parser.add_argument(
+            '--revalidate',
+            action='store_true',
+            help='Revalidate cached pages with the site even if they are fresh',
+        )
+    
+    def handle(self, *args, **options):
+        from scripts.parser import get_parsed_script
+        
+        season = options['season']
+        episodes = parse_episode_range(options['episodes'])
+        
+        self.stdout.write(f"Prefetching S{season:02d}: {len(episodes)} episodes, {options['workers']} workers...")
+        
+        cached, failed = 0, 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {
+                pool.submit(get_parsed_script, season, episode, options['revalidate']): episode
+                for episode in episodes
+            }
+            for future in as_completed(futures):
+                episode = futures[future]
+                try:
+                    lines = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(f"  S{season:02d}E{episode:02d}: {e}"))
+                    continue
+                
+                if lines:
+                    cached += 1
+                    self.stdout.write(f"  S{season:02d}E{episode:02d}: {len(lines)} lines")
+                else:
+                    # Seasons have fewer episodes than the default range; the site returns an empty page
+                    self.stdout.write(self.style.WARNING(f"  S{season:02d}E{episode:02d}: no script lines"))
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone: {cached} episodes cached, {failed} failed"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0007_alter_scriptline_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scripttask',
+            name='align_count',
+            field=models.IntegerField(default=0, help_text='Number of lines aligned to audio'),
+        ),
+        migrations.AlterField(
+            model_name='scripttask',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ingesting', 'Ingesting Script'), ('translating', 'Translating'), ('aligning', 'Aligning Audio'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+    ]
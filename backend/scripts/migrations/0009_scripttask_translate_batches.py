@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0008_scripttask_align_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scripttask',
+            name='translate_batches_done',
+            field=models.IntegerField(default=0, help_text='Number of translation batches finished'),
+        ),
+        migrations.AddField(
+            model_name='scripttask',
+            name='translate_batches_total',
+            field=models.IntegerField(default=0, help_text='Number of translation batches'),
+        ),
+    ]
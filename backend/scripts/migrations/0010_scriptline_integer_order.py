@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+ORDER_GAP = 1024
+
+
+def renumber_orders(apps, schema_editor):
+    """
+    Rewrite every line's order as position * 1024 within its episode.
+    Lines ingested by the background task were left at order=0 and only sorted
+    by the editor's "auto-heal" (order = index); keep that same effective order.
+    """
+    ScriptLine = apps.get_model('scripts', 'ScriptLine')
+    rows = ScriptLine.objects.values_list(
+        'id', 'chunk__source_audio_id', 'chunk__chunk_index', 'order', 'index'
+    )
+
+    def sort_key(row):
+        line_id, source_audio_id, chunk_index, order, index = row
+        effective = index if order == 0 and index != -1 else order
+        return (source_audio_id, chunk_index, effective, index, line_id)
+
+    batch = []
+    position, current_episode = 0, None
+    for line_id, source_audio_id, *_ in sorted(rows, key=sort_key):
+        if source_audio_id != current_episode:
+            position, current_episode = 0, source_audio_id
+        batch.append(ScriptLine(id=line_id, order=position * ORDER_GAP))
+        position += 1
+        if len(batch) >= 500:
+            ScriptLine.objects.bulk_update(batch, ['order'])
+            batch = []
+    if batch:
+        ScriptLine.objects.bulk_update(batch, ['order'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0009_scripttask_translate_batches'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            renumber_orders,
+            migrations.RunPython.noop,  # reverse: do nothing
+        ),
+        migrations.AlterField(
+            model_name='scriptline',
+            name='order',
+            field=models.BigIntegerField(default=0, help_text='排序权重，间隔整数 (index * 1024)，插入取相邻两行中点，见 scripts/ordering.py'),
+        ),
+    ]
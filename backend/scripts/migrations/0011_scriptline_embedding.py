@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0010_scriptline_integer_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scriptline',
+            name='embedding',
+            field=models.BinaryField(blank=True, help_text='L2 归一化的 float32 向量', null=True),
+        ),
+        migrations.AddField(
+            model_name='scriptline',
+            name='embedding_key',
+            field=models.CharField(blank=True, default='', help_text='生成向量的后端 + 文本摘要，不一致即过期', max_length=64),
+        ),
+    ]
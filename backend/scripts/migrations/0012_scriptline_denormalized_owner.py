@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_owner_columns(apps, schema_editor):
+    """Copy chunk.source_audio (and its user) onto every existing line, in one UPDATE."""
+    ScriptLine = apps.get_model('scripts', 'ScriptLine')
+    AudioChunk = apps.get_model('audio_slicer', 'AudioChunk')
+    chunk = AudioChunk.objects.filter(id=OuterRef('chunk_id'))
+    ScriptLine.objects.update(
+        source_audio_id=Subquery(chunk.values('source_audio_id')[:1]),
+        user_id=Subquery(chunk.values('source_audio__user_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audio_slicer', '0021_audioslice_embedding'),
+        ('scripts', '0011_scriptline_embedding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scriptline',
+            name='source_audio',
+            field=models.ForeignKey(help_text='冗余: chunk.source_audio', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='script_lines', to='audio_slicer.sourceaudio'),
+        ),
+        migrations.AddField(
+            model_name='scriptline',
+            name='user',
+            field=models.ForeignKey(help_text='冗余: chunk.source_audio.user', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='script_lines', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(
+            fill_owner_columns,
+            migrations.RunPython.noop,  # reverse: do nothing
+        ),
+        migrations.AddIndex(
+            model_name='scriptline',
+            index=models.Index(fields=['user', 'highlight'], name='scripts_scr_user_id_0ca6fc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scriptline',
+            index=models.Index(fields=['user', 'speaker', 'highlight'], name='scripts_scr_user_id_75edb9_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 
@@ -13,9 +14,25 @@ class ScriptLine(models.Model):
         related_name='script_lines',
         help_text="归属的 Chunk，初始全部指向该集第一个 Chunk"
     )
+    # 冗余字段: chunk → source_audio → user 的三表 join 是 Blitz / Dashboard 的热点过滤条件
+    # 导入、split、undo_split 时同步写入；单行 save() 时按 chunk 自动补齐
+    source_audio = models.ForeignKey(
+        'audio_slicer.SourceAudio',
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='script_lines',
+        help_text="冗余: chunk.source_audio"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='script_lines',
+        help_text="冗余: chunk.source_audio.user"
+    )
     index = models.IntegerField(db_index=True, help_text="原始导入顺序 (0, 1, 2...), 不可修改")
     # db_index=True 只在纯粹的 order 排序时有用，目前业务不涉及，留着反而可能白白占用磁盘空间、妨碍写入速度。
-    order = models.FloatField(default=0, help_text="排序权重，支持小数插入 (1.5 = 在1和2之间)")
+    order = models.BigIntegerField(default=0, help_text="排序权重，间隔整数 (index * 1024)，插入取相邻两行中点，见 scripts/ordering.py")
 
     # --- 2. 类型与内容 ---
     LINE_TYPES = [
@@ -39,6 +56,9 @@ class ScriptLine(models.Model):
         on_delete=models.SET_NULL,
         help_text="弱关联到具体的 AudioSlice (点击查找后绑定)"
     )
+    # 预计算的文本向量 (scripts/embeddings.py)，用于和 AudioSlice 匹配
+    embedding = models.BinaryField(null=True, blank=True, help_text="L2 归一化的 float32 向量")
+    embedding_key = models.CharField(max_length=64, blank=True, default='', help_text="生成向量的后端 + 文本摘要，不一致即过期")
 
     HIGHLIGHT_CHOICES = [
         ('none', 'None'),
@@ -54,7 +74,30 @@ class ScriptLine(models.Model):
 
     class Meta:
         ordering = ['chunk', 'order']
-        indexes = [models.Index(fields=['chunk', 'order'])]
+        indexes = [
+            models.Index(fields=['chunk', 'order']),
+            # Blitz list / stats, dashboard counters
+            models.Index(fields=['user', 'highlight']),
+            models.Index(fields=['user', 'speaker', 'highlight']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_chunk_id = instance.__dict__.get('chunk_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep the denormalized episode/user columns in step with the chunk
+        if self.chunk_id and (self.source_audio_id is None or self.chunk_id != getattr(self, '_loaded_chunk_id', None)):
+            from audio_slicer.models import AudioChunk
+            self.source_audio_id, self.user_id = AudioChunk.objects.filter(
+                id=self.chunk_id
+            ).values_list('source_audio_id', 'source_audio__user_id').get()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'source_audio', 'user'}
+        super().save(*args, **kwargs)
+        self._loaded_chunk_id = self.chunk_id
 
     def __str__(self):
         if self.line_type == 'dialogue':
@@ -78,6 +121,7 @@ class ScriptTask(models.Model):
         ('pending', 'Pending'),
         ('ingesting', 'Ingesting Script'),
         ('translating', 'Translating'),
+        ('aligning', 'Aligning Audio'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ]
@@ -91,6 +135,9 @@ class ScriptTask(models.Model):
     message = models.TextField(blank=True, default='')
     ingest_count = models.IntegerField(default=0, help_text="Number of script lines ingested")
     translate_count = models.IntegerField(default=0, help_text="Number of lines translated")
+    translate_batches_total = models.IntegerField(default=0, help_text="Number of translation batches")
+    translate_batches_done = models.IntegerField(default=0, help_text="Number of translation batches finished")
+    align_count = models.IntegerField(default=0, help_text="Number of lines aligned to audio")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
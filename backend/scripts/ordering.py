@@ -0,0 +1,132 @@
+"""
+ScriptLine.order: gap-based integers.
+
+Ingested lines get index * ORDER_GAP, so the order is increasing across the whole
+episode, chunk after chunk. Every write keeps it that way: a new line takes the
+midpoint of its two neighbours, where the neighbour past a chunk edge is the nearest
+line of the episode's previous/next chunk, and chunk splits move lines by order
+(ScriptLineViewSet.split). Only when two neighbours are adjacent integers is a small
+window of following lines (in any chunk) spread out again. Insert and move read at
+most two neighbour rows and, rarely, rewrite REBALANCE_WINDOW rows -- never the
+whole episode.
+"""
+from audio_slicer.models import AudioChunk
+
+from .models import ScriptLine
+
+ORDER_GAP = 1024
+REBALANCE_WINDOW = 16
+
+
+def order_for_index(index: int) -> int:
+    """Order of the index-th ingested line."""
+    return index * ORDER_GAP
+
+
+def _siblings(chunk_id, exclude_id=None):
+    siblings = ScriptLine.objects.filter(chunk_id=chunk_id)
+    if exclude_id is not None:
+        siblings = siblings.exclude(id=exclude_id)
+    return siblings
+
+
+def _episode_lines(source_audio_id, exclude_id=None):
+    lines = ScriptLine.objects.filter(source_audio_id=source_audio_id)
+    if exclude_id is not None:
+        lines = lines.exclude(id=exclude_id)
+    return lines
+
+
+def _beyond_edge(source_audio_id, chunk_index, edge: str, exclude_id=None):
+    """Order of the nearest line before ('start') / after ('end') the chunk, in the episode's other chunks."""
+    lines = _episode_lines(source_audio_id, exclude_id).values_list('order', flat=True)
+    if edge == 'start':
+        return lines.filter(chunk__chunk_index__lt=chunk_index).order_by('-order').first()
+    return lines.filter(chunk__chunk_index__gt=chunk_index).order_by('order').first()
+
+
+def _make_room(source_audio_id, low, high, exclude_id=None) -> int:
+    """
+    No integer left between low and high: spread the episode's lines from `high`
+    onwards (a window that doubles until there is room) and return the freed slot.
+    """
+    window = REBALANCE_WINDOW
+    while True:
+        lines = list(
+            _episode_lines(source_audio_id, exclude_id)
+            .filter(order__gte=high)
+            .order_by('order', 'index')[:window + 1]
+        )
+        ceiling = lines.pop().order if len(lines) > window else None
+        slots = len(lines) + 1  # the new line + the window
+
+        if ceiling is None:
+            step = ORDER_GAP
+        else:
+            step = (ceiling - low) // (slots + 1)
+            if step < 2:
+                window *= 2
+                continue
+
+        for i, line in enumerate(lines, start=1):
+            line.order = low + step * (i + 1)
+        ScriptLine.objects.bulk_update(lines, ['order'])
+        return low + step
+
+
+def order_between(chunk_id, low=None, high=None, exclude_id=None) -> int:
+    """
+    Order for a line between two neighbours in a chunk (None = chunk edge: bounded by
+    the adjacent chunks' lines, so the order stays increasing across the episode).
+    Call inside transaction.atomic(): it may rewrite a few following lines.
+    """
+    if low is not None and high is not None and high - low > 1:
+        return (low + high) // 2
+
+    source_audio_id, chunk_index = AudioChunk.objects.filter(
+        id=chunk_id
+    ).values_list('source_audio_id', 'chunk_index').get()
+    if low is None:
+        low = _beyond_edge(source_audio_id, chunk_index, 'start', exclude_id)
+    if high is None:
+        high = _beyond_edge(source_audio_id, chunk_index, 'end', exclude_id)
+
+    if low is None and high is None:
+        return 0
+    if low is None:
+        return high - ORDER_GAP
+    if high is None:
+        return low + ORDER_GAP
+    if high - low > 1:
+        return (low + high) // 2
+    return _make_room(source_audio_id, low, high, exclude_id)
+
+
+def order_next_to(ref_line, position: str, chunk_id=None, exclude_id=None) -> int:
+    """
+    Order for a line placed 'before' or 'after' ref_line, in ref_line's chunk
+    (or chunk_id). Reads only the neighbour on that side.
+    """
+    chunk_id = chunk_id if chunk_id is not None else ref_line.chunk_id
+    siblings = _siblings(chunk_id, exclude_id)
+
+    if position == 'before':
+        low = (
+            siblings.filter(order__lt=ref_line.order)
+            .order_by('-order').values_list('order', flat=True).first()
+        )
+        return order_between(chunk_id, low, ref_line.order, exclude_id)
+
+    high = (
+        siblings.filter(order__gt=ref_line.order)
+        .order_by('order').values_list('order', flat=True).first()
+    )
+    return order_between(chunk_id, ref_line.order, high, exclude_id)
+
+
+def order_at_edge(chunk_id, edge: str) -> int:
+    """Order for a line at the 'start' or 'end' of a chunk."""
+    siblings = _siblings(chunk_id).values_list('order', flat=True)
+    if edge == 'start':
+        return order_between(chunk_id, None, siblings.order_by('order').first())
+    return order_between(chunk_id, siblings.order_by('-order').first(), None)
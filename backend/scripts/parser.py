@@ -1,22 +1,134 @@
 """
 Parser for fanfr.com Friends scripts.
 Fetches and parses episode scripts into structured ScriptLine data.
+
+Fetched HTML and parsed lines are cached on disk per (season, episode) under
+settings.SCRIPT_CACHE_DIR, so re-ingests don't touch the network
+(pre-fill a season with `python manage.py prefetch_scripts --season 10`).
 """
 import re
+import json
+import time
+import hashlib
+from pathlib import Path
+
 import requests
-from bs4 import BeautifulSoup
-from typing import Optional
+from django.conf import settings
+from lxml import html as lxml_html
+
+# Bump when parse_script's output changes, to invalidate cached parses
+PARSER_VERSION = 2
+
+SCRIPT_URL = "https://www.fanfr.com/scripts/saison{season}/friendsgeneration2.php?nav=script&version=vo&episodescript={season}{episode:02d}"
+
+
+# ============ HTML Cache ============
 
+def _cache_paths(season: int, episode: int) -> tuple[Path, Path, Path]:
+    """(html, fetch metadata, parsed lines) cache files for an episode."""
+    base = Path(settings.SCRIPT_CACHE_DIR) / f"s{season:02d}e{episode:02d}"
+    return base.with_suffix('.html'), base.with_suffix('.meta.json'), base.with_suffix('.lines.json')
 
-def fetch_script_html(season: int, episode: int) -> str:
+
+def _write_atomic(path: Path, text: str):
+    """Write via a temp file + rename, so concurrent readers never see half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_text(text, encoding='utf-8')
+    tmp.replace(path)
+
+
+def fetch_script_html(season: int, episode: int, revalidate: bool = False) -> str:
     """
-    Fetch raw HTML from fanfr.com for a given episode.
+    Fetch raw HTML from fanfr.com for a given episode, through the on-disk cache.
     URL format: https://www.fanfr.com/scripts/saison{season}/friendsgeneration2.php?nav=script&version=vo&episodescript={season}{episode:02d}
+
+    A cached copy younger than settings.SCRIPT_CACHE_MAX_AGE is returned as is. Older
+    copies (or any copy with revalidate=True) are revalidated with a conditional GET
+    (ETag / Last-Modified); if the site is unreachable the stale copy is used.
+    """
+    html_path, meta_path, _ = _cache_paths(season, episode)
+    meta = json.loads(meta_path.read_text(encoding='utf-8')) if meta_path.exists() else {}
+    cached = html_path.exists()
+
+    if cached and not revalidate and time.time() - meta.get('fetched_at', 0) < settings.SCRIPT_CACHE_MAX_AGE:
+        return html_path.read_text(encoding='utf-8')
+
+    headers = {}
+    if cached and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if cached and meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    url = SCRIPT_URL.format(season=season, episode=episode)
+    try:
+        response = requests.get(url, headers=headers, timeout=30)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException:
+        if cached:
+            return html_path.read_text(encoding='utf-8')
+        raise
+
+    if response.status_code == 304:
+        html = html_path.read_text(encoding='utf-8')
+    else:
+        html = response.text
+        _write_atomic(html_path, html)
+
+    _write_atomic(meta_path, json.dumps({
+        'url': url,
+        'etag': response.headers.get('ETag') or meta.get('etag'),
+        'last_modified': response.headers.get('Last-Modified') or meta.get('last_modified'),
+        'fetched_at': time.time(),
+    }))
+    return html
+
+
+# ============ Parsing ============
+
+SCENE_RE = re.compile(r'^\[Scene:\s*(.+?)\]$', re.IGNORECASE)
+# Pattern supports: multi-word names "Mr Zelner", hyphenated "Phoebe-Estelle"
+DIALOGUE_RE = re.compile(r'^([A-Za-z][A-Za-z\s\-]*?)[;:]\s*(.+)$', re.DOTALL)
+ACTION_NOTE_RE = re.compile(r'\(([^)]*)\)\s*')
+SKIPPED_MARKERS = {'OPENING CREDITS', 'END', 'CLOSING CREDITS', 'COMMERCIAL BREAK'}
+# Script content area; the class is matched as a token, like bs4's class_=
+CONTENT_SELECTORS = (
+    '//div[contains(concat(" ", normalize-space(@class), " "), " contenu ")]',
+    '//div[@id="contenu"]',
+    '//body',
+)
+
+
+def _split_action_notes(content: str) -> tuple[str, str | None]:
+    """
+    One regex pass over a dialogue: "(to Ross) Hi! (waves)" -> ("Hi!", "to Ross; waves").
     """
-    url = f"https://www.fanfr.com/scripts/saison{season}/friendsgeneration2.php?nav=script&version=vo&episodescript={season}{episode:02d}"
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    return response.text
+    notes = []
+
+    def collect(match):
+        if match.group(1):
+            notes.append(match.group(1))
+        return ''
+
+    clean_text = ACTION_NOTE_RE.sub(collect, content).strip()
+    return clean_text, '; '.join(notes) if notes else None
+
+
+def _dialogue(speaker: str, content: str, raw_text: str) -> dict:
+    clean_text, action_note = _split_action_notes(content)
+    return {
+        'type': 'dialogue',
+        'speaker': speaker,
+        'text': clean_text,
+        'action_note': action_note,
+        'raw_text': raw_text,
+    }
+
+
+def _text(element) -> str:
+    """Element text with all whitespace runs collapsed (bs4 get_text + split/join)."""
+    return ' '.join(element.text_content().split())
 
 
 def parse_script(html: str) -> list[dict]:
@@ -36,19 +148,24 @@ def parse_script(html: str) -> list[dict]:
         - action_note: str (only for dialogue with inline actions)
         - raw_text: str (original text)
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    # Find the main script content area
-    content_div = soup.find('div', class_='contenu') or soup.find('div', id='contenu') or soup.body
-    if not content_div:
+    if not html or not html.strip():
         return []
+    root = lxml_html.fromstring(html)
+
+    # Find the main script content area
+    content_div = root
+    for selector in CONTENT_SELECTORS:  # in priority order, as bs4's find() or find() or body
+        found = root.xpath(selector)
+        if found:
+            content_div = found[0]
+            break
     
     lines = []
     
-    # Process h3 (scene headers) and p (dialogues/actions) elements
-    for element in content_div.find_all(['h3', 'p']):
+    # Process h3 (scene headers) and p (dialogues/actions) elements, in document order
+    for element in content_div.iter('h3', 'p'):
         # Normalize whitespace: replace all whitespace sequences with single space
-        raw_text = ' '.join(element.get_text().split())
+        raw_text = _text(element)
         if not raw_text or len(raw_text) < 2:
             continue
         
@@ -57,11 +174,11 @@ def parse_script(html: str) -> list[dict]:
             continue
         
         # Skip "OPENING CREDITS", "END", etc.
-        if raw_text.strip().upper() in ['OPENING CREDITS', 'END', 'CLOSING CREDITS', 'COMMERCIAL BREAK']:
+        if raw_text.upper() in SKIPPED_MARKERS:
             continue
         
         # Check for scene header
-        scene_match = re.match(r'^\[Scene:\s*(.+?)\]$', raw_text, re.IGNORECASE)
+        scene_match = SCENE_RE.match(raw_text)
         if scene_match:
             lines.append({
                 'type': 'scene',
@@ -72,64 +189,34 @@ def parse_script(html: str) -> list[dict]:
             })
             
             # SPECIAL CASE: After h3, there might be a standalone <b> tag with dialogue
-            # that's not wrapped in <p>. Look for the next sibling <b> tag.
-            next_sib = element.find_next_sibling()
-            if next_sib and next_sib.name == 'b':
-                speaker = next_sib.get_text(strip=True).rstrip(':')
-                # Get all text nodes between this <b> and the next block element
-                dialogue_parts = []
-                for sib in next_sib.next_siblings:
-                    if sib.name in ['h3', 'p', 'b']:
+            # that's not wrapped in <p>. The dialogue is the <b>'s tail text plus
+            # everything up to the next block element.
+            next_sib = element.getnext()
+            if next_sib is not None and next_sib.tag == 'b':
+                speaker = next_sib.text_content().strip().rstrip(':')
+                dialogue_parts = [next_sib.tail]
+                for sib in next_sib.itersiblings():
+                    if sib.tag in ('h3', 'p', 'b'):
                         break
-                    text = sib.get_text() if hasattr(sib, 'get_text') else str(sib)
-                    text = text.strip()
-                    if text:
-                        dialogue_parts.append(text)
+                    if isinstance(sib.tag, str):
+                        dialogue_parts.append(sib.text_content())
+                    dialogue_parts.append(sib.tail)
+                dialogue_parts = [part.strip() for part in dialogue_parts if part and part.strip()]
                 
                 if dialogue_parts and speaker:
                     content = ' '.join(dialogue_parts)
-                    action_parts = re.findall(r'\(([^)]+)\)', content)
-                    action_note = '; '.join(action_parts) if action_parts else None
-                    clean_text = re.sub(r'\([^)]*\)\s*', '', content).strip()
-                    
-                    lines.append({
-                        'type': 'dialogue',
-                        'speaker': speaker,
-                        'text': clean_text,
-                        'action_note': action_note,
-                        'raw_text': f"{speaker}: {content}"
-                    })
+                    lines.append(_dialogue(speaker, content, f"{speaker}: {content}"))
             continue
         
         # Check for dialogue: look for <b> tag inside <p>
-        if element.name == 'p':
-            b_tag = element.find('b')
-            if b_tag:
-                speaker = b_tag.get_text(strip=True)
-                
-                # Get the rest of the text after the speaker name
-                # Normalize whitespace in full text too
-                full_text = ' '.join(element.get_text().split())
+        if element.tag == 'p':
+            b_tags = element.xpath('.//b')
+            if b_tags:
+                speaker = b_tags[0].text_content().strip()
                 # The text after speaker usually starts with : or ;
-                content_match = re.match(rf'^{re.escape(speaker)}[;:]\s*(.*)$', full_text, re.DOTALL)
-                
-                if content_match and speaker:
-                    content = content_match.group(1)
-                    
-                    # Extract action notes from parentheses
-                    action_parts = re.findall(r'\(([^)]+)\)', content)
-                    action_note = '; '.join(action_parts) if action_parts else None
-                    
-                    # Clean text (remove parentheses content)
-                    clean_text = re.sub(r'\([^)]*\)\s*', '', content).strip()
-                    
-                    lines.append({
-                        'type': 'dialogue',
-                        'speaker': speaker,
-                        'text': clean_text,
-                        'action_note': action_note,
-                        'raw_text': raw_text
-                    })
+                if speaker and raw_text.startswith(speaker) and raw_text[len(speaker):len(speaker) + 1] in (';', ':'):
+                    content = raw_text[len(speaker) + 1:].lstrip()
+                    lines.append(_dialogue(speaker, content, raw_text))
                     continue
         
         # Check for standalone action (text in parentheses without speaker)
@@ -145,31 +232,41 @@ def parse_script(html: str) -> list[dict]:
         
         # Fallback: try regex matching for dialogue pattern
         # This handles cases where the HTML structure is different
-        # Pattern supports: multi-word names "Mr Zelner", hyphenated "Phoebe-Estelle"
-        dialogue_match = re.match(r'^([A-Za-z][A-Za-z\s\-]*?)[;:]\s*(.+)$', raw_text, re.DOTALL)
+        dialogue_match = DIALOGUE_RE.match(raw_text)
         if dialogue_match:
             speaker = dialogue_match.group(1).strip()
-            content = dialogue_match.group(2)
-            
             if len(speaker) > 1 and speaker[0].isupper():
-                action_parts = re.findall(r'\(([^)]+)\)', content)
-                action_note = '; '.join(action_parts) if action_parts else None
-                clean_text = re.sub(r'\([^)]*\)\s*', '', content).strip()
-                
-                lines.append({
-                    'type': 'dialogue',
-                    'speaker': speaker,
-                    'text': clean_text,
-                    'action_note': action_note,
-                    'raw_text': raw_text
-                })
+                lines.append(_dialogue(speaker, dialogue_match.group(2), raw_text))
     
     return lines
 
 
+def get_parsed_script(season: int, episode: int, revalidate: bool = False) -> list[dict]:
+    """
+    fetch_script_html + parse_script, with the parsed lines cached next to the HTML.
+    The parse cache is reused while the HTML hash and PARSER_VERSION match.
+    """
+    html = fetch_script_html(season, episode, revalidate=revalidate)
+    html_hash = hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+    _, _, lines_path = _cache_paths(season, episode)
+    if lines_path.exists():
+        cached = json.loads(lines_path.read_text(encoding='utf-8'))
+        if cached.get('parser_version') == PARSER_VERSION and cached.get('html_sha256') == html_hash:
+            return cached['lines']
+
+    lines = parse_script(html)
+    _write_atomic(lines_path, json.dumps({
+        'parser_version': PARSER_VERSION,
+        'html_sha256': html_hash,
+        'lines': lines,
+    }, ensure_ascii=False))
+    return lines
+
+
 def parse_fanfr_script(season: int, episode: int) -> list[dict]:
     """
-    Main entry point: fetch and parse a Friends episode script.
+    Main entry point: fetch and parse a Friends episode script (cached, see get_parsed_script).
     
     Args:
         season: Season number (1-10)
@@ -178,5 +275,4 @@ def parse_fanfr_script(season: int, episode: int) -> list[dict]:
     Returns:
         List of parsed script lines
     """
-    html = fetch_script_html(season, episode)
-    return parse_script(html)
+    return get_parsed_script(season, episode)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import ScriptLine
+from audio_slicer.services import get_slice_stream_url
 
 
 class ScriptLineSerializer(serializers.ModelSerializer):
@@ -36,6 +37,13 @@ class ScriptLineListSerializer(serializers.ModelSerializer):
             'highlight',
         ]
 
+    def __init__(self, *args, fields=None, **kwargs):
+        """fields: optional subset of Meta.fields to render (list endpoint projection)."""
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 
 class SplitRequestSerializer(serializers.Serializer):
     start_index = serializers.IntegerField(min_value=0)
@@ -87,10 +95,16 @@ class BlitzCardSerializer(serializers.ModelSerializer):
             else:
                 audio_url = obj.chunk.file.url
                 
+        slice_audio_url = None
+        if obj.slice:
+            slice_audio_url = get_slice_stream_url(obj.slice, self.context.get('request'))
+
         return {
             "text_zh": obj.text_zh,
             "text": obj.text,
             "audio_url": audio_url,
+            # Streams only this line's bytes (times restart at 0)
+            "slice_audio_url": slice_audio_url,
             # Pass timing for slicing if needed by frontend, though usually pre-sliced
             "start_time": obj.slice.start_time if obj.slice else None,
             "end_time": obj.slice.end_time if obj.slice else None,
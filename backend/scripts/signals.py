@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import ScriptLine
+from .blitz import invalidate_highlight_index
+
+@receiver(post_save, sender=ScriptLine)
+def invalidate_blitz_index_on_line_save(sender, instance, **kwargs):
+    """
+    The Blitz highlight index also stores speaker and episode, so any line edit
+    (speaker fix, insert, split, merge, move) can change which decks a line is in.
+    Deletes go through record_highlight_change / invalidate_learning_progress.
+    """
+    if instance.user_id:
+        invalidate_highlight_index(instance.user_id)
@@ -1,6 +1,7 @@
 """
 Huey background tasks for script processing.
-Handles script ingest (parsing from fanfr.com) and batch translation.
+Handles script ingest (parsing from fanfr.com), batch translation, audio alignment
+and embedding precomputation for slice matching.
 """
 import traceback
 from huey.contrib.djhuey import task
@@ -21,9 +22,10 @@ def ingest_and_translate_script(script_task_id):
     """
     from .models import ScriptTask, ScriptLine
     from .parser import parse_fanfr_script
+    from .ordering import order_for_index
     from audio_slicer.models import AudioChunk
-    from ai_analysis.services import batch_translate_texts
-    from django.db.models import Q
+    from audio_slicer.services import invalidate_learning_progress
+    from .translation import get_untranslated_lines, translate_script_lines
 
     try:
         script_task = ScriptTask.objects.get(id=script_task_id)
@@ -61,14 +63,17 @@ def ingest_and_translate_script(script_task_id):
             return
 
         # Clear existing script lines for this source audio (if re-ingesting)
-        ScriptLine.objects.filter(chunk__source_audio=source_audio).delete()
+        ScriptLine.objects.filter(source_audio=source_audio).delete()
 
         # Create script lines
         script_lines = []
         for idx, line_data in enumerate(parsed_lines):
             script_lines.append(ScriptLine(
                 chunk=first_chunk,
+                source_audio=source_audio,
+                user_id=source_audio.user_id,
                 index=idx,
+                order=order_for_index(idx),
                 line_type=line_data['type'],
                 speaker=line_data.get('speaker'),
                 text=line_data['text'],
@@ -77,6 +82,9 @@ def ingest_and_translate_script(script_task_id):
             ))
 
         ScriptLine.objects.bulk_create(script_lines)
+        # Highlights of the replaced lines are gone, recount the dashboard on next read
+        invalidate_learning_progress(source_audio.user)
+        precompute_episode_embeddings(source_audio.id)
         script_task.ingest_count = len(script_lines)
         script_task.message = f'Ingested {len(script_lines)} lines. Starting translation...'
         script_task.save()
@@ -94,11 +102,7 @@ def ingest_and_translate_script(script_task_id):
         script_task.save()
 
         # Get lines without translation
-        lines_to_translate = ScriptLine.objects.filter(
-            chunk__source_audio=source_audio
-        ).filter(
-            Q(text_zh__isnull=True) | Q(text_zh__exact='')
-        ).order_by('index')
+        lines_to_translate = get_untranslated_lines(source_audio)
 
         if not lines_to_translate.exists():
             script_task.status = 'completed'
@@ -106,26 +110,21 @@ def ingest_and_translate_script(script_task_id):
             script_task.save()
             return
 
-        # Batch translate (same logic as views.py translate action)
-        BATCH_SIZE = 50
-        total_translated = 0
-        all_lines = list(lines_to_translate.values('id', 'text'))
-
-        for i in range(0, len(all_lines), BATCH_SIZE):
-            batch = all_lines[i:i + BATCH_SIZE]
-            translations = batch_translate_texts(batch)
-
-            for item in translations:
-                line_id = item.get('id')
-                translation = item.get('translation')
-                if line_id and translation:
-                    ScriptLine.objects.filter(id=line_id).update(text_zh=translation)
-                    total_translated += 1
-
-            # Update progress
-            script_task.translate_count = total_translated
-            script_task.message = f'Translated {total_translated}/{len(all_lines)} lines...'
-            script_task.save()
+        # Concurrent batches under the translation rate limit, one bulk_update per batch
+        def on_progress(batches_done, batches_total, translated, total_lines):
+            script_task.translate_batches_done = batches_done
+            script_task.translate_batches_total = batches_total
+            script_task.translate_count = translated
+            script_task.message = (
+                f'Translated {translated}/{total_lines} lines '
+                f'(batch {batches_done}/{batches_total})...'
+            )
+            script_task.save(update_fields=[
+                'translate_batches_done', 'translate_batches_total',
+                'translate_count', 'message', 'updated_at',
+            ])
+
+        total_translated, _ = translate_script_lines(lines_to_translate, on_progress=on_progress)
 
         script_task.status = 'completed'
         script_task.translate_count = total_translated
@@ -140,3 +139,77 @@ def ingest_and_translate_script(script_task_id):
         script_task.message = f'Translation failed: {str(e)} (ingested {script_task.ingest_count} lines OK)'
         script_task.save()
         traceback.print_exc()
+
+
+@task()
+def align_episode_script(script_task_id):
+    """
+    Background task: force-align an episode's script lines to its audio.
+
+    Transcribes every chunk with Whisper (word timestamps), aligns the script text to
+    the transcript, then moves each line to its chunk and binds/creates its AudioSlice.
+
+    Args:
+        script_task_id: ID of the ScriptTask record to track progress
+    """
+    from .models import ScriptTask
+    from .alignment import align_episode_lines
+
+    try:
+        script_task = ScriptTask.objects.get(id=script_task_id)
+    except ScriptTask.DoesNotExist:
+        return
+
+    source_audio = script_task.source_audio
+
+    def progress(done, total):
+        script_task.message = f'Transcribing chunk {done}/{total}...'
+        script_task.save()
+
+    try:
+        script_task.status = 'aligning'
+        script_task.message = f'Aligning script for S{source_audio.season:02d}E{source_audio.episode:02d}...'
+        script_task.save()
+
+        stats = align_episode_lines(source_audio, progress=progress)
+        # Alignment bulk-creates slices, which skips the post_save embedding hook
+        precompute_episode_embeddings(source_audio.id)
+
+        script_task.status = 'completed'
+        script_task.align_count = stats['aligned']
+        script_task.message = (
+            f"Done! Aligned {stats['aligned']} lines "
+            f"({stats['bound']} bound to existing slices, {stats['created']} new slices, "
+            f"{stats['unaligned']} unaligned)."
+        )
+        script_task.save()
+
+    except Exception as e:
+        script_task.status = 'failed'
+        script_task.message = f'Alignment failed: {str(e)}'
+        script_task.save()
+        traceback.print_exc()
+
+
+@task()
+def precompute_episode_embeddings(source_audio_id):
+    """
+    Background task: embed an episode's script lines and accepted slices that have
+    no (or a stale) embedding, so slice search never waits on the embedding API.
+    Queued after script ingest, alignment and slice saves; cheap when nothing changed.
+
+    Args:
+        source_audio_id: ID of the episode's SourceAudio
+    """
+    from .models import ScriptLine
+    from .embeddings import ensure_embeddings
+    from audio_slicer.models import AudioSlice
+
+    try:
+        ensure_embeddings(ScriptLine.objects.filter(source_audio_id=source_audio_id), 'text')
+        ensure_embeddings(
+            AudioSlice.objects.filter(audio_chunk__source_audio_id=source_audio_id, is_draft=False),
+            'original_text',
+        )
+    except Exception:
+        traceback.print_exc()
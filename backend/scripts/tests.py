@@ -1,3 +1,160 @@
-from django.test import TestCase
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
 
-# Create your tests here.
+from audio_slicer.models import Drama, SourceAudio, AudioChunk
+
+from .alignment import monotonic_assignment
+from .blitz import permute
+from .models import ScriptLine
+from .ordering import ORDER_GAP, REBALANCE_WINDOW, order_at_edge, order_between, order_next_to
+
+
+class OrderingTests(TestCase):
+    """scripts/ordering.py: orders stay increasing across the episode through inserts."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='u', email='u@example.com', password='pw')
+        drama = Drama.objects.create(user=user, name='Friends')
+        # bulk_create skips the post_save ingest signal (no real audio file)
+        self.source_audio = SourceAudio.objects.bulk_create([
+            SourceAudio(user=user, drama=drama, season=1, episode=1, file='test/original.mp3')
+        ])[0]
+        self.chunk_a, self.chunk_b = AudioChunk.objects.bulk_create([
+            AudioChunk(source_audio=self.source_audio, chunk_index=i, file=f'test/chunk_{i:03d}.mp3')
+            for i in (1, 2)
+        ])
+        self.user = user
+
+    def make_lines(self, chunk, orders, start_index=0):
+        return ScriptLine.objects.bulk_create([
+            ScriptLine(
+                chunk=chunk, source_audio=self.source_audio, user=self.user,
+                index=start_index + i, order=order, text=f'line {start_index + i}', raw_text='',
+            )
+            for i, order in enumerate(orders)
+        ])
+
+    def insert_after(self, ref_line):
+        with transaction.atomic():
+            order = order_next_to(ref_line, 'after')
+            return self.make_lines(ref_line.chunk, [order], start_index=1000 + ScriptLine.objects.count())[0]
+
+    def episode_ids(self):
+        return list(ScriptLine.objects.filter(source_audio=self.source_audio).order_by('order').values_list('id', flat=True))
+
+    def assert_unique_orders(self):
+        orders = list(ScriptLine.objects.filter(source_audio=self.source_audio).values_list('order', flat=True))
+        self.assertEqual(len(orders), len(set(orders)))
+
+    def test_insert_takes_the_midpoint(self):
+        first, second = self.make_lines(self.chunk_a, [0, ORDER_GAP])
+        self.assertEqual(order_next_to(first, 'after'), ORDER_GAP // 2)
+        self.assertEqual(order_next_to(second, 'before'), ORDER_GAP // 2)
+
+    def test_gap_exhaustion_rebalances_following_lines(self):
+        # A run of adjacent orders (no integer between neighbours), then regular gaps
+        dense = [0, 1, 2, 3]
+        lines = self.make_lines(
+            self.chunk_a, dense + [ORDER_GAP * k for k in range(1, REBALANCE_WINDOW * 3)]
+        )
+        after = self.make_lines(self.chunk_b, [ORDER_GAP * REBALANCE_WINDOW * 3], start_index=len(lines))
+
+        inserted = self.insert_after(lines[0])
+
+        expected = [lines[0].id, inserted.id] + [line.id for line in lines[1:]] + [after[0].id]
+        self.assertEqual(self.episode_ids(), expected)
+        self.assert_unique_orders()
+        # Only a window from the insertion point is rewritten, lines past it keep their order
+        untouched = ScriptLine.objects.get(id=lines[-1].id)
+        self.assertEqual(untouched.order, lines[-1].order)
+
+    def test_repeated_inserts_at_one_spot_stay_ordered(self):
+        lines = self.make_lines(self.chunk_a, [0, 1])
+        inserted = []
+        for _ in range(3 * REBALANCE_WINDOW):
+            # Each new line goes right after the first one, so the gap keeps halving
+            inserted.append(self.insert_after(ScriptLine.objects.get(id=lines[0].id)).id)
+
+        expected = [lines[0].id] + inserted[::-1] + [lines[1].id]
+        self.assertEqual(self.episode_ids(), expected)
+        self.assert_unique_orders()
+
+    def test_chunk_edges_are_bounded_by_the_adjacent_chunks(self):
+        last_a = self.make_lines(self.chunk_a, [0, 10])[-1]
+        first_b = self.make_lines(self.chunk_b, [11, 20], start_index=2)[0]
+
+        with transaction.atomic():
+            end_of_a = order_at_edge(self.chunk_a.id, 'end')
+            self.make_lines(self.chunk_a, [end_of_a], start_index=100)
+        with transaction.atomic():
+            start_of_b = order_at_edge(self.chunk_b.id, 'start')
+            self.make_lines(self.chunk_b, [start_of_b], start_index=101)
+
+        chunk_indexes = list(
+            ScriptLine.objects.filter(source_audio=self.source_audio)
+            .order_by('order').values_list('chunk__chunk_index', flat=True)
+        )
+        self.assertEqual(chunk_indexes, sorted(chunk_indexes))
+        self.assertGreater(ScriptLine.objects.get(id=last_a.id).order, 0)
+        self.assertLess(ScriptLine.objects.get(id=last_a.id).order, ScriptLine.objects.get(id=first_b.id).order)
+        self.assert_unique_orders()
+
+    def test_empty_episode(self):
+        self.assertEqual(order_between(self.chunk_a.id), 0)
+
+
+class PermuteTests(SimpleTestCase):
+    """scripts/blitz.py permute: a bijection on [0, n) for any n, not just powers of two."""
+
+    def test_bijection(self):
+        for n in (1, 7, 1000):
+            for seed in (0, 1, 2 ** 31 - 1):
+                with self.subTest(n=n, seed=seed):
+                    self.assertEqual(sorted(permute(i, n, seed) for i in range(n)), list(range(n)))
+
+    def test_seed_changes_the_order(self):
+        first = [permute(i, 1000, 1) for i in range(1000)]
+        self.assertEqual(first, [permute(i, 1000, 1) for i in range(1000)])
+        self.assertNotEqual(first, [permute(i, 1000, 2) for i in range(1000)])
+
+
+class MonotonicAssignmentTests(SimpleTestCase):
+    """scripts/alignment.py monotonic_assignment: order-preserving, threshold-respecting."""
+
+    def assert_increasing(self, assigned):
+        columns = [col for col in assigned if col >= 0]
+        self.assertEqual(columns, sorted(set(columns)))
+
+    def test_diagonal(self):
+        self.assertEqual(monotonic_assignment(np.eye(3)), [0, 1, 2])
+
+    def test_never_crosses(self):
+        # Greedy would bind row 0 -> col 1 and row 1 -> col 0
+        scores = np.array([[0.6, 0.9], [0.9, 0.5]])
+        assigned = monotonic_assignment(scores)
+        self.assert_increasing(assigned)
+        self.assertEqual(assigned, [0, 1])
+        # Unless one crossing pair alone beats the whole diagonal
+        self.assertEqual(monotonic_assignment(np.array([[0.5, 0.9], [0.9, 0.1]])), [1, -1])
+
+    def test_pairs_below_threshold_are_rejected(self):
+        scores = np.array([
+            [0.8, -0.2, -0.3],
+            [-0.5, -0.1, -0.4],  # nothing above the threshold: unassigned
+            [-0.3, -0.2, 0.6],
+        ])
+        self.assertEqual(monotonic_assignment(scores), [0, -1, 2])
+        self.assertEqual(monotonic_assignment(np.zeros((2, 2))), [-1, -1])
+
+    def test_more_rows_than_columns(self):
+        rng = np.random.default_rng(0)
+        scores = rng.uniform(-1, 1, size=(40, 15))
+        assigned = monotonic_assignment(scores)
+        self.assert_increasing(assigned)
+        self.assertTrue(all(scores[row, col] > 0 for row, col in enumerate(assigned) if col >= 0))
+
+    def test_empty(self):
+        self.assertEqual(monotonic_assignment(np.empty((2, 0))), [-1, -1])
+        self.assertEqual(monotonic_assignment(np.empty((0, 3))), [])
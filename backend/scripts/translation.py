@@ -0,0 +1,71 @@
+"""
+Script line translation: concurrent LLM batches, one bulk write per batch.
+Shared by ScriptViewSet.translate and the ingest_and_translate_script task.
+"""
+import time
+
+from django.db.models import Q
+
+from .models import ScriptLine
+
+BATCH_SIZE = 50
+PROGRESS_INTERVAL = 1.0  # s: minimum time between live (per-item) progress reports
+
+
+def get_untranslated_lines(source_audio):
+    return ScriptLine.objects.filter(
+        source_audio=source_audio
+    ).filter(
+        Q(text_zh__isnull=True) | Q(text_zh__exact='')
+    ).order_by('index')
+
+
+def translate_script_lines(lines, on_progress=None) -> tuple[int, int]:
+    """
+    Translate ScriptLines and save text_zh with a single bulk_update per batch.
+
+    Args:
+        lines: ScriptLine queryset to translate
+        on_progress: optional callback(batches_done, batches_total, translated, total_lines),
+            called after every batch and, at most every PROGRESS_INTERVAL, as items stream in
+
+    Returns:
+        (translated_count, total_lines)
+    """
+    from ai_analysis.services import translate_batches_concurrently
+
+    all_lines = list(lines.values('id', 'text'))
+    line_ids = {line['id'] for line in all_lines}
+    batches_total = -(-len(all_lines) // BATCH_SIZE)
+    state = {'batches_done': 0, 'streamed': set(), 'reported_at': 0.0}
+
+    def report():
+        state['reported_at'] = time.monotonic()
+        if on_progress:
+            on_progress(state['batches_done'], batches_total, len(state['streamed']), len(all_lines))
+
+    def on_item(item):
+        if item['id'] in line_ids:
+            state['streamed'].add(item['id'])
+        if time.monotonic() - state['reported_at'] >= PROGRESS_INTERVAL:
+            report()
+
+    report()
+    translated = 0
+
+    for batch, translations in translate_batches_concurrently(all_lines, batch_size=BATCH_SIZE, on_item=on_item):
+        batch_ids = {item['id'] for item in batch}
+        results = {
+            item['id']: item['translation']
+            for item in translations
+            # Ignore IDs the model made up
+            if item.get('id') in batch_ids and item.get('translation')
+        }
+        updates = [ScriptLine(id=line_id, text_zh=text_zh) for line_id, text_zh in results.items()]
+        ScriptLine.objects.bulk_update(updates, ['text_zh'])
+
+        translated += len(updates)
+        state['batches_done'] += 1
+        report()
+
+    return translated, len(all_lines)
@@ -28,5 +28,8 @@ urlpatterns = [
     path('chunk/<int:chunk_pk>/undo-split/', ScriptLineViewSet.as_view({
         'post': 'undo_split',
     }), name='script-undo-split'),
+    path('chunk/<int:chunk_pk>/auto-bind/', ScriptLineViewSet.as_view({
+        'post': 'auto_bind',
+    }), name='script-auto-bind'),
 ]
 
@@ -15,6 +15,7 @@ export interface BlitzCard {
         text: string
         text_zh: string
         audio_url?: string
+        slice_audio_url?: string | null // Only this line's bytes (times restart at 0)
         start_time?: number
         end_time?: number
     }
@@ -31,6 +32,7 @@ export interface BlitzFilters {
     character: string
     page: number
     limit: number
+    seed?: number | null // shuffle session; returned by the first shuffled page
     drama_id?: number | string | null
     season?: number | null
     episode?: number | null
@@ -41,6 +43,7 @@ export interface BlitzResponse {
     next: string | null
     previous: string | null
     results: BlitzCard[]
+    seed?: number
 }
 
 // Fetch Cards
@@ -8,6 +8,7 @@ export interface ReviewCard {
     slice_text: string
     slice_translation: string | null
     audio_url: string
+    slice_audio_url: string | null // Only this slice's bytes (times restart at 0)
     start_time: number
     end_time: number
     audio_slice: number // ID of the underlying slice
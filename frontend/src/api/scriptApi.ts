@@ -17,6 +17,8 @@ export interface ScriptLinesResponse {
     results: ScriptLine[]
     count: number
     limit: number
+    next: string | null      // cursor: pass as `after` for the following window
+    previous: string | null  // cursor: pass as `before` for the preceding window
 }
 
 export interface SplitResponse {
@@ -56,14 +58,17 @@ export const ingestScript = async (
 }
 
 /**
- * Get script lines for a chunk.
+ * Get one window of script lines for a chunk.
+ * Pass `after` (a previous response's `next`) to continue, or `around` (a line id) to centre the window.
  */
 export const getScriptLines = async (
     chunkId: number,
-    limit = 50
+    limit = 50,
+    options: { after?: string; before?: string; around?: number; fields?: (keyof ScriptLine)[] } = {}
 ): Promise<ScriptLinesResponse> => {
+    const { fields, ...cursor } = options
     const response = await apiClient.get(`/scripts/chunk/${chunkId}/lines/`, {
-        params: { limit },
+        params: { limit, ...cursor, fields: fields?.join(',') },
     })
     return response.data
 }
@@ -145,9 +150,40 @@ export const bindSlice = async (
     return response.data
 }
 
+export interface AutoBindResponse {
+    chunk_id: number
+    bound: number
+    lines: number
+    slices: number
+    bindings: { line_id: number; slice_id: number; similarity: number }[]
+    message: string
+}
+
+/**
+ * Bind every dialogue line of a chunk to its slices in one pass (order-preserving).
+ */
+export const autoBindChunk = async (
+    chunkId: number,
+    options: { min_similarity?: number; overwrite?: boolean } = {}
+): Promise<AutoBindResponse> => {
+    const response = await apiClient.post(`/scripts/chunk/${chunkId}/auto-bind/`, options)
+    return response.data
+}
+
+/**
+ * Force-align the episode's script lines to its audio (background task, poll with pollScriptTask).
+ */
+export const alignScript = async (
+    season: number,
+    episode: number
+): Promise<{ task_id: number; source_audio_id: number }> => {
+    const response = await apiClient.post('/scripts/align/', { season, episode })
+    return response.data
+}
+
 // --- Script Task Status (Background Ingest + Translate) ---
 
-export type ScriptTaskStatus = 'pending' | 'ingesting' | 'translating' | 'completed' | 'failed'
+export type ScriptTaskStatus = 'pending' | 'ingesting' | 'translating' | 'aligning' | 'completed' | 'failed'
 
 export interface ScriptTaskResponse {
     id: number
@@ -155,6 +191,9 @@ export interface ScriptTaskResponse {
     message: string
     ingest_count: number
     translate_count: number
+    translate_batches_done: number
+    translate_batches_total: number
+    align_count: number
     created_at: string
     updated_at: string
 }
@@ -55,6 +55,7 @@ export interface AudioSliceResponse {
     highlights: HighlightData[]
     is_pronunciation_hard: boolean
     is_idiom: boolean
+    is_draft: boolean    // Proposed by VAD, not yet accepted
     created_at: string
     updated_at: string
 }
@@ -93,6 +94,46 @@ export async function getSlicesByChunk(
     return response.data.results || []
 }
 
+/**
+ * Get the VAD-proposed draft slices of a chunk (hidden from getSlicesByChunk).
+ */
+export async function getDraftSlicesByChunk(
+    chunkId: number
+): Promise<AudioSliceResponse[]> {
+    const response = await apiClient.get<{ results: AudioSliceResponse[] } | AudioSliceResponse[]>(
+        '/v1/audioslices/',
+        { params: { audio_chunk: chunkId, draft: 'true' } }
+    )
+    if (Array.isArray(response.data)) {
+        return response.data
+    }
+    return response.data.results || []
+}
+
+/**
+ * Accept draft slices of a chunk in bulk (all drafts when ids is omitted).
+ */
+export async function acceptDraftSlices(
+    chunkId: number,
+    ids?: number[]
+): Promise<number> {
+    const response = await apiClient.post<{ accepted: number }>(
+        '/v1/audioslices/accept_drafts/',
+        { audio_chunk: chunkId, ids }
+    )
+    return response.data.accepted
+}
+
+/**
+ * Re-run VAD on a chunk; replaces its draft slices and returns the new ones.
+ */
+export async function proposeSlices(chunkId: number): Promise<AudioSliceResponse[]> {
+    const response = await apiClient.post<AudioSliceResponse[]>(
+        `/v1/audiochunks/${chunkId}/propose_slices/`
+    )
+    return response.data
+}
+
 /**
  * Delete a single audio slice by ID.
  */
@@ -122,3 +163,72 @@ export async function completeChunk(chunkId: number): Promise<ChunkCompleteRespo
     return response.data
 }
 
+
+// --- Episode Ingest Status (Background Segmentation) ---
+
+export type IngestTaskStatus = 'pending' | 'segmenting' | 'registering' | 'completed' | 'failed'
+
+export interface IngestTaskResponse {
+    id: number
+    status: IngestTaskStatus
+    message: string
+    total_chunks: number
+    registered_chunks: number
+    created_at: string
+    updated_at: string
+}
+
+/**
+ * Get the background ingest status for a source audio.
+ */
+export async function getIngestStatus(sourceAudioId: number): Promise<IngestTaskResponse> {
+    const response = await apiClient.get<IngestTaskResponse>(
+        `/v1/audios/${sourceAudioId}/ingest_status/`
+    )
+    return response.data
+}
+
+/**
+ * Poll the ingest task until the chunks are ready (completed) or it failed.
+ */
+export async function pollIngestTask(
+    sourceAudioId: number,
+    interval = 2000,
+    maxAttempts = 180
+): Promise<IngestTaskResponse> {
+    for (let attempts = 0; attempts < maxAttempts; attempts++) {
+        const task = await getIngestStatus(sourceAudioId)
+        if (task.status === 'completed') {
+            return task
+        }
+        if (task.status === 'failed') {
+            throw new Error(task.message || 'Ingest failed')
+        }
+        await new Promise(resolve => setTimeout(resolve, interval))
+    }
+    throw new Error('Ingest timeout: max polling attempts reached')
+}
+
+// --- Waveform Peaks ---
+
+export interface ChunkPeaks {
+    peaks: Float32Array[]
+    duration: number
+}
+
+/**
+ * Get the precomputed waveform peaks of a chunk (interleaved int8 min/max pairs),
+ * so WaveSurfer can draw without downloading and decoding the whole MP3 first.
+ */
+export async function getChunkPeaks(chunkId: number): Promise<ChunkPeaks> {
+    const response = await apiClient.get<ArrayBuffer>(
+        `/v1/audiochunks/${chunkId}/peaks/`,
+        { responseType: 'arraybuffer' }
+    )
+    const windowMs = Number(response.headers['x-peaks-window-ms'] || 10)
+    const raw = new Int8Array(response.data)
+    return {
+        peaks: [Float32Array.from(raw, v => v / 128)],
+        duration: (raw.length / 2) * windowMs / 1000,
+    }
+}
@@ -6,6 +6,23 @@ export interface AudioSlice {
     end_time: number
 }
 
+/**
+ * Build the AudioSlice to play for a card: the slice stream (only the slice's own
+ * bytes, times restart at 0, the stream ends with the slice) when the API gives one,
+ * otherwise the full chunk with start/end seeking.
+ */
+export function toPlayableSlice(
+    chunkUrl: string | null | undefined,
+    sliceUrl: string | null | undefined,
+    startTime: number | null | undefined,
+    endTime: number | null | undefined
+): AudioSlice {
+    if (sliceUrl) {
+        return { audio_url: sliceUrl, start_time: 0, end_time: Number.POSITIVE_INFINITY }
+    }
+    return { audio_url: chunkUrl || '', start_time: startTime || 0, end_time: endTime || 0 }
+}
+
 /**
  * Composable for audio slice playback
  * Handles preloading, seeking, and play/pause toggle for audio slices